@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# A ledger of everyone we've written an invitation to, so we don't need
+# to keep a directory of already-contacted resumes around. It's an SQLite
+# file indexed by email address and by the hash of the resume text, so
+# checking whether someone was already contacted is a single lookup.
+#
+# resumesearch.py --ledger records every draft email it writes. Use this
+# script to record the drafts you actually sent:
+#
+# $ contactledger.py ledger.db --sent emails-debian/*-email.txt
+
+import argparse
+import datetime
+import hashlib
+import sqlite3
+from collections import namedtuple
+
+from identityindex import canonicalEmail
+
+contact = namedtuple('contact', ['email', 'resume', 'pdf', 'status', 'recorded'])
+
+# Bump this when canonicalEmail changes, so stored addresses are updated.
+EMAILVERSION = 1
+
+def hashResume(contents):
+    return hashlib.sha256(contents.encode()).hexdigest()
+
+class contactLedger:
+    """Persistent record of generated and sent invitations."""
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS contacts (
+                email TEXT NOT NULL,
+                resume TEXT NOT NULL,
+                pdf TEXT NOT NULL,
+                status TEXT NOT NULL,
+                recorded TEXT NOT NULL,
+                UNIQUE (email, resume, status));
+            CREATE INDEX IF NOT EXISTS contacts_by_resume ON contacts (resume);
+        ''')
+        version, = self.db.execute('PRAGMA user_version').fetchone()
+        if version < EMAILVERSION:
+            self.canonicalizeEmails()
+
+    def canonicalizeEmails(self):
+        """Rewrite the stored addresses in the current canonical form."""
+        self.db.create_function('canonical_email', 1, canonicalEmail)
+        # Entries that become the same as an existing one are dropped.
+        self.db.execute('UPDATE OR IGNORE contacts SET email = canonical_email(email)')
+        self.db.execute('DELETE FROM contacts WHERE email != canonical_email(email)')
+        self.db.execute('PRAGMA user_version = ' + str(EMAILVERSION))
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def record(self, emails, resume='', pdf='', status='generated'):
+        """Record that an invitation to emails was generated or sent.
+
+        resume is the hash of the resume text, if the invitation was
+        based on a resume. Changes are committed on close().
+        """
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        self.db.executemany('INSERT OR IGNORE INTO contacts VALUES (?, ?, ?, ?, ?)',
+                            [(canonicalEmail(email), resume, pdf, status, now)
+                             for email in set(emails)])
+
+    def recordResume(self, resume, status='generated'):
+        self.record(resume.emails, resume.digest, resume.pdfFileName, status)
+
+    def contacted(self, emails=(), resume=None):
+        """Return a ledger entry for any of emails or the resume hash, or None.
+
+        Entries for sent emails are returned before generated ones.
+        """
+        for email in emails:
+            row = self.db.execute("SELECT * FROM contacts WHERE email = ? ORDER BY status = 'sent' DESC LIMIT 1",
+                                  (canonicalEmail(email),)).fetchone()
+            if row:
+                return contact(*row)
+        if resume:
+            row = self.db.execute("SELECT * FROM contacts WHERE resume = ? ORDER BY status = 'sent' DESC LIMIT 1",
+                                  (resume,)).fetchone()
+            if row:
+                return contact(*row)
+        return None
+
+def draftRecipients(path):
+    """Return the addresses in the To: header of a draft email file."""
+    with open(path, 'r') as draft:
+        for line in draft:
+            if line.strip() == '':
+                break
+            if line.startswith('To:'):
+                addresses = line[len('To:'):].split(',')
+                return [a.split('<', 1)[-1].rstrip('> \n') for a in addresses if a.strip()]
+    return []
+
+def main():
+    parser = argparse.ArgumentParser(description='Record or look up invitations in the contact ledger.')
+    parser.add_argument('ledger', help='SQLite contact ledger file')
+    parser.add_argument('--sent', nargs='+', default=[], help='Draft email files that were sent')
+    parser.add_argument('--check', nargs='+', default=[], help='Email addresses to look up')
+    args = parser.parse_args()
+
+    ledger = contactLedger(args.ledger)
+    for path in args.sent:
+        ledger.record(draftRecipients(path), status='sent')
+    if args.sent:
+        print('Recorded', len(args.sent), 'sent emails')
+    for email in args.check:
+        entry = ledger.contacted([email])
+        if entry:
+            print(email, entry.status, entry.recorded, entry.pdf)
+        else:
+            print(email, 'not contacted')
+    ledger.close()
+
+if __name__ == "__main__":
+    main()
@@ -18,31 +18,29 @@
 # Create a set of generic form emails when we don't have a resume match.
 
 import argparse
-import os
+
+from emailtemplate import Template
+from mailspool import MailSpool, add_format_argument
 
 def main():
     parser = argparse.ArgumentParser(description='Send a generic email to a list of receipents with a personal greeting')
     parser.add_argument('email', help='email text template')
     parser.add_argument('contacts', help='CSV file of people who stopped by the booth')
     parser.add_argument('outdir', help='Directory to create form emails in')
+    add_format_argument(parser)
     args = parser.parse_args()
 
-    if not os.path.exists(args.outdir):
-        os.makedirs(args.outdir)
-
     tosend = []
     with open(args.contacts, 'r') as contactsFile:
         for row in contactsFile:
             if not row[0] == '#':
                 tosend.append(row)
 
-    for index, contact in enumerate(tosend):
-        with open(args.email, 'r') as emailFile:
-            given_name = contact.split(' ')[0]
-            body = emailFile.read().replace('NAME', given_name)
-            with open(os.path.join(args.outdir, str(index) + '.txt'), 'w') as email:
-                email.write('To: ' + contact)
-                email.write(body)
+    body = Template.from_file(args.email, ['NAME'])
+    with MailSpool(args.outdir, args.format) as spool:
+        texts = body.render_many({'NAME': contact.split(' ')[0]} for contact in tosend)
+        for index, (contact, text) in enumerate(zip(tosend, texts)):
+            spool.add(str(index) + '.txt', 'To: ' + contact + text)
     print('Wrote', len(tosend), 'resume draft emails to', args.outdir)
 
 if __name__ == "__main__":
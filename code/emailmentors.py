@@ -15,9 +15,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import argparse
-import os
 import csv
 
+from emailtemplate import Template
+from mailspool import MailSpool, add_format_argument
+
 header1 = '''From: Outreachy Organizers <organizers@outreachy.org>
 '''
 
@@ -57,11 +59,9 @@ def main():
             '  intern2 <email@example.com>, mentor4 <email@example.com>',
             type=argparse.FileType('r')
             )
+    add_format_argument(parser)
     args = parser.parse_args()
 
-    if not os.path.exists(args.outdir):
-        os.makedirs(args.outdir)
-
     community = ''
     coordinator = ''
     # list of CohortPairs
@@ -103,7 +103,8 @@ def main():
         if line == '':
             break
 
-    body = args.body.read()
+    body = Template(args.body.read(), ['$INTERN', '$COMMUNITY', '$COORDINATOR'])
+    spool = MailSpool(args.outdir, args.format)
     for pair in cohort_pairs:
         intern_name = pair.intern_contact.split('<', 1)[0].strip()
         filename = intern_name.replace(' ', '-') + '.txt'
@@ -113,26 +114,27 @@ def main():
             if c != '':
                 coordinator_given_names.append(c.split('<', 1)[0].strip().split(' ')[0])
 
-        this_body = body.replace('$INTERN', intern_name)
-        this_body = this_body.replace('$COMMUNITY', pair.community)
-        this_body = this_body.replace('$COORDINATOR', ' and '.join(coordinator_given_names))
-        with open(os.path.join(args.outdir, filename), 'w') as outfile:
-            outfile.write(header1)
+        this_body = body.render({'$INTERN': intern_name,
+                                 '$COMMUNITY': pair.community,
+                                 '$COORDINATOR': ' and '.join(coordinator_given_names)})
+        email = header1
 
-            if pair.mentor_contacts != '':
-                outfile.write('To: ' + pair.mentor_contacts + '\n')
-                if args.coordinator:
-                    outfile.write('\t')
-            else:
-                outfile.write('To: ')
+        if pair.mentor_contacts != '':
+            email += 'To: ' + pair.mentor_contacts + '\n'
             if args.coordinator:
-                outfile.write(pair.coordinator_contacts + '\n')
+                email += '\t'
+        else:
+            email += 'To: '
+        if args.coordinator:
+            email += pair.coordinator_contacts + '\n'
 
-            if args.intern:
-                outfile.write('\t' + pair.intern_contacts + '\n')
-            outfile.write('Bcc: organizers@outreachy.org\n')
-            outfile.write(this_body)
-            outfile.write(signature)
+        if args.intern:
+            email += '\t' + pair.intern_contact + '\n'
+        email += 'Bcc: organizers@outreachy.org\n'
+        email += this_body
+        email += signature
+        spool.add(filename, email)
+    spool.close()
 
 if __name__ == "__main__":
     main()
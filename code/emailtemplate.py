@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Email templates with placeholders like NAME or $COMMUNITY, shared by the
+# draft email scripts.
+#
+# A template is split into literal text and placeholders once, when it's
+# created, so filling it in for each recipient is a single join, however
+# many placeholders there are. All placeholders are found in one scan,
+# longest first, so END doesn't match the start of ENDSTUFFINGTIME, and a
+# value that happens to contain a placeholder (a community called
+# "URLs R Us") is never filled in again, which chained str.replace calls
+# get wrong.
+#
+# Each template declares its placeholders, and filling it in with a value
+# for an undeclared placeholder, or without a value for one it uses, is an
+# error rather than a draft with a stray NAME in it.
+#
+# Check which placeholders a template file uses with:
+#
+# $ emailtemplate.py body.txt NAME COMMUNITY URL
+
+import argparse
+import re
+
+class Template:
+    """Text with placeholders, parsed once and filled in many times."""
+    def __init__(self, text, placeholders):
+        self.placeholders = frozenset(placeholders)
+        if not self.placeholders or '' in self.placeholders:
+            raise ValueError('A template needs non-empty placeholder names')
+        pattern = re.compile('|'.join(re.escape(p) for p in
+                                      sorted(self.placeholders, key=lambda p: (-len(p), p))))
+        # Literal text with None where placeholders go, and for each
+        # placeholder in the text, its index in segments and its name.
+        self.segments = []
+        self.slots = []
+        position = 0
+        for m in pattern.finditer(text):
+            self.segments.append(text[position:m.start()])
+            self.slots.append((len(self.segments), m.group()))
+            self.segments.append(None)
+            position = m.end()
+        self.segments.append(text[position:])
+        self.used = frozenset(name for index, name in self.slots)
+
+    @classmethod
+    def from_file(cls, path, placeholders):
+        with open(path, 'r') as f:
+            return cls(f.read(), placeholders)
+
+    def check(self, values):
+        unknown = values.keys() - self.placeholders
+        if unknown:
+            raise ValueError('Not a placeholder of this template: ' + ', '.join(sorted(unknown)))
+        missing = self.used - values.keys()
+        if missing:
+            raise KeyError('No value for placeholder: ' + ', '.join(sorted(missing)))
+
+    def render(self, values):
+        """Fill in the template; values maps placeholders to their text."""
+        self.check(values)
+        parts = list(self.segments)
+        for index, name in self.slots:
+            parts[index] = values[name]
+        return ''.join(parts)
+
+    def render_many(self, rows):
+        """Fill in the template for each dictionary of values in rows, lazily."""
+        segments = self.segments
+        slots = self.slots
+        checked = None
+        for values in rows:
+            # Rows usually all have the same placeholders, so they're only
+            # checked again when the set of keys changes.
+            keys = values.keys()
+            if keys != checked:
+                self.check(values)
+                checked = set(keys)
+            parts = list(segments)
+            for index, name in slots:
+                parts[index] = values[name]
+            yield ''.join(parts)
+
+def main():
+    parser = argparse.ArgumentParser(description='List the placeholders an email template file uses.')
+    parser.add_argument('template', help='Template file')
+    parser.add_argument('placeholders', nargs='+', help='Placeholder names to look for')
+    args = parser.parse_args()
+
+    template = Template.from_file(args.template, args.placeholders)
+    for name in sorted(template.placeholders):
+        count = len([slot for slot in template.slots if slot[1] == name])
+        print(name + ':', count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Approximate matching of hand-typed email addresses (e.g. from a booth
+# sign-up sheet) against the addresses found in resumes.
+#
+# Comparing every booth email with every resume email is too slow, so the
+# resume addresses are indexed by their character bigrams. Each edit
+# changes at most two bigrams, so an address within k edits of the query
+# must share at least one of the query's 2k+1 rarest bigrams. Only the
+# addresses in those posting lists get an edit distance computed, and that
+# gives up as soon as the distance is over k.
+
+import argparse
+import math
+
+Q = 2
+
+def qgrams(s):
+    # Pad the ends so the first and last characters count as much as the others.
+    padded = '^' + s + '$'
+    return set(padded[i:i + Q] for i in range(len(padded) - Q + 1))
+
+def editDistance(a, b, limit):
+    """Return the Levenshtein distance between a and b, or limit + 1 if it's larger than limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(previous[j] + 1,
+                             current[j - 1] + 1,
+                             previous[j - 1] + (ca != cb))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+def confidence(a, b, distance):
+    """Similarity from 0 to 1, like fuzzywuzzy's ratio divided by 100."""
+    return 1 - distance / max(len(a), len(b), 1)
+
+class fuzzyEmailIndex:
+    """Bigram index of email addresses for approximate lookups."""
+    def __init__(self, emails):
+        self.emails = sorted(set(emails))
+        self.postings = {}
+        for index, email in enumerate(self.emails):
+            for gram in qgrams(email):
+                self.postings.setdefault(gram, []).append(index)
+
+    def search(self, email, threshold=0.9):
+        """Return (address, confidence) pairs with confidence of at least
+        threshold, best matches first."""
+        # confidence = 1 - d / max(len) and max(len) <= len(email) + d,
+        # so any match is at most this many edits away. (The epsilon keeps
+        # floating point error from rounding e.g. 3.0 down to 2.)
+        limit = math.floor((1 - threshold) * len(email) / threshold + 1e-9) if threshold > 0 else len(email)
+        grams = sorted(qgrams(email), key=lambda g: len(self.postings.get(g, ())))
+        # If the query has fewer bigrams than that, the addresses share
+        # none of them, and the index can't help.
+        if len(grams) <= Q * limit:
+            candidates = range(len(self.emails))
+        else:
+            candidates = set()
+            for gram in grams[:Q * limit + 1]:
+                candidates.update(self.postings.get(gram, ()))
+
+        matches = []
+        for index in candidates:
+            candidate = self.emails[index]
+            distance = editDistance(email, candidate, limit)
+            if distance > limit:
+                continue
+            score = confidence(email, candidate, distance)
+            if score >= threshold:
+                matches.append((candidate, score))
+        return sorted(matches, key=lambda m: (-m[1], m[0]))
+
+def main():
+    parser = argparse.ArgumentParser(description='Find approximate matches for email addresses.')
+    parser.add_argument('emails', help='File with one known email address per line')
+    parser.add_argument('query', nargs='+', help='Email addresses to look up')
+    parser.add_argument('--threshold', help='Minimum match confidence, from 0 to 1', type=float, default=0.9)
+    args = parser.parse_args()
+
+    with open(args.emails, 'r') as f:
+        index = fuzzyEmailIndex(line.strip() for line in f if line.strip())
+    for email in args.query:
+        for match, score in index.search(email, args.threshold):
+            print('{} {} {:.2f}'.format(email, match, score))
+
+if __name__ == "__main__":
+    main()
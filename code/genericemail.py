@@ -17,7 +17,9 @@
 
 import argparse
 import csv
-import os
+
+from emailtemplate import Template
+from mailspool import MailSpool, add_format_argument
 
 def main():
     parser = argparse.ArgumentParser(
@@ -35,6 +37,14 @@ $ for i in `ls .`; do mutt -F ~/.muttrc-outreachy -H $i; rm $i; done
 If you want to test what the command would do, you can run:
 
 $ for i in `ls .`; do echo mutt -F ~/.muttrc-outreachy -H $i; echo rm $i; done
+
+With --format mbox, all the emails are in one file instead, which one mutt
+can open, so you can look through them and send each one with
+resend-message (Esc e):
+
+$ mutt -F ~/.muttrc-outreachy -f outdir/drafts.mbox
+
+Or send all of them over a few SMTP connections with sendcampaign.py.
 ''',
             )
     parser.add_argument('outdir', help='Directory to create form emails in')
@@ -42,29 +52,26 @@ $ for i in `ls .`; do echo mutt -F ~/.muttrc-outreachy -H $i; echo rm $i; done
     parser.add_argument('fromemail', help='Name and email address to use in the From header')
     parser.add_argument('subject', help='Subject line of email')
     parser.add_argument('messagefile', help='File containing the message body of email')
+    add_format_argument(parser)
     args = parser.parse_args()
 
-    if not os.path.exists(args.outdir):
-            os.makedirs(args.outdir)
+    body = Template.from_file(args.messagefile, ['Hi NAME,'])
 
-    body = ''
-    with open(args.messagefile, 'r') as messageFile:
-        body = messageFile.read()
+    with open(args.csv, 'r') as csvFile:
+        rows = list(csv.DictReader(csvFile, delimiter=',', quotechar='"'))
+    greetings = [{'Hi NAME,': 'Hi ' + row['Name'].split(' ')[0] + ',' if row['Name'] else 'Greetings,'}
+                 for row in rows]
 
     count = 0
-    with open(args.csv, 'r') as csvFile:
-        freader = csv.DictReader(csvFile, delimiter=',', quotechar='"')
-        for row in freader:
-            with open(os.path.join(args.outdir, str(count) + '.txt'), 'w') as email:
-                email.write('From: ' + args.fromemail + '\n')
-                email.write('To: ' + '"' + row['Name'] + '" <' + row['Email'] + '>' + '\n')
-                email.write('Subject: ' + args.subject + '\n')
-                email.write('\n')
-                if row['Name']:
-                    email.write(body.replace('Hi NAME,', 'Hi ' + row['Name'].split(' ')[0] + ','))
-                else:
-                    email.write(body.replace('Hi NAME,', 'Greetings,'))
-                count += 1
+    with MailSpool(args.outdir, args.format) as spool:
+        for row, text in zip(rows, body.render_many(greetings)):
+            email = 'From: ' + args.fromemail + '\n'
+            email += 'To: ' + '"' + row['Name'] + '" <' + row['Email'] + '>' + '\n'
+            email += 'Subject: ' + args.subject + '\n'
+            email += '\n'
+            email += text
+            spool.add(str(count) + '.txt', email)
+            count += 1
 
     print('Wrote ', count + 1, ' draft emails to ', args.outdir)
 
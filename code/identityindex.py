@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Figure out which resumes belong to the same person.
+#
+# Email addresses are compared in a canonical form: lowercase, without the
+# stray punctuation the resume email regex picks up around them, without
+# +tags, and for Gmail, without the dots Gmail ignores. So
+# Jane.Doe+resume@GoogleMail.com and janedoe@gmail.com are the same person.
+#
+# An identityIndex holds every resume set of a run (the resumes to process,
+# the done resumes, the non-U.S. resumes), built in one pass over them. It
+# answers, with one dictionary lookup each:
+#  - which resumes mention an email address (for booth sign-ups)
+#  - which resumes have it as their own address, i.e. the first address in
+#    the resume (for duplicate resumes and people who were already contacted)
+#
+# $ identityindex.py tapia-2017/ tapia-2017-done/
+#
+# lists the people with more than one resume in those directories.
+
+import argparse
+import re
+
+# Gmail ignores dots in the local part, and googlemail.com is the same as gmail.com.
+GMAILDOMAINS = {'gmail.com', 'googlemail.com'}
+
+localPartPattern = re.compile(r"[a-z0-9!#$%&'*+/=?^_`{|}~.-]+$")
+domainPattern = re.compile(r'^[a-z0-9.-]+')
+
+def canonicalEmail(email):
+    """Return the canonical form of an email address, to compare addresses with."""
+    email = email.strip().lower()
+    local, at, domain = email.rpartition('@')
+    if not at:
+        return email
+    # The resume email regex also picks up things like 'email:' or '<'
+    # before an address and a period after it.
+    m = localPartPattern.search(local)
+    local = m.group(0).strip('.') if m else local
+    m = domainPattern.match(domain)
+    domain = m.group(0).strip('.-') if m else domain
+    tagless = local.split('+', 1)[0]
+    if tagless:
+        local = tagless
+    if domain in GMAILDOMAINS:
+        local = local.replace('.', '')
+        domain = 'gmail.com'
+    return local + '@' + domain
+
+def primaryEmail(resume):
+    """The canonical address of the resume's owner: the first one in it, or None."""
+    if not resume.emails:
+        return None
+    return canonicalEmail(resume.emails[0])
+
+class identityIndex:
+    """Resumes from several resume sets, by canonical email address."""
+    def __init__(self, resumeSets=()):
+        # Canonical email -> [(set name, resume)] for every address in a resume.
+        self.mentions = {}
+        # Canonical email -> [(set name, resume)] for the owner of the resume.
+        self.owners = {}
+        # Set names, in the order they were added.
+        self.setNames = []
+        for setName, resumeFiles in resumeSets:
+            self.add(setName, resumeFiles)
+
+    def add(self, setName, resumeFiles):
+        self.setNames.append(setName)
+        for resume in resumeFiles:
+            emails = [canonicalEmail(e) for e in resume.emails]
+            for email in dict.fromkeys(emails):
+                self.mentions.setdefault(email, []).append((setName, resume))
+            if emails:
+                self.owners.setdefault(emails[0], []).append((setName, resume))
+
+    def emails(self):
+        """Every canonical address mentioned in a resume."""
+        return self.mentions.keys()
+
+    def lookup(self, email):
+        """Return [(set name, resume)] for the resumes that mention email."""
+        return self.mentions.get(canonicalEmail(email), [])
+
+    def resumesOf(self, email, setName):
+        """Return the resumes in a set that belong to the owner of email."""
+        return [resume for s, resume in self.owners.get(canonicalEmail(email), []) if s == setName]
+
+    def duplicates(self, setName):
+        """Return (canonical email, resumes) for everyone with more than one resume in a set."""
+        found = []
+        for email, entries in self.owners.items():
+            resumes = [resume for s, resume in entries if s == setName]
+            if len(resumes) > 1:
+                found.append((email, resumes))
+        return found
+
+    def reportDuplicates(self, setName):
+        for email, resumes in self.duplicates(setName):
+            print('Email duplicate:', email, ' '.join(resume.pdfFileName for resume in resumes))
+
+def main():
+    # Imported here because resumesearch imports this module.
+    from resumesearch import readResumeFiles
+
+    parser = argparse.ArgumentParser(description='List people with more than one resume.')
+    parser.add_argument('dir', nargs='+', help='Directories with .txt resume files (or corpora packed from them with resumecorpus.py)')
+    args = parser.parse_args()
+
+    index = identityIndex((directory, readResumeFiles(directory)) for directory in args.dir)
+    for email, entries in index.owners.items():
+        if len(entries) > 1:
+            print(email, ' '.join(setName + '/' + resume.pdfFileName for setName, resume in entries))
+
+if __name__ == "__main__":
+    main()
@@ -19,9 +19,11 @@
 
 import argparse
 import csv
-import os
 import datetime
 
+from emailtemplate import Template
+from mailspool import MailSpool, add_format_argument
+
 header1 = '''From: Outreachy Organizers <organizers@outreachy.org>
 '''
 header3 = '''Subject: Outreachy needs your help!
@@ -113,6 +115,9 @@ URL
 Outreachy Organizers
 '''
 
+PLACEHOLDERS = ['DUEDATE', 'STUFFINGDATE', 'ENDSTUFFINGTIME', 'URL', 'TOTAL',
+                'PROGRAM', 'COMMUNITY', 'START', 'END', 'NAME']
+
 def main():
     parser = argparse.ArgumentParser(description='Send an email to Outreachy alums to ask them to participate in the longitudinal survey')
     parser.add_argument('--outdir', help='Directory to create form emails in')
@@ -124,11 +129,9 @@ def main():
     parser.add_argument('--totalinterns', help='Manually set the total number of interns. Required for reminder emails. Set to 0 to use the number of recipients in the CSV file', type=int)
     parser.add_argument('--reminder', help='Set to 0 if sending the first email, 1 for a mid-point reminder, and 2 for a final reminder', type=int, default=0)
     parser.add_argument('--surveyheader', help='CSV header for whether a participant responded to the survey')
+    add_format_argument(parser)
     args = parser.parse_args()
 
-    if not os.path.exists(args.outdir):
-            os.makedirs(args.outdir)
-
     data = []
     with open(args.csv, 'r') as csvFile:
         freader = csv.DictReader(csvFile, delimiter=',', quotechar='"')
@@ -140,40 +143,42 @@ def main():
     else:
         total_interns = args.totalinterns
 
-    written_emails = 0
+    # A reminder goes above the full email, after its own subject.
+    if args.reminder == 1:
+        template = Template(reminder_subject + reminder_body + body, PLACEHOLDERS)
+    elif args.reminder == 2:
+        template = Template(final_reminder_subject + final_reminder_body + body, PLACEHOLDERS)
+    else:
+        template = Template(header3 + body, PLACEHOLDERS)
+    # Values that are the same for every email.
+    common = {
+        'DUEDATE': args.duedate.strftime('%B %d'),
+        'STUFFINGDATE': args.stuffingdate.strftime('%B %d from %H:%M'),
+        'ENDSTUFFINGTIME': args.endstuffingdate.strftime('%H:%M'),
+        'URL': args.survey,
+        'TOTAL': str(total_interns),
+    }
+
+    recipients = []
     for index, row in enumerate(data):
         if row['Correct email address?'] == 'No':
             continue
         if args.reminder and args.surveyheader and row[args.surveyheader] == 'Yes':
             continue
+        recipients.append((index, row))
 
-        with open(os.path.join(args.outdir, str(index) + '.txt'), 'w') as email:
-            email.write(header1)
-            email.write('To: "' + row['Public Name'] + '" <' + row['Email'] + '>\n')
-            if args.reminder == 1:
-                email.write(reminder_subject)
-                this_reminder_body = reminder_body.replace('PROGRAM', row['Program Name'])
-                this_reminder_body = this_reminder_body.replace('URL', args.survey)
-                email.write(this_reminder_body)
-            elif args.reminder == 2:
-                email.write(final_reminder_subject)
-                this_reminder_body = final_reminder_body.replace('PROGRAM', row['Program Name'])
-                this_reminder_body = this_reminder_body.replace('DUEDATE', args.duedate.strftime('%B %d'))
-                this_reminder_body = this_reminder_body.replace('URL', args.survey)
-                email.write(this_reminder_body)
-            else:
-                email.write(header3)
-            thisbody = body.replace('DUEDATE', args.duedate.strftime('%B %d'))
-            thisbody = thisbody.replace('STUFFINGDATE', args.stuffingdate.strftime('%B %d from %H:%M'))
-            thisbody = thisbody.replace('ENDSTUFFINGTIME', args.endstuffingdate.strftime('%H:%M'))
-            thisbody = thisbody.replace('URL', args.survey)
-            thisbody = thisbody.replace('TOTAL', str(total_interns))
-            thisbody = thisbody.replace('PROGRAM', row['Program Name'])
-            thisbody = thisbody.replace('COMMUNITY', row['Community'])
-            thisbody = thisbody.replace('START', row['Round Start Date'])
-            thisbody = thisbody.replace('END', row['Round End Date'])
-            thisbody = thisbody.replace('NAME', row['Public Name'].split(' ')[0])
-            email.write(thisbody)
+    written_emails = 0
+    with MailSpool(args.outdir, args.format) as spool:
+        texts = template.render_many(dict(common,
+                                          PROGRAM=row['Program Name'],
+                                          COMMUNITY=row['Community'],
+                                          START=row['Round Start Date'],
+                                          END=row['Round End Date'],
+                                          NAME=row['Public Name'].split(' ')[0])
+                                     for index, row in recipients)
+        for (index, row), text in zip(recipients, texts):
+            email = header1 + 'To: "' + row['Public Name'] + '" <' + row['Email'] + '>\n' + text
+            spool.add(str(index) + '.txt', email)
             written_emails += 1
 
     print('Wrote', written_emails, 'draft emails to', args.outdir)
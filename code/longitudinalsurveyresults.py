@@ -15,91 +15,401 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
-# Create a set of generic form emails when we don't have a resume match.
+# Print statistics from the Outreachy longitudinal survey.
+#
+# The survey export is read a block of rows at a time into columns: for each
+# question, an array with a small integer code for every alum's answer, and
+# the list of answers the codes stand for. Every statistic is then counted in
+# one pass over those columns with NumPy (how many alums gave each answer to
+# each question, and the few lists of names and free-text answers the report
+# prints), and the report is printed from the counts.
+#
+# With --cache, the columns are kept in a binary cache next to the export,
+# and later runs load them from there instead of parsing the CSV again; see
+# surveycache.py.
+#
+# Counts of different parts of the survey add up to the counts of the whole
+# survey, so a big export is counted a block of rows at a time (in parallel
+# with --jobs), and parts of an export can be counted on different machines
+# and combined:
+#
+# $ longitudinalsurveyresults.py --csv part1.csv --successes 1 --save-partial part1.json
+# $ longitudinalsurveyresults.py --csv part2.csv --successes 1 --save-partial part2.json
+# $ longitudinalsurveyresults.py --merge part1.json part2.json --successes 1
+#
+# This needs NumPy:
+# $ pip3 install numpy
 
 import argparse
 import csv
+import json
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import itemgetter
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError('Survey statistics need NumPy; install it with: pip3 install numpy') from e
+
+RACE = 'What is your race and ethnicity? (Select all that apply)/'
+GENDER = 'What is your gender identity? (Select all that apply)/'
+TRANSGENDER = 'Do you identify as transgender?'
+BEFORE = 'In the three months before your Outreachy internship, were you:'
+BEFORE_OTHER = 'In the three months before your Outreachy internship, what was your employment or educational situation?'
+CURRENT = 'Are you currently:'
+CURRENT_OTHER = 'What is your current employment or educational situation?'
+NO_SPONSOR = 'After your Outreachy internship, were you employed at any of the following Outreachy sponsors?/None of the above'
+USED_FOSS = 'In the last year, have you used free software / open source?'
+CONTRIBUTED = 'In the last year, have you contributed to free software / open source with:'
+NOT_CONTRIBUTED = 'No, I have not contributed to free software / open source in the last year'
+GSOC = 'After your Outreachy internship, did you participate in Google Summer of Code? (Select all that apply)/'
+GSOD = 'After your Outreachy internship, did you participate in Google Season of Docs? (Select all that apply)/'
+GAVE_TALK = 'During or after your Outreachy internship, did you give a talk or presentation on free software/open source?'
+VOLUNTEERED = 'After your Outreachy internship, did you volunteer for Outreachy? (Select all that apply)/'
+BECAME_MENTOR = 'After your Outreachy internship, did you become a mentor?'
+FIRST_NAME = 'First Name / Given Name'
+LAST_NAME = 'Last Name / Family Name'
+AWARDS = 'After your Outreachy internship, did you win any awards?'
+LEADERSHIP = 'After your Outreachy internship, did you take on any leadership roles?'
+SUCCESS_STORY = 'Tell us more about your successes after Outreachy!'
+
+# Questions whose answers are counted over all alums.
+COUNTED = [
+    RACE + 'Asian',
+    RACE + 'Black',
+    RACE + 'Hispanic or Latinx',
+    RACE + 'Middle Eastern',
+    RACE + 'White',
+    'Are you a member of a historically disadvantaged caste / scheduled caste?',
+    'Are you a member of a historically disadvantaged tribe?',
+    GENDER + 'Man',
+    GENDER + 'Woman',
+    GENDER + 'Non-binary',
+    GENDER + "My gender isn't listed here",
+    TRANSGENDER,
+    BEFORE,
+    CURRENT,
+    USED_FOSS,
+    CONTRIBUTED,
+    GSOC + 'Yes, I was a GSoD intern',
+    GSOC + 'Yes, I was a GSoD mentor',
+    GSOC + 'Yes, I was a GSoD org admin',
+    GSOD + 'Yes, I was a GSoD intern',
+    GSOD + 'Yes, I was a GSoD mentor',
+    GSOD + 'Yes, I was a GSoD org admin',
+    GAVE_TALK,
+    VOLUNTEERED + 'Yes, I was an Outreachy coordinator',
+    VOLUNTEERED + 'Yes, I was an Outreachy mentor',
+    VOLUNTEERED + 'Yes, I was an informal Outreachy volunteer',
+    BECAME_MENTOR,
+]
+
+# Questions about school or work, counted by the answer to CURRENT as well.
+COUNTED_BY_CURRENT = [
+    'Are you a student in a science, technology, engineering, or mathematics field?',
+    'Do you use free software / open source to complete your student projects or research?',
+    'Do you contribute to free software / open source as part of your student projects or research?',
+    'Are you employed in the technology industry?',
+    NO_SPONSOR,
+    'Does your job involve using free software / open source?',
+    'Does your job involve contributing to free software / open source?',
+]
+
+# Every question the report reads.
+QUESTIONS = COUNTED + COUNTED_BY_CURRENT + [
+        BEFORE_OTHER, CURRENT_OTHER, FIRST_NAME, LAST_NAME, AWARDS, LEADERSHIP, SUCCESS_STORY]
 
 def print_percentage(name, partial, total):
     print('{}: {:.0f}% ({})'.format(name, float(partial / total * 100), partial))
 
-def race_and_ethnicity_demographics(data):
-    # demographics:
-    # 'What is your race and ethnicity? (Select all that apply)/Asian'
-    total_alums = 0
-    asian_alums = 0
-    black_alums = 0
-    hispanic_or_latinx_alums = 0
-    indigenous_alums = 0
-    middle_eastern_alums = 0
-    white_alums = 0
-    disadvantaged_caste = 0
-    disadvantaged_tribe = 0
-    for index, row in enumerate(data):
-        total_alums += 1
-        if row['What is your race and ethnicity? (Select all that apply)/Asian'] == '1':
-            asian_alums += 1
-        if row['What is your race and ethnicity? (Select all that apply)/Black'] == '1':
-            black_alums += 1
-        if row['What is your race and ethnicity? (Select all that apply)/Hispanic or Latinx'] == '1':
-            hispanic_or_latinx_alums += 1
-        if row['What is your race and ethnicity? (Select all that apply)/Indigenous'] == '1':
-            indigenous_alums += 1
-        if row['What is your race and ethnicity? (Select all that apply)/Middle Eastern'] == '1':
-            middle_eastern_alums += 1
-        if row['What is your race and ethnicity? (Select all that apply)/White'] == '1':
-            white_alums += 1
-        if row['Are you a member of a historically disadvantaged caste / scheduled caste?'] == 'Yes':
-            disadvantaged_caste += 1
-        if row['Are you a member of a historically disadvantaged tribe?'] == 'Yes':
-            disadvantaged_tribe += 1
-
+class SurveyColumns:
+    """Survey responses, one dictionary-encoded column per question.
+
+    codes[question] has a code for every alum, and answers[question][code]
+    is the answer it stands for.
+    """
+    def __init__(self, rows, codes, answers):
+        self.rows = rows
+        self.codes = codes
+        self.answers = answers
+
+    def code(self, question, answer):
+        """The code of answer in question's column, or -1 if nobody gave it."""
+        try:
+            return self.answers[question].index(answer)
+        except ValueError:
+            return -1
+
+    def equals(self, question, answer):
+        return self.codes[question] == self.code(question, answer)
+
+    def nonempty(self, question):
+        return self.codes[question] != self.code(question, '')
+
+    def answers_at(self, question, rows):
+        """The answers to question in the given rows."""
+        answers = self.answers[question]
+        return [answers[code] for code in self.codes[question][rows].tolist()]
+
+# Rows are read and encoded this many at a time, so the whole export is
+# never in memory as Python strings.
+BLOCKSIZE = 10000
+
+class ColumnEncoder:
+    """Codes for the answers in one column, added to a block at a time."""
+    def __init__(self):
+        # Answers are numbered in the order they first appear.
+        self.index = {}
+        self.blocks = []
+
+    def add(self, values):
+        index = self.index
+        for answer in dict.fromkeys(values):
+            if answer not in index:
+                index[answer] = len(index)
+        self.blocks.append(np.fromiter(map(index.__getitem__, values), dtype=np.int32, count=len(values)))
+
+    def finish(self):
+        codes = np.concatenate(self.blocks) if self.blocks else np.zeros(0, dtype=np.int32)
+        return codes, list(self.index)
+
+def read_blocks(csvFile, blocksize=BLOCKSIZE):
+    """Yield the header of a ';'-separated survey export, then lists of up to
+    blocksize rows, each as long as the header."""
+    freader = csv.reader(csvFile, delimiter=';', quotechar='"')
+    header = next(freader, [])
+    yield header
+    width = len(header)
+    while True:
+        block = list(islice(freader, blocksize))
+        if not block:
+            return
+        if set(map(len, block)) != {width}:
+            # Like csv.DictReader: blank lines are skipped, and missing
+            # answers at the end of a short row are None.
+            block = [row[:width] + [None] * (width - len(row)) for row in block if row]
+        yield block
+
+def question_positions(header, questions=None):
+    """Map the given questions (or all of them) to their position in header."""
+    # If a question is in the header twice, its last column wins, like csv.DictReader.
+    positions = {question: position for position, question in enumerate(header)}
+    if questions is not None:
+        positions = {question: positions[question] for question in questions if question in positions}
+    return positions
+
+def read_columns(csvFile, questions=None):
+    """Read a ';'-separated survey export into SurveyColumns, with only the
+    given questions (or all of them)."""
+    blocks = read_blocks(csvFile)
+    positions = question_positions(next(blocks), questions)
+    encoders = {question: ColumnEncoder() for question in positions}
+    rows = 0
+    for block in blocks:
+        rows += len(block)
+        for question, position in positions.items():
+            encoders[question].add(list(map(itemgetter(position), block)))
+    codes = {}
+    answers = {}
+    for question, encoder in encoders.items():
+        codes[question], answers[question] = encoder.finish()
+    return SurveyColumns(rows, codes, answers)
+
+# The version of the partial counts written by --save-partial.
+PARTIALVERSION = 1
+
+class SurveyCounts:
+    """Everything the report needs, counted from SurveyColumns.
+
+    Counts of different parts of the survey can be merged, in survey order,
+    into the counts of the whole survey.
+    """
+    def __init__(self, successes=False):
+        self.rows = 0
+        # question -> Counter of answers
+        self.answers = {question: Counter() for question in COUNTED}
+        # question -> Counter of (answer to CURRENT, answer)
+        self.by_current = {question: Counter() for question in COUNTED_BY_CURRENT}
+        # Free-text answers of alums who said Other, in survey order.
+        self.before_other = []
+        self.current_other = []
+        # (first name, last name, role) of Outreachy coordinators and mentors, in survey order.
+        self.volunteers = []
+        # (first name, last name, awards, leadership roles, success story), in
+        # survey order, or None if success stories weren't collected.
+        self.successes = [] if successes else None
+
+    def count(self, question, answer):
+        return self.answers[question][answer]
+
+    def count_if(self, question, test):
+        return sum(count for answer, count in self.answers[question].items() if test(answer))
+
+    def count_by_current(self, current, question, test):
+        return sum(count for (group, answer), count in self.by_current[question].items()
+                   if group == current and test(answer))
+
+    def merge(self, other):
+        """Add the counts of the part of the survey that comes after this one."""
+        if self.successes is not None and other.successes is None:
+            raise ValueError('Success stories were not collected for all parts of the survey')
+        self.rows += other.rows
+        for question, counter in other.answers.items():
+            self.answers[question].update(counter)
+        for question, counter in other.by_current.items():
+            self.by_current[question].update(counter)
+        self.before_other.extend(other.before_other)
+        self.current_other.extend(other.current_other)
+        self.volunteers.extend(other.volunteers)
+        if self.successes is not None:
+            self.successes.extend(other.successes)
+
+    def save(self, path):
+        # Answers can be None, so counters are written as lists of pairs.
+        partial = {
+            'version': PARTIALVERSION,
+            'rows': self.rows,
+            'answers': {question: list(counter.items()) for question, counter in self.answers.items()},
+            'by_current': {question: [[group, answer, count] for (group, answer), count in counter.items()]
+                           for question, counter in self.by_current.items()},
+            'before_other': self.before_other,
+            'current_other': self.current_other,
+            'volunteers': self.volunteers,
+            'successes': self.successes,
+        }
+        with open(path, 'w') as f:
+            json.dump(partial, f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            partial = json.load(f)
+        if partial.get('version') != PARTIALVERSION:
+            raise ValueError(path + ' was not written by this version of longitudinalsurveyresults.py')
+        counts = cls(partial['successes'] is not None)
+        counts.rows = partial['rows']
+        for question in COUNTED:
+            counts.answers[question] = Counter({answer: count for answer, count in partial['answers'][question]})
+        for question in COUNTED_BY_CURRENT:
+            counts.by_current[question] = Counter({(group, answer): count
+                                                   for group, answer, count in partial['by_current'][question]})
+        counts.before_other = partial['before_other']
+        counts.current_other = partial['current_other']
+        counts.volunteers = [tuple(volunteer) for volunteer in partial['volunteers']]
+        if counts.successes is not None:
+            counts.successes = [tuple(success) for success in partial['successes']]
+        return counts
+
+def histogram(codes, answers):
+    counts = np.bincount(codes, minlength=len(answers))
+    return Counter({answer: int(count) for answer, count in zip(answers, counts) if count})
+
+def count_survey(columns, successes=False):
+    """Count all the statistics in columns, and collect the names and
+    free-text answers the report prints. Returns SurveyCounts."""
+    counts = SurveyCounts(successes)
+    counts.rows = columns.rows
+    for question in COUNTED:
+        counts.answers[question] = histogram(columns.codes[question], columns.answers[question])
+
+    current = columns.codes[CURRENT].astype(np.int64)
+    currentAnswers = columns.answers[CURRENT]
+    for question in COUNTED_BY_CURRENT:
+        answers = columns.answers[question]
+        pairs = current * len(answers) + columns.codes[question]
+        counted = np.bincount(pairs, minlength=len(currentAnswers) * len(answers))
+        counts.by_current[question] = Counter({
+                (currentAnswers[pair // len(answers)], answers[pair % len(answers)]): int(counted[pair])
+                for pair in np.flatnonzero(counted)})
+
+    counts.before_other = columns.answers_at(BEFORE_OTHER, np.flatnonzero(columns.equals(BEFORE, 'Other')))
+    counts.current_other = columns.answers_at(CURRENT_OTHER, np.flatnonzero(columns.equals(CURRENT, 'Other')))
+
+    coordinators = columns.equals(VOLUNTEERED + 'Yes, I was an Outreachy coordinator', '1')
+    mentors = columns.equals(VOLUNTEERED + 'Yes, I was an Outreachy mentor', '1')
+    rows = np.flatnonzero(coordinators | mentors)
+    for first_name, last_name, coordinator, mentor in zip(columns.answers_at(FIRST_NAME, rows),
+                                                          columns.answers_at(LAST_NAME, rows),
+                                                          coordinators[rows].tolist(), mentors[rows].tolist()):
+        if coordinator:
+            counts.volunteers.append((first_name, last_name, "Outreachy coordinator"))
+        if mentor:
+            counts.volunteers.append((first_name, last_name, "Outreachy mentor"))
+
+    if successes:
+        told = columns.nonempty(AWARDS) | columns.nonempty(LEADERSHIP) | columns.nonempty(SUCCESS_STORY)
+        rows = np.flatnonzero(told)
+        counts.successes = list(zip(*(columns.answers_at(question, rows) for question in
+                                      (FIRST_NAME, LAST_NAME, AWARDS, LEADERSHIP, SUCCESS_STORY))))
+    return counts
+
+def count_block(questions, values, rows, successes=False):
+    """Count one block of rows, given as the values of each of questions."""
+    codes = {}
+    answers = {}
+    for question, column in zip(questions, values):
+        encoder = ColumnEncoder()
+        encoder.add(column)
+        codes[question], answers[question] = encoder.finish()
+    return count_survey(SurveyColumns(rows, codes, answers), successes)
+
+def count_csv(csvFile, successes=False, jobs=1, blocksize=BLOCKSIZE):
+    """Count a ';'-separated survey export a block of rows at a time, in
+    jobs processes, and return the merged SurveyCounts.
+
+    Only a few blocks are read ahead of the ones being counted, so memory
+    use doesn't grow with the size of the export.
+    """
+    blocks = read_blocks(csvFile, blocksize)
+    positions = question_positions(next(blocks), QUESTIONS)
+    questions = list(positions)
+    work = ((questions, [list(map(itemgetter(position), block)) for position in positions.values()],
+             len(block), successes) for block in blocks)
+    total = SurveyCounts(successes)
+    if jobs <= 1:
+        for arguments in work:
+            total.merge(count_block(*arguments))
+        return total
+    with ProcessPoolExecutor(jobs) as executor:
+        # Blocks are merged in the order they were read, so the lists of
+        # names come out in survey order.
+        pending = deque()
+        for arguments in work:
+            pending.append(executor.submit(count_block, *arguments))
+            if len(pending) >= jobs * 2:
+                total.merge(pending.popleft().result())
+        while pending:
+            total.merge(pending.popleft().result())
+    return total
+
+def race_and_ethnicity_demographics(counts):
+    total_alums = counts.rows
     print('Total alums: {}'.format(total_alums))
-    print_percentage('Asian', asian_alums, total_alums)
-    print_percentage('Black', black_alums, total_alums)
-    print_percentage('Hispanic or Latinx', hispanic_or_latinx_alums, total_alums)
-    print_percentage('Middle Eastern', middle_eastern_alums, total_alums)
-    print_percentage('White', white_alums, total_alums)
-    print_percentage('Historically disadvantaged caste or scheduled caste', disadvantaged_caste, total_alums)
-    print_percentage('Historically disadvantaged tribe', disadvantaged_tribe, total_alums)
-
-def gender_identities_demographics(data):
-    # demographics:
-    # 'What is your gender identity? (Select all that apply)/Woman'
-    total_alums = 0
-    men_alums = 0
-    women_alums = 0
-    non_binary_alums = 0
-    other_gender_identity = 0
-    cis_alums = 0
-    trans_alums = 0
-    for index, row in enumerate(data):
-        total_alums += 1
-        if row['What is your gender identity? (Select all that apply)/Man'] == '1':
-            men_alums += 1
-        if row['What is your gender identity? (Select all that apply)/Woman'] == '1':
-            women_alums += 1
-        if row['What is your gender identity? (Select all that apply)/Non-binary'] == '1':
-            non_binary_alums += 1
-        if row["What is your gender identity? (Select all that apply)/My gender isn't listed here"] == '1':
-            other_gender_identity += 1
-
-        if row['Do you identify as transgender?'] == 'No':
-            cis_alums += 1
-        elif row['Do you identify as transgender?'] == 'Yes':
-            trans_alums += 1
-
+    print_percentage('Asian', counts.count(RACE + 'Asian', '1'), total_alums)
+    print_percentage('Black', counts.count(RACE + 'Black', '1'), total_alums)
+    print_percentage('Hispanic or Latinx', counts.count(RACE + 'Hispanic or Latinx', '1'), total_alums)
+    print_percentage('Middle Eastern', counts.count(RACE + 'Middle Eastern', '1'), total_alums)
+    print_percentage('White', counts.count(RACE + 'White', '1'), total_alums)
+    print_percentage('Historically disadvantaged caste or scheduled caste',
+                     counts.count('Are you a member of a historically disadvantaged caste / scheduled caste?', 'Yes'), total_alums)
+    print_percentage('Historically disadvantaged tribe',
+                     counts.count('Are you a member of a historically disadvantaged tribe?', 'Yes'), total_alums)
+
+def gender_identities_demographics(counts):
+    total_alums = counts.rows
     print("")
     print("Gender Identities")
     print("---")
-    print_percentage('Men', men_alums, total_alums)
-    print_percentage('Women', women_alums, total_alums)
-    print_percentage('Non-binary', non_binary_alums, total_alums)
-    print_percentage('Other gender identity', other_gender_identity, total_alums)
-    print_percentage('Cisgender', cis_alums, total_alums)
-    print_percentage('Transgender', trans_alums, total_alums)
-
-def before_outreachy_statistics(data):
+    print_percentage('Men', counts.count(GENDER + 'Man', '1'), total_alums)
+    print_percentage('Women', counts.count(GENDER + 'Woman', '1'), total_alums)
+    print_percentage('Non-binary', counts.count(GENDER + 'Non-binary', '1'), total_alums)
+    print_percentage('Other gender identity', counts.count(GENDER + "My gender isn't listed here", '1'), total_alums)
+    print_percentage('Cisgender', counts.count(TRANSGENDER, 'No'), total_alums)
+    print_percentage('Transgender', counts.count(TRANSGENDER, 'Yes'), total_alums)
+
+def before_outreachy_statistics(counts):
     # overview:
     # 'In the three months before your Outreachy internship, were you:'
     #  - "A student"
@@ -107,41 +417,25 @@ def before_outreachy_statistics(data):
     #  - "Unemployed"
     #  - "Other"
     #  - "A full-time parent"
-    student_applicants = 0
-    employed_applicants = 0
-    unemployed_applicants = 0
-    other_applicants = 0
-    parent_applicants = 0
-    total_applicants = 0
+    total_applicants = counts.rows
 
     print()
     print("Before Outreachy")
     print("---")
     print()
 
-    for index, row in enumerate(data):
-        total_applicants += 1
-        if row['In the three months before your Outreachy internship, were you:'] == 'A student':
-            student_applicants += 1
-        elif row['In the three months before your Outreachy internship, were you:'] == 'Employed':
-            employed_applicants += 1
-        elif row['In the three months before your Outreachy internship, were you:'] == 'Unemployed':
-            unemployed_applicants += 1
-        elif row['In the three months before your Outreachy internship, were you:'] == 'A full time parent':
-            parent_applicants += 1
-        elif row['In the three months before your Outreachy internship, were you:'] == 'Other':
-            other_applicants += 1
-            print("Other:", row['In the three months before your Outreachy internship, what was your employment or educational situation?'])
+    for situation in counts.before_other:
+        print("Other:", situation)
 
     print()
     print('Total alums: {}'.format(total_applicants))
-    print_percentage('Students', student_applicants, total_applicants)
-    print_percentage('Employed', employed_applicants, total_applicants)
-    print_percentage('Unemployed', unemployed_applicants, total_applicants)
-    print_percentage('Parents', parent_applicants, total_applicants)
-    print_percentage('Other', other_applicants, total_applicants)
+    print_percentage('Students', counts.count(BEFORE, 'A student'), total_applicants)
+    print_percentage('Employed', counts.count(BEFORE, 'Employed'), total_applicants)
+    print_percentage('Unemployed', counts.count(BEFORE, 'Unemployed'), total_applicants)
+    print_percentage('Parents', counts.count(BEFORE, 'A full time parent'), total_applicants)
+    print_percentage('Other', counts.count(BEFORE, 'Other'), total_applicants)
 
-def retention_statistics(data):
+def retention_statistics(counts):
     # overview:
     # 'Are you currently:'
     #  - "A student"
@@ -149,218 +443,156 @@ def retention_statistics(data):
     #  - "Unemployed"
     #  - "Other"
     #  - "A full-time parent"
-    student_alums = 0
-    stem_student_alums = 0
-    student_alums_who_use_foss_in_school = 0
-    student_alums_who_contribute_to_foss_in_school = 0
-    employed_alums = 0
-    tech_employed_alums = 0
-    sponsor_employed_alums = 0
-    employed_alums_who_use_foss_at_work = 0
-    employed_alums_who_contribute_to_foss_at_work = 0
-    unemployed_alums = 0
-    other_alums = 0
-    parent_alums = 0
-    total_alums = 0
+    total_alums = counts.rows
+    student_alums = counts.count(CURRENT, 'A student')
+    employed_alums = counts.count(CURRENT, 'Employed')
+
+    def students(question, test=lambda answer: answer == 'Yes'):
+        return counts.count_by_current('A student', question, test)
+
+    def employees(question, test=lambda answer: answer == 'Yes'):
+        return counts.count_by_current('Employed', question, test)
 
     print()
     print("Current Employment and Education status of alums")
     print("---")
     print()
-    for index, row in enumerate(data):
-        total_alums += 1
-        if row['Are you currently:'] == 'A student':
-            student_alums += 1
-            if row['Are you a student in a science, technology, engineering, or mathematics field?'] == 'Yes':
-                stem_student_alums += 1
-            if row['Do you use free software / open source to complete your student projects or research?'] == 'Yes':
-                student_alums_who_use_foss_in_school += 1
-            if row['Do you contribute to free software / open source as part of your student projects or research?'] == 'Yes':
-                student_alums_who_contribute_to_foss_in_school += 1
-        elif row['Are you currently:'] == 'Employed':
-            employed_alums += 1
-            if row['Are you employed in the technology industry?'] == 'Yes':
-                tech_employed_alums += 1
-            if row['After your Outreachy internship, were you employed at any of the following Outreachy sponsors?/None of the above'] != '1':
-                sponsor_employed_alums += 1
-            if row['Does your job involve using free software / open source?'] == 'Yes':
-                employed_alums_who_use_foss_at_work += 1
-            if row['Does your job involve contributing to free software / open source?'] == 'Yes':
-                employed_alums_who_contribute_to_foss_at_work += 1
-        elif row['Are you currently:'] == 'Unemployed':
-            unemployed_alums += 1
-        elif row['Are you currently:'] == 'A full-time parent':
-            parent_alums += 1
-        elif row['Are you currently:'] == 'Other':
-            other_alums += 1
-            print("Other:", row['What is your current employment or educational situation?'])
+    for situation in counts.current_other:
+        print("Other:", situation)
 
     print()
     print('Total alums: {}'.format(total_alums))
     print_percentage('Students', student_alums, total_alums)
-    print_percentage(' - STEM students', stem_student_alums, student_alums)
-    print_percentage(' - Students who use FOSS for school projects or research', student_alums_who_use_foss_in_school, student_alums)
-    print_percentage(' - Students who contribute to FOSS for school projects or research', student_alums_who_contribute_to_foss_in_school, student_alums)
+    print_percentage(' - STEM students',
+                     students('Are you a student in a science, technology, engineering, or mathematics field?'), student_alums)
+    print_percentage(' - Students who use FOSS for school projects or research',
+                     students('Do you use free software / open source to complete your student projects or research?'), student_alums)
+    print_percentage(' - Students who contribute to FOSS for school projects or research',
+                     students('Do you contribute to free software / open source as part of your student projects or research?'), student_alums)
     print_percentage('Employed', employed_alums, total_alums)
-    print_percentage(' - Tech employees', tech_employed_alums, employed_alums)
-    print_percentage(' - Employed by sponsor after internship', sponsor_employed_alums, employed_alums)
-    print_percentage(' - Employees who use FOSS as part of their job', employed_alums_who_use_foss_at_work, employed_alums)
-    print_percentage(' - Employees who contribute to FOSS as part of their job', employed_alums_who_contribute_to_foss_at_work, employed_alums)
-    print_percentage('Unemployed', unemployed_alums, total_alums)
-    print_percentage('Parents', parent_alums, total_alums)
-
-def foss_retention(data):
-    total_alums = 0
-    use_foss = 0
-    contribute_to_foss = 0
-    do_not_contribute_to_foss = 0
+    print_percentage(' - Tech employees', employees('Are you employed in the technology industry?'), employed_alums)
+    print_percentage(' - Employed by sponsor after internship', employees(NO_SPONSOR, lambda answer: answer != '1'), employed_alums)
+    print_percentage(' - Employees who use FOSS as part of their job',
+                     employees('Does your job involve using free software / open source?'), employed_alums)
+    print_percentage(' - Employees who contribute to FOSS as part of their job',
+                     employees('Does your job involve contributing to free software / open source?'), employed_alums)
+    print_percentage('Unemployed', counts.count(CURRENT, 'Unemployed'), total_alums)
+    print_percentage('Parents', counts.count(CURRENT, 'A full-time parent'), total_alums)
+
+def foss_retention(counts):
+    total_alums = counts.rows
 
     print()
     print("Retention in FOSS")
     print("---")
     print()
-    for index, row in enumerate(data):
-        total_alums += 1
-
-        if row['In the last year, have you used free software / open source?'] == 'Yes':
-            use_foss += 1
-
-        if row['In the last year, have you contributed to free software / open source with:'] == 'No, I have not contributed to free software / open source in the last year':
-            do_not_contribute_to_foss += 1
-        elif row['In the last year, have you contributed to free software / open source with:'] != '':
-            contribute_to_foss += 1
-
     print('Total alums: {}'.format(total_alums))
-    print_percentage('Uses FOSS', use_foss, total_alums)
-    print_percentage('Contributes to FOSS', contribute_to_foss, total_alums)
-    print_percentage('Does not contribute to FOSS', do_not_contribute_to_foss, total_alums)
-
-def gsoc_and_gsod_connections(data):
-    total_alums = 0
-    gsoc_intern = 0
-    gsoc_mentor = 0
-    gsoc_admin = 0
-    gsod_intern = 0
-    gsod_mentor = 0
-    gsod_admin = 0
+    print_percentage('Uses FOSS', counts.count(USED_FOSS, 'Yes'), total_alums)
+    print_percentage('Contributes to FOSS',
+                     counts.count_if(CONTRIBUTED, lambda answer: answer not in (NOT_CONTRIBUTED, '')), total_alums)
+    print_percentage('Does not contribute to FOSS', counts.count(CONTRIBUTED, NOT_CONTRIBUTED), total_alums)
+
+def gsoc_and_gsod_connections(counts):
+    total_alums = counts.rows
 
     print()
     print("Connection to GSoC and GSoD")
     print("---")
     print()
-    for index, row in enumerate(data):
-        total_alums += 1
-
-        if row['After your Outreachy internship, did you participate in Google Summer of Code? (Select all that apply)/Yes, I was a GSoD intern'] == '1':
-            gsoc_intern += 1
-        if row['After your Outreachy internship, did you participate in Google Summer of Code? (Select all that apply)/Yes, I was a GSoD mentor'] == '1':
-            gsoc_mentor += 1
-        if row['After your Outreachy internship, did you participate in Google Summer of Code? (Select all that apply)/Yes, I was a GSoD org admin'] == '1':
-            gsoc_admin += 1
-        if row['After your Outreachy internship, did you participate in Google Season of Docs? (Select all that apply)/Yes, I was a GSoD intern'] == '1':
-            gsod_intern += 1
-        if row['After your Outreachy internship, did you participate in Google Season of Docs? (Select all that apply)/Yes, I was a GSoD mentor'] == '1':
-            gsod_mentor += 1
-        if row['After your Outreachy internship, did you participate in Google Season of Docs? (Select all that apply)/Yes, I was a GSoD org admin'] == '1':
-            gsod_admin += 1
-
     print('Total alums: {}'.format(total_alums))
-    print_percentage('Google Summer of Code intern after Outreachy', gsoc_intern, total_alums)
-    print_percentage('Google Summer of Code mentor after Outreachy', gsoc_mentor, total_alums)
-    print_percentage('Google Summer of Code org admin after Outreachy', gsoc_admin, total_alums)
-    print_percentage('Google Season of Docs intern after Outreachy', gsod_intern, total_alums)
-    print_percentage('Google Season of Docs mentor after Outreachy', gsod_mentor, total_alums)
-    print_percentage('Google Season of Docs org admin after Outreachy', gsod_admin, total_alums)
+    print_percentage('Google Summer of Code intern after Outreachy', counts.count(GSOC + 'Yes, I was a GSoD intern', '1'), total_alums)
+    print_percentage('Google Summer of Code mentor after Outreachy', counts.count(GSOC + 'Yes, I was a GSoD mentor', '1'), total_alums)
+    print_percentage('Google Summer of Code org admin after Outreachy', counts.count(GSOC + 'Yes, I was a GSoD org admin', '1'), total_alums)
+    print_percentage('Google Season of Docs intern after Outreachy', counts.count(GSOD + 'Yes, I was a GSoD intern', '1'), total_alums)
+    print_percentage('Google Season of Docs mentor after Outreachy', counts.count(GSOD + 'Yes, I was a GSoD mentor', '1'), total_alums)
+    print_percentage('Google Season of Docs org admin after Outreachy', counts.count(GSOD + 'Yes, I was a GSoD org admin', '1'), total_alums)
 
-def foss_talks(data):
-    total_alums = 0
-    gave_talk = 0
+def foss_talks(counts):
+    total_alums = counts.rows
 
     print()
     print("Conference talks on FOSS")
     print("---")
     print()
-    for index, row in enumerate(data):
-        total_alums += 1
-
-        if row['During or after your Outreachy internship, did you give a talk or presentation on free software/open source?'] == 'Yes':
-            gave_talk += 1
-
     print('Total alums: {}'.format(total_alums))
-    print_percentage('Gave a conference talks or presentation on FOSS', gave_talk, total_alums)
+    print_percentage('Gave a conference talks or presentation on FOSS', counts.count(GAVE_TALK, 'Yes'), total_alums)
 
-def mentorship(data):
-    total_alums = 0
-    outreachy_coordinator = 0
-    outreachy_mentor = 0
-    outreachy_volunteer = 0
-    generic_mentor = 0
+def mentorship(counts):
+    total_alums = counts.rows
 
     print()
     print("Mentorship")
     print("---")
     print()
-    for index, row in enumerate(data):
-        total_alums += 1
-
-        if row['After your Outreachy internship, did you volunteer for Outreachy? (Select all that apply)/Yes, I was an Outreachy coordinator'] == '1':
-            outreachy_coordinator += 1
-            print(row['First Name / Given Name'], row['Last Name / Family Name'], "Outreachy coordinator")
-        if row['After your Outreachy internship, did you volunteer for Outreachy? (Select all that apply)/Yes, I was an Outreachy mentor'] == '1':
-            outreachy_mentor += 1
-            print(row['First Name / Given Name'], row['Last Name / Family Name'], "Outreachy mentor")
-        if row['After your Outreachy internship, did you volunteer for Outreachy? (Select all that apply)/Yes, I was an informal Outreachy volunteer'] == '1':
-            outreachy_volunteer += 1
-        if row['After your Outreachy internship, did you become a mentor?'].startswith('Yes'):
-            generic_mentor += 1
+    for first_name, last_name, role in counts.volunteers:
+        print(first_name, last_name, role)
 
     print('Total alums: {}'.format(total_alums))
-    print_percentage('Became Outreachy coordinator', outreachy_coordinator, total_alums)
-    print_percentage('Became Outreachy mentor', outreachy_mentor, total_alums)
-    print_percentage('Became Outreachy volunteer', outreachy_volunteer, total_alums)
-    print_percentage('Became a mentor', generic_mentor, total_alums)
+    print_percentage('Became Outreachy coordinator', counts.count(VOLUNTEERED + 'Yes, I was an Outreachy coordinator', '1'), total_alums)
+    print_percentage('Became Outreachy mentor', counts.count(VOLUNTEERED + 'Yes, I was an Outreachy mentor', '1'), total_alums)
+    print_percentage('Became Outreachy volunteer', counts.count(VOLUNTEERED + 'Yes, I was an informal Outreachy volunteer', '1'), total_alums)
+    print_percentage('Became a mentor', counts.count_if(BECAME_MENTOR, lambda answer: answer.startswith('Yes')), total_alums)
 
-def print_successes(data):
+def print_successes(counts):
     print()
     print("Success stories")
     print("---")
     print()
-    for index, row in enumerate(data):
-        if row['After your Outreachy internship, did you win any awards?'] != '':
-            print("Award:", row['First Name / Given Name'], row['Last Name / Family Name'], row['After your Outreachy internship, did you win any awards?'])
+    for first_name, last_name, awards, leadership, story in counts.successes:
+        if awards != '':
+            print("Award:", first_name, last_name, awards)
 
-        if row['After your Outreachy internship, did you take on any leadership roles?'] != '':
-            print("Leadership role:", row['First Name / Given Name'], row['Last Name / Family Name'], row['After your Outreachy internship, did you take on any leadership roles?'])
+        if leadership != '':
+            print("Leadership role:", first_name, last_name, leadership)
 
-        if row['Tell us more about your successes after Outreachy!'] != '':
-            print("Success story:", row['First Name / Given Name'], row['Last Name / Family Name'], row['Tell us more about your successes after Outreachy!'])
+        if story != '':
+            print("Success story:", first_name, last_name, story)
 
-        if row['After your Outreachy internship, did you win any awards?'] != '' or row['After your Outreachy internship, did you take on any leadership roles?'] != '' or row['Tell us more about your successes after Outreachy!'] != '':
-            print()
+        print()
 
 def main():
     parser = argparse.ArgumentParser(description='Print statistics from 2019 Outreachy longitudinal survey')
     parser.add_argument('--csv', help='CSV file of longitudinal survey responses')
     parser.add_argument('--successes', help='Use `--successes 1` to print awards, leadership positions, and success stories of Outreachy alums')
+    parser.add_argument('--cache', help='Directory to cache the CSV file in as binary columns, so later runs skip parsing it (see surveycache.py)')
+    parser.add_argument('--jobs', help='Count blocks of the CSV file in this many processes (default: 1)', type=int, default=1)
+    parser.add_argument('--save-partial', help='Save the counts to this file instead of printing statistics, to --merge them later', metavar='FILE')
+    parser.add_argument('--merge', help='Print statistics from counts saved with --save-partial, for parts of the survey in this order, instead of reading --csv', nargs='+', metavar='FILE')
     args = parser.parse_args()
-
-    data = []
-    with open(args.csv, 'r') as csvFile:
-        freader = csv.DictReader(csvFile, delimiter=';', quotechar='"')
-        for row in freader:
-            data.append(row)
-
-    race_and_ethnicity_demographics(data)
-    gender_identities_demographics(data)
-    before_outreachy_statistics(data)
-    retention_statistics(data)
-    foss_retention(data)
-    gsoc_and_gsod_connections(data)
-    foss_talks(data)
-    mentorship(data)
+    if not args.csv and not args.merge:
+        parser.error('Give the survey with --csv, or counts to combine with --merge')
+
+    successes = args.successes == '1'
+    if args.merge:
+        counts = SurveyCounts(successes)
+        for path in args.merge:
+            try:
+                counts.merge(SurveyCounts.load(path))
+            except (OSError, ValueError) as e:
+                parser.error('can\'t merge ' + path + ': ' + str(e))
+    elif args.cache:
+        # Imported here because surveycache imports this module.
+        import surveycache
+        counts = count_survey(surveycache.load_columns(args.csv, args.cache), successes)
+    else:
+        with open(args.csv, 'r') as csvFile:
+            counts = count_csv(csvFile, successes, args.jobs)
+
+    if args.save_partial:
+        counts.save(args.save_partial)
+        return
+
+    race_and_ethnicity_demographics(counts)
+    gender_identities_demographics(counts)
+    before_outreachy_statistics(counts)
+    retention_statistics(counts)
+    foss_retention(counts)
+    gsoc_and_gsod_connections(counts)
+    foss_talks(counts)
+    mentorship(counts)
 
     if args.successes == '1':
-        print_successes(data)
+        print_successes(counts)
 
 if __name__ == "__main__":
     main()
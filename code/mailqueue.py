@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# A send queue for draft emails that survives crashes.
+#
+# The draft email scripts write into the queue with --format queue: an
+# SQLite database (outbox.sqlite in the output directory, in WAL mode so
+# senders and writers don't block each other). sendcampaign.py drains it.
+# Every message is in one of these states:
+#
+#  - queued: waiting to be sent
+#  - sending: claimed by a sender, which is sending it right now
+#  - sent: the SMTP server accepted it
+#  - failed: it couldn't be sent, even after retries
+#
+# Senders claim a few queued messages at a time in one transaction, so
+# several senders (threads or processes) never get the same message.
+#
+# Writing the drafts again is safe. A draft that is already in the queue
+# with the same text isn't added again, even if it was sent; a changed
+# draft replaces the old one if that one wasn't sent yet, and is added as a
+# new message if it was (like a reminder email to the same people).
+#
+# A sender that's stopped with Ctrl-C puts the messages it claimed but
+# didn't get to back in the queue (release_claimed()), matched by its
+# claim id, so nothing is left half-claimed.
+#
+# If a sender dies, its messages are left in the sending state: they may
+# or may not have been delivered, so they aren't sent again on their own.
+# See what's in the queue, and put messages back once you've checked, with:
+#
+# $ mailqueue.py outdir/outbox.sqlite
+# $ mailqueue.py outdir/outbox.sqlite --requeue-stale 3600
+# $ mailqueue.py outdir/outbox.sqlite --retry-failed
+
+import argparse
+import hashlib
+import os
+import socket
+import sqlite3
+import time
+
+QUEUENAME = 'outbox.sqlite'
+STATES = ['queued', 'sending', 'sent', 'failed']
+
+def queue_path(path):
+    """The queue database for a path that's either the database or its directory."""
+    if os.path.isdir(path):
+        return os.path.join(path, QUEUENAME)
+    return path
+
+def draft_digest(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+class MailQueue:
+    """Draft emails waiting to be sent, in an SQLite database."""
+    def __init__(self, path):
+        # Transactions are started explicitly, with BEGIN IMMEDIATE, so two
+        # senders can't both read a message as queued and then claim it.
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode = WAL')
+        self.db.execute('PRAGMA synchronous = FULL')
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                message BLOB NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued'
+                    CHECK (state IN ('queued', 'sending', 'sent', 'failed')),
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                claimed_by TEXT,
+                updated REAL NOT NULL,
+                UNIQUE (name, digest));
+            CREATE INDEX IF NOT EXISTS messages_by_state ON messages (state, id);
+        ''')
+        self.worker = socket.gethostname() + ':' + str(os.getpid())
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def transaction(self):
+        return _transaction(self.db)
+
+    def enqueue(self, name, text, message):
+        """Queue a draft, unless it's already there.
+
+        text is the draft as written, which identifies it; message is what
+        gets sent. Returns 'queued', 'replaced', or 'unchanged'.
+        """
+        digest = draft_digest(text)
+        now = time.time()
+        with self.transaction():
+            rows = self.db.execute('SELECT id, digest, state FROM messages WHERE name = ?', (name,)).fetchall()
+            if any(d == digest for rid, d, state in rows):
+                return 'unchanged'
+            # An older version that hasn't gone out yet is replaced.
+            for rid, d, state in rows:
+                if state in ('queued', 'failed'):
+                    self.db.execute("UPDATE messages SET digest = ?, message = ?, state = 'queued', "
+                                    'attempts = 0, error = NULL, updated = ? WHERE id = ?',
+                                    (digest, message, now, rid))
+                    return 'replaced'
+            self.db.execute('INSERT INTO messages (name, digest, message, updated) VALUES (?, ?, ?, ?)',
+                            (name, digest, message, now))
+            return 'queued'
+
+    def claim(self, limit=1):
+        """Move up to limit queued messages to sending, and return [(id, name, message)]."""
+        with self.transaction():
+            rows = self.db.execute("SELECT id, name, message FROM messages WHERE state = 'queued' "
+                                   'ORDER BY id LIMIT ?', (limit,)).fetchall()
+            self.db.executemany("UPDATE messages SET state = 'sending', claimed_by = ?, "
+                                'attempts = attempts + 1, updated = ? WHERE id = ?',
+                                [(self.worker, time.time(), rid) for rid, name, message in rows])
+        return rows
+
+    def mark_sent(self, rid):
+        self._finish(rid, 'sent', None)
+
+    def mark_failed(self, rid, error):
+        self._finish(rid, 'failed', str(error))
+
+    def _finish(self, rid, state, error):
+        with self.transaction():
+            self.db.execute("UPDATE messages SET state = ?, error = ?, updated = ? "
+                            "WHERE id = ? AND state = 'sending'",
+                            (state, error, time.time(), rid))
+
+    def release_claimed(self):
+        """Queue again the messages this process claimed and didn't finish."""
+        with self.transaction():
+            return self.db.execute("UPDATE messages SET state = 'queued', claimed_by = NULL, "
+                                   "attempts = attempts - 1, updated = ? "
+                                   "WHERE state = 'sending' AND claimed_by = ?",
+                                   (time.time(), self.worker)).rowcount
+
+    def requeue_stale(self, seconds):
+        """Queue again messages that have been sending for longer than seconds.
+
+        Only do this after checking that they weren't delivered; they may
+        have been, just before their sender died.
+        """
+        with self.transaction():
+            return self.db.execute("UPDATE messages SET state = 'queued', claimed_by = NULL, updated = ? "
+                                   "WHERE state = 'sending' AND updated < ?",
+                                   (time.time(), time.time() - seconds)).rowcount
+
+    def retry_failed(self):
+        with self.transaction():
+            return self.db.execute("UPDATE messages SET state = 'queued', error = NULL, updated = ? "
+                                   "WHERE state = 'failed'", (time.time(),)).rowcount
+
+    def counts(self):
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(self.db.execute('SELECT state, COUNT(*) FROM messages GROUP BY state'))
+        return counts
+
+    def stale(self):
+        """Return [(name, claimed by, seconds ago)] for messages that are being sent."""
+        now = time.time()
+        return [(name, worker, now - updated) for name, worker, updated in self.db.execute(
+                "SELECT name, claimed_by, updated FROM messages WHERE state = 'sending' ORDER BY id")]
+
+class _transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, kind, value, traceback):
+        self.db.execute('COMMIT' if kind is None else 'ROLLBACK')
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the state of a draft email send queue, and put messages back in it.')
+    parser.add_argument('queue', help='Queue database, or the directory with its ' + QUEUENAME)
+    parser.add_argument('--requeue-stale', help='Queue again messages that have been sending for more than this many seconds (check that they were not delivered first)', type=float, metavar='SECONDS')
+    parser.add_argument('--retry-failed', help='Queue failed messages again', action='store_true')
+    args = parser.parse_args()
+
+    with MailQueue(queue_path(args.queue)) as queue:
+        if args.requeue_stale is not None:
+            print('Queued', queue.requeue_stale(args.requeue_stale), 'stale messages again')
+        if args.retry_failed:
+            print('Queued', queue.retry_failed(), 'failed messages again')
+        print(', '.join(state + ' ' + str(count) for state, count in queue.counts().items()))
+        for name, worker, seconds in queue.stale():
+            print('Sending for', int(seconds), 'seconds:', name, 'by', worker)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Where the draft email scripts write their drafts. Every script takes
+# --format to pick one of:
+#
+#  - flat: one text file per recipient in the output directory, for
+#    mutt -H (the default, and how the scripts always worked)
+#  - sharded: the same files, spread over 256 subdirectories, so no
+#    directory ends up with tens of thousands of files in it
+#  - mbox: all drafts in one drafts.mbox file in the output directory
+#  - maildir: the output directory is a Maildir, with one draft per file
+#  - queue: a send queue (outbox.sqlite in the output directory) that
+#    sendcampaign.py sends from and keeps track of; see mailqueue.py
+#
+# Drafts in an mbox, a Maildir or a queue get the headers a real message
+# needs (Date, Message-ID, and a UTF-8 Content-Type), and an X-Draft-File
+# header with the name the flat file would have had. Writing the drafts
+# again replaces the ones from the last run instead of adding duplicates
+# (a queue also keeps the ones that were already sent from being queued
+# again). Maildir drafts are flagged as drafts.
+#
+# Open them all in one mutt with:
+#
+# $ mutt -F ~/.muttrc-outreachy -f outdir/drafts.mbox
+#
+# Drafts written as flat files can be moved into an mbox or Maildir with:
+#
+# $ mailspool.py outdir/ --format mbox
+
+import argparse
+import email.utils
+import hashlib
+import mailbox
+import os
+import re
+
+from mailqueue import QUEUENAME, MailQueue
+
+FORMATS = ['flat', 'sharded', 'mbox', 'maildir', 'queue']
+MBOXNAME = 'drafts.mbox'
+
+headerPattern = re.compile(r'^[A-Za-z][A-Za-z0-9-]*:')
+
+def add_format_argument(parser):
+    parser.add_argument('--format', choices=FORMATS, default='flat',
+                        help='How to write the drafts: a file per email in the output directory (flat, the default), '
+                             'spread over subdirectories (sharded), one drafts.mbox file (mbox), a Maildir (maildir), '
+                             'or a send queue for sendcampaign.py (queue)')
+
+def split_draft(text):
+    """Split a draft into its header lines and its body.
+
+    The headers are the lines at the top that look like headers (or are
+    folded continuations of one); the body starts after them, or after the
+    blank line that ends them.
+    """
+    lines = text.split('\n')
+    count = 0
+    while count < len(lines):
+        line = lines[count]
+        if not (headerPattern.match(line) or (count and line[:1] in (' ', '\t') and line.strip())):
+            break
+        count += 1
+    body = lines[count:]
+    if body and body[0] == '':
+        body = body[1:]
+    return lines[:count], '\n'.join(body)
+
+def draft_message(name, text):
+    """Return a draft as a message with the headers a mailbox needs."""
+    headers, body = split_draft(text)
+    present = set(h.split(':', 1)[0].lower() for h in headers if not h[:1].isspace())
+    sender = ''
+    for h in headers:
+        if h.lower().startswith('from:'):
+            sender = email.utils.parseaddr(h[len('from:'):])[1]
+    domain = sender.rpartition('@')[2] or 'localhost'
+    added = []
+    if 'date' not in present:
+        added.append('Date: ' + email.utils.formatdate(localtime=True))
+    if 'message-id' not in present:
+        added.append('Message-ID: ' + email.utils.make_msgid(domain=domain))
+    if 'mime-version' not in present:
+        added.append('MIME-Version: 1.0')
+    if 'content-type' not in present:
+        added.append('Content-Type: text/plain; charset=utf-8')
+        added.append('Content-Transfer-Encoding: 8bit')
+    added.append('X-Draft-File: ' + name)
+    return ('\n'.join(headers + added) + '\n\n' + body).encode('utf-8')
+
+def draft_name(f):
+    """Return the X-Draft-File header of a message file, without parsing all of it."""
+    with f:
+        for line in f:
+            if not line.strip():
+                break
+            if line.lower().startswith(b'x-draft-file:'):
+                return line[len(b'x-draft-file:'):].strip().decode('utf-8', errors='replace')
+    return None
+
+class MailSpool:
+    """Draft emails, written to a directory in one of FORMATS."""
+    def __init__(self, directory, format='flat'):
+        if format not in FORMATS:
+            raise ValueError('Unknown draft format ' + format + '; use one of ' + ', '.join(FORMATS))
+        self.directory = directory
+        self.format = format
+        self.count = 0
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        if format == 'mbox':
+            # Written next to the old mbox and renamed over it when closed.
+            self.path = os.path.join(directory, MBOXNAME)
+            self.partial = self.path + '.' + str(os.getpid()) + '.tmp'
+            if os.path.exists(self.partial):
+                os.remove(self.partial)
+            self.mailbox = mailbox.mbox(self.partial)
+        elif format == 'queue':
+            self.queue = MailQueue(os.path.join(directory, QUEUENAME))
+        elif format == 'maildir':
+            # The directory may already have other files in it (like the
+            # PDFs next to resumesearch.py's drafts).
+            for subdir in ('tmp', 'new', 'cur'):
+                os.makedirs(os.path.join(directory, subdir), exist_ok=True)
+            self.mailbox = mailbox.Maildir(directory, factory=None)
+            # Drafts from an earlier run, by name, so they're replaced and not duplicated.
+            self.existing = {}
+            for key in self.mailbox.iterkeys():
+                name = draft_name(self.mailbox.get_file(key))
+                if name:
+                    self.existing[name] = key
+
+    def add(self, name, text):
+        """Write a draft. name is the file name a flat draft would have."""
+        if self.format == 'flat':
+            with open(os.path.join(self.directory, name), 'w') as f:
+                f.write(text)
+        elif self.format == 'sharded':
+            shard = os.path.join(self.directory, hashlib.sha1(name.encode()).hexdigest()[:2])
+            if not os.path.exists(shard):
+                os.makedirs(shard, exist_ok=True)
+            with open(os.path.join(shard, name), 'w') as f:
+                f.write(text)
+        elif self.format == 'mbox':
+            self.mailbox.add(draft_message(name, text))
+        elif self.format == 'queue':
+            self.queue.enqueue(name, text, draft_message(name, text))
+        else:
+            if name in self.existing:
+                self.mailbox.discard(self.existing.pop(name))
+            message = mailbox.MaildirMessage(draft_message(name, text))
+            message.set_subdir('cur')
+            message.set_flags('D')
+            self.existing[name] = self.mailbox.add(message)
+        self.count += 1
+
+    def close(self):
+        if self.format == 'mbox':
+            self.mailbox.close()
+            os.replace(self.partial, self.path)
+        elif self.format == 'queue':
+            self.queue.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Move flat draft email files into an mbox, a Maildir, or sharded directories.')
+    parser.add_argument('dir', help='Directory of draft email .txt files')
+    add_format_argument(parser)
+    parser.add_argument('--outdir', help='Where to write the drafts (default: dir)')
+    args = parser.parse_args()
+
+    drafts = sorted(f for f in os.listdir(args.dir)
+                    if f.endswith('.txt') and os.path.isfile(os.path.join(args.dir, f)))
+    with MailSpool(args.outdir or args.dir, args.format) as spool:
+        for name in drafts:
+            path = os.path.join(args.dir, name)
+            with open(path, 'r') as f:
+                spool.add(name, f.read())
+            if args.format != 'flat' and not args.outdir:
+                os.remove(path)
+    print('Wrote', spool.count, 'drafts as', args.format, 'to', args.outdir or args.dir)
+
+if __name__ == "__main__":
+    main()
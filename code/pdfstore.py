@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Place PDF resumes into the email directories without copying their bytes.
+#
+# Files can be placed with a hardlink, a reflink (a copy-on-write clone,
+# on filesystems like btrfs and XFS), or a symlink. If that isn't possible,
+# e.g. because the destination is on another filesystem, the file is
+# copied instead.
+#
+# A pdfStore keeps one object per distinct PDF under its SHA-256 hash, so
+# identical PDFs submitted under different names are only stored once.
+# Objects are reflinked or copied into the store, and hardlinked out of
+# it. Like pdftextcache.py, the store keeps a manifest of the size and
+# modification time each PDF was hashed with, so unchanged PDFs aren't
+# hashed again on the next run.
+
+import argparse
+import errno
+import os
+from shutil import copyfile
+
+from pdftextcache import cachedHash, loadManifest, saveManifest
+
+PLACEMENTS = ['copy', 'hardlink', 'reflink', 'symlink']
+
+# From <linux/fs.h>
+FICLONE = 0x40049409
+
+def reflink(source, dest):
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.EOPNOTSUPP, 'reflinks are not supported on this system')
+    with open(source, 'rb') as s:
+        with open(dest, 'wb') as d:
+            try:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            except OSError:
+                # Don't leave an empty file behind for the copy.
+                os.remove(dest)
+                raise
+
+def placeFile(source, dest, placement='copy'):
+    """Make dest have the contents of source, falling back to a copy.
+
+    Returns the placement that was used.
+    """
+    if placement not in PLACEMENTS:
+        raise ValueError('Unknown placement: ' + placement)
+    if placement != 'copy':
+        try:
+            if placement == 'hardlink':
+                os.link(source, dest)
+            elif placement == 'symlink':
+                os.symlink(os.path.abspath(source), dest)
+            else:
+                reflink(source, dest)
+            return placement
+        except (FileExistsError, FileNotFoundError):
+            raise
+        except OSError:
+            # Most likely a different filesystem (EXDEV), or one that
+            # doesn't support this kind of link.
+            pass
+    copyfile(source, dest)
+    return 'copy'
+
+class pdfStore:
+    """Content-addressed store with one file per distinct PDF."""
+    def __init__(self, path):
+        self.path = path
+        if not os.path.exists(path):
+            os.makedirs(path)
+        self.manifest = loadManifest(path)
+
+    def close(self):
+        """Save the hashes of the PDFs added in this run."""
+        saveManifest(self.path, self.manifest)
+
+    def objectPath(self, digest):
+        return os.path.join(self.path, digest[:2], digest + '.pdf')
+
+    def add(self, pdf):
+        """Put pdf in the store (if it isn't there yet) and return its object path."""
+        obj = self.objectPath(cachedHash(self.manifest, pdf))
+        if not os.path.exists(obj):
+            if not os.path.exists(os.path.dirname(obj)):
+                os.makedirs(os.path.dirname(obj), exist_ok=True)
+            # Place a temporary file and rename it, so the store never has
+            # a partially written object. The object is a reflink or a copy,
+            # never a hardlink: it mustn't change if the original is edited.
+            partial = obj + '.' + str(os.getpid()) + '.tmp'
+            placeFile(pdf, partial, 'reflink')
+            os.replace(partial, obj)
+        return obj
+
+    def place(self, pdf, dest, placement='hardlink'):
+        """Add pdf to the store and place the stored object at dest."""
+        return placeFile(self.add(pdf), dest, placement)
+
+def main():
+    parser = argparse.ArgumentParser(description='Add PDF files to a content-addressed store.')
+    parser.add_argument('store', help='Directory of the PDF store')
+    parser.add_argument('pdf', nargs='+', help='PDF files to add')
+    args = parser.parse_args()
+
+    store = pdfStore(args.store)
+    objects = set(store.add(pdf) for pdf in args.pdf)
+    store.close()
+    print('Stored', len(args.pdf), 'PDFs as', len(objects), 'objects in', args.store)
+
+if __name__ == "__main__":
+    main()
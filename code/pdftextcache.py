@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Create the .txt file next to every PDF resume in a directory, like:
+# $ for i in `ls *.pdf`; do pdftotext $i; done
+#
+# but only run pdftotext on PDFs we haven't seen before. Extracted text is
+# kept in a cache directory under the SHA-256 hash of the PDF, so an
+# identical PDF uploaded under a different name reuses the cached text.
+# A manifest of PDF sizes and modification times means unchanged PDFs
+# aren't even re-hashed on the next run.
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from shutil import copyfile
+
+MANIFEST = 'manifest.json'
+
+def hashFile(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+def cachedHash(manifest, path, stat=None):
+    """Return the SHA-256 hash of path, from manifest if the file's size and
+    modification time are the ones it was hashed with. New hashes are
+    added to manifest."""
+    path = os.path.abspath(path)
+    if stat is None:
+        stat = os.stat(path)
+    known = manifest.get(path)
+    if known and known[0] == stat.st_size and known[1] == stat.st_mtime_ns:
+        return known[2]
+    manifest[path] = [stat.st_size, stat.st_mtime_ns, hashFile(path)]
+    return manifest[path][2]
+
+def pdftotext(pdf, cachedir, digest):
+    """Extract the text of pdf into the cache. Returns an error message, or None."""
+    final = os.path.join(cachedir, digest + '.txt')
+    partial = final + '.' + str(os.getpid()) + '.tmp'
+    try:
+        result = subprocess.run(['pdftotext', pdf, partial],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except FileNotFoundError:
+        return 'pdftotext is not installed (it is in the poppler-utils package)'
+    if result.returncode != 0:
+        if os.path.exists(partial):
+            os.remove(partial)
+        return result.stderr.decode(errors='replace').strip()
+    # Rename into place, so an interrupted run never leaves half a text file in the cache.
+    os.replace(partial, final)
+    return None
+
+def loadManifest(cachedir):
+    try:
+        with open(os.path.join(cachedir, MANIFEST), 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def saveManifest(cachedir, manifest):
+    """Save manifest, without the entries of PDFs that no longer exist."""
+    # A cache can be shared by several directories, so entries are checked
+    # on disk rather than against the PDFs of this run.
+    manifest = {path: known for path, known in manifest.items() if os.path.exists(path)}
+    path = os.path.join(cachedir, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=0, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def extractPdfs(directory, cachedir=None, jobs=4):
+    """Make sure every PDF in directory has a matching .txt file.
+
+    Returns the number of PDFs that had to be run through pdftotext.
+    """
+    if cachedir is None:
+        cachedir = os.path.join(directory, '.pdftext-cache')
+    if not os.path.exists(cachedir):
+        os.makedirs(cachedir)
+    manifest = loadManifest(cachedir)
+
+    # Find the hash of every PDF, skipping the ones whose size and
+    # modification time match what we hashed last time.
+    digests = {}
+    changed = set()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.pdf') or not entry.is_file():
+                continue
+            path = os.path.abspath(entry.path)
+            known = manifest.get(path)
+            digests[entry.name] = cachedHash(manifest, path, entry.stat())
+            # A new or changed PDF gets a new manifest entry.
+            if manifest[path] is not known:
+                changed.add(entry.name)
+
+    cached = set(f[:-len('.txt')] for f in os.listdir(cachedir) if f.endswith('.txt'))
+    # Identical PDFs under different names only need to be extracted once.
+    todo = {}
+    for name, digest in sorted(digests.items()):
+        if digest not in cached and digest not in todo:
+            todo[digest] = os.path.join(directory, name)
+
+    with ThreadPoolExecutor(jobs) as executor:
+        futures = {digest: executor.submit(pdftotext, pdf, cachedir, digest)
+                   for digest, pdf in todo.items()}
+    failed = set()
+    for digest, future in futures.items():
+        error = future.result()
+        if error:
+            print('Could not extract text from', todo[digest] + ':', error, file=sys.stderr)
+            failed.add(digest)
+
+    for name, digest in sorted(digests.items()):
+        if digest in failed:
+            continue
+        text = os.path.join(directory, os.path.splitext(name)[0] + '.txt')
+        if name not in changed and os.path.exists(text):
+            continue
+        copyfile(os.path.join(cachedir, digest + '.txt'), text)
+
+    saveManifest(cachedir, manifest)
+    return len(todo) - len(failed)
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract text from PDF resumes, reusing previously extracted text.')
+    parser.add_argument('dir', nargs='+', help='Directories with PDF resume files')
+    parser.add_argument('--cache', help='Directory to cache extracted text in (default: .pdftext-cache in each directory)')
+    parser.add_argument('--jobs', help='Number of pdftotext processes to run at once', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    for directory in args.dir:
+        count = extractPdfs(directory, args.cache, args.jobs)
+        print('Extracted text from', count, 'new PDFs in', directory)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Outreachy project catalogs: the projects of an internship round, and the
+# resume keywords that match each of them. There's one JSON (or YAML) file
+# per round in the catalogs directory, like:
+#
+# {
+#   "round": "May to August 2017",
+#   "url": "https://wiki.gnome.org/Outreachy/2017/MayAugust",
+#   "projects": [
+#     {
+#       "name": "Cadasta",
+#       "short": "a property rights tool",
+#       "description": "add new login options",
+#       "keywords": ["django|oauth"],
+#       "printskip": []
+#     }
+#   ]
+# }
+#
+# A resume matches a project strongly if it matches all of its keywords,
+# and weakly if it matches some of them. Each keyword is a regular
+# expression, matched case-insensitively on word boundaries. Matched words
+# in printskip aren't mentioned in emails.
+#
+# Check that a catalog loads and list its projects with:
+#
+# $ projectcatalog.py catalogs/2017-may-august.json
+
+import argparse
+import json
+import os
+
+CATALOGDIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catalogs')
+DEFAULTCATALOG = os.path.join(CATALOGDIR, '2017-may-august.json')
+
+class outreachyProject:
+    """Outreachy project name, description, keywords, and matching resume storage."""
+    def __init__(self, name, short, description, keywords, printskip, round=None):
+        self.name = name
+        self.description = description
+        self.keywords = keywords
+        self.strongResumeMatches = []
+        self.weakResumeMatches = []
+        self.short = short
+        self.printskip = printskip
+        self.round = round
+
+def loadCatalog(path):
+    """Return the list of outreachyProjects in a JSON or YAML catalog file."""
+    with open(path, 'r') as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError('YAML catalogs need PyYAML; install it with: pip3 install pyyaml, or use a JSON catalog')
+            catalog = yaml.safe_load(f)
+        else:
+            catalog = json.load(f)
+    projects = []
+    for entry in catalog['projects']:
+        missing = [field for field in ('name', 'keywords') if not entry.get(field)]
+        if missing:
+            raise ValueError('{}: project {} has no {}'.format(path, entry.get('name', len(projects)), ', '.join(missing)))
+        projects.append(outreachyProject(entry['name'], entry.get('short'), entry.get('description'),
+                                         list(entry['keywords']), list(entry.get('printskip', [])),
+                                         catalog.get('round')))
+    return projects
+
+def loadCatalogs(paths):
+    """Load several rounds' catalogs, so resumes are matched against all of them at once."""
+    projects = []
+    for path in paths:
+        projects.extend(loadCatalog(path))
+    return projects
+
+def main():
+    parser = argparse.ArgumentParser(description='Load Outreachy project catalogs and list their projects.')
+    parser.add_argument('catalog', nargs='+', help='JSON or YAML catalog files')
+    args = parser.parse_args()
+
+    for project in loadCatalogs(args.catalog):
+        print(project.round, '|', project.name, '|', project.description, '|', ', '.join(project.keywords))
+
+if __name__ == "__main__":
+    main()
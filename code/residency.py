@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Guess whether a resume is from a U.S. resident, from the address on it.
+#
+# This replaces resume-search-international.sh. Instead of grepping every
+# resume for state abbreviations and moving the ones without any into
+# another directory, every resume is scanned once, the first time its
+# guess is needed, for:
+#  - U.S. state and territory abbreviations (case-sensitive, like the grep)
+#  - a state abbreviation followed by a ZIP code, which is much stronger
+#  - U.S. state names, and 'United States' or 'USA'
+#  - the names of other countries
+#
+# Each resumeFile gets a residency guess ('us', 'international', or
+# 'unknown' when there's no address-like evidence at all, which the grep
+# used to call international) and a confidence from 0 to 1. Nothing is
+# moved; a partition manifest lists the resumes in each group:
+#
+# $ residency.py tapia-2017/ --manifest tapia-2017-residency.json
+
+import argparse
+import json
+import os
+import re
+
+RESIDENCIES = ['us', 'international', 'unknown']
+
+stateCodes = ['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'DC', 'FL', 'GA',
+              'HI', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA', 'ME', 'MD', 'MA',
+              'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY',
+              'NC', 'ND', 'OH', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT',
+              'VT', 'WA', 'WV', 'WI', 'WY', 'AS', 'GU', 'MP', 'PR', 'VI', 'UM',
+              'FM', 'MH', 'PW']
+
+# Georgia is left out, because it's also a country.
+stateNames = ['Alabama', 'Alaska', 'Arizona', 'Arkansas', 'California',
+              'Colorado', 'Connecticut', 'Delaware', 'District of Columbia',
+              'Florida', 'Hawaii', 'Idaho', 'Illinois', 'Indiana', 'Iowa',
+              'Kansas', 'Kentucky', 'Louisiana', 'Maine', 'Maryland',
+              'Massachusetts', 'Michigan', 'Minnesota', 'Mississippi',
+              'Missouri', 'Montana', 'Nebraska', 'Nevada', 'New Hampshire',
+              'New Jersey', 'New Mexico', 'New York', 'North Carolina',
+              'North Dakota', 'Ohio', 'Oklahoma', 'Oregon', 'Pennsylvania',
+              'Rhode Island', 'South Carolina', 'South Dakota', 'Tennessee',
+              'Texas', 'Utah', 'Vermont', 'Virginia', 'Washington',
+              'West Virginia', 'Wisconsin', 'Wyoming', 'Puerto Rico', 'Guam']
+
+# Countries that come up a lot in applications. Names that are also
+# common given names (Jordan, Chad) are left out.
+countryNames = ['Argentina', 'Australia', 'Austria', 'Bangladesh', 'Belgium',
+                'Brazil', 'Bulgaria', 'Cameroon', 'Canada', 'Chile', 'China',
+                'Colombia', 'Costa Rica', 'Croatia', 'Czech Republic', 'Denmark',
+                'Egypt', 'Ethiopia', 'Finland', 'France', 'Germany', 'Ghana',
+                'Greece', 'Hungary', 'India', 'Indonesia', 'Iran', 'Ireland',
+                'Israel', 'Italy', 'Japan', 'Kenya', 'Korea', 'Lebanon',
+                'Malaysia', 'Mexico', 'Morocco', 'Nepal', 'Netherlands',
+                'New Zealand', 'Nigeria', 'Norway', 'Pakistan', 'Peru',
+                'Philippines', 'Poland', 'Portugal', 'Romania', 'Russia',
+                'Rwanda', 'Serbia', 'Singapore', 'South Africa', 'Spain',
+                'Sri Lanka', 'Sweden', 'Switzerland', 'Taiwan', 'Tanzania',
+                'Thailand', 'Tunisia', 'Turkey', 'Uganda', 'Ukraine',
+                'United Kingdom', 'Uruguay', 'Venezuela', 'Vietnam', 'Zimbabwe']
+
+# How much each kind of match counts towards a guess.
+WEIGHTS = {'stateZip': 3, 'state': 1, 'stateName': 2, 'us': 3, 'country': 2}
+
+def caseVariants(words):
+    """The words as written, in lowercase, in uppercase, and capitalized."""
+    variants = set()
+    for word in words:
+        variants.update([word, word.lower(), word.upper(), word.title()])
+    return variants
+
+def alternation(words):
+    """A regular expression that matches any of words, preferring longer ones."""
+    # Grouping the words by their first letter lets the regex engine skip
+    # most of them at every position, which is much faster than one long
+    # alternation (or a case-insensitive one).
+    groups = {}
+    for word in words:
+        groups.setdefault(word[0], []).append(word[1:])
+    return '|'.join(re.escape(first) + '(?:' +
+                    '|'.join(re.escape(rest).replace(r'\ ', r'\s+')
+                             for rest in sorted(rests, key=lambda r: (-len(r), r))) + ')'
+                    for first, rests in sorted(groups.items()))
+
+# One scan finds every kind of evidence. State abbreviations are
+# case-sensitive, like the grep; names are matched in the usual spellings.
+residencyPattern = re.compile(
+    r'\b(?:(?P<state>' + alternation(stateCodes) + r')(?:\.?,?\s+(?P<stateZip>\d{5}(?:-\d{4})?))?\b'
+    r'|(?P<us>(?:United\s+States|UNITED\s+STATES|USA)\b|U\.S\.(?:A\.)?)'
+    r'|(?P<stateName>' + alternation(caseVariants(stateNames)) + r')\b'
+    r'|(?P<country>' + alternation(caseVariants(countryNames)) + r')\b)')
+
+def classifyResidency(contents):
+    """Return a residency guess for a resume's text, and a confidence from 0 to 1."""
+    us = 0
+    international = 0
+    countries = set()
+    for m in residencyPattern.finditer(contents):
+        # With a ZIP code, this is 'stateZip' rather than 'state'.
+        kind = m.lastgroup
+        if kind == 'country':
+            # Mentioning the same country ten times isn't ten times the evidence.
+            country = m.group(kind).lower()
+            if country in countries:
+                continue
+            countries.add(country)
+            international += WEIGHTS[kind]
+        else:
+            us += WEIGHTS[kind]
+    total = us + international
+    if total == 0:
+        return 'unknown', 0.0
+    residency = 'us' if us >= international else 'international'
+    # How one-sided the evidence is, scaled down when there's very little
+    # of it (e.g. a single 'IN' that might be a heading).
+    confidence = max(us, international) / total * min(1.0, total / 3)
+    return residency, round(confidence, 2)
+
+def partitionManifest(directory, resumeFiles):
+    """Return a manifest of the residency guess for every resume."""
+    partitions = {residency: [] for residency in RESIDENCIES}
+    resumes = {}
+    for resume in resumeFiles:
+        partitions[resume.residency].append(resume.pdfFileName)
+        resumes[resume.pdfFileName] = {'residency': resume.residency,
+                                       'confidence': resume.residencyConfidence}
+    return {'directory': os.path.abspath(directory),
+            'partitions': partitions,
+            'resumes': resumes}
+
+def writeManifest(path, directory, resumeFiles):
+    with open(path + '.tmp', 'w') as f:
+        json.dump(partitionManifest(directory, resumeFiles), f, indent=1, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+def main():
+    # Imported here because resumesearch imports this module.
+    from resumesearch import readResumeFiles
+
+    parser = argparse.ArgumentParser(description='Guess which resumes are from U.S. residents.')
+    parser.add_argument('dir', help='Directory with .txt resume files (or a corpus packed from one with resumecorpus.py)')
+    parser.add_argument('--manifest', help='JSON file to write the partition manifest to', default='residency.json')
+    parser.add_argument('--jobs', help='Number of processes to read resumes with', type=int, default=1)
+    args = parser.parse_args()
+
+    resumeFiles = readResumeFiles(args.dir, args.jobs, residency=True)
+    directory = args.dir
+    if os.path.isfile(args.dir):
+        import resumecorpus
+        directory = resumecorpus.resumeDirectory(args.dir)
+    writeManifest(args.manifest, directory, resumeFiles)
+    for residency in RESIDENCIES:
+        print(residency + ':', len([r for r in resumeFiles if r.residency == residency]))
+
+if __name__ == "__main__":
+    main()
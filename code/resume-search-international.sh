@@ -25,5 +25,15 @@
 # This script assumes you've run pdftotext to generate .txt files with the same
 # name as the pdf filename:
 # $ for i in `ls *.pdf`; do pdftotext $i; done
+#
+# or, to only extract PDFs that haven't been extracted before:
+# $ pdftextcache.py .
+#
+# residency.py does the same search (plus ZIP codes and country names) while
+# the resumes are read, without moving any files, and doesn't count resumes
+# without an address as international:
+# $ residency.py . --manifest residency.json
+# or
+# $ resumesearch.py . --residency residency.json
 
 mkdir international-maybe; for i in `grep -wL 'AL\|AK\|AZ\|AR\|CA\|CO\|CT\|DE\|DC\|FL\|GA\|HI\|ID\|IL\|IN\|IA\|KS\|KY\|LA\|ME\|MD\|MA\|MI\|MN\|MS\|MO\|MT\|NE\|NV\|NH\|NJ\|NM\|NY\|NC\|ND\|OH\|OR\|PA\|RI\|SC\|SD\|TN\|TX\|UT\|VT\|WA\|WV\|WI\|WY\|AS\|GU\|MP\|PR\|VI\|UM\|FM\|MH\|PW' *.txt`; do mv $i international-maybe/; done; for i in `ls international-maybe/`; do mv `basename -s .txt $i`.pdf international-maybe/; done;
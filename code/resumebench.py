@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Benchmark the stages of resumesearch.py on a synthetic set of resumes.
+#
+# The resumes, booth sign-up CSV, and project catalog are generated from a
+# fixed random seed, so every run at the same scale sees the same data:
+#
+# $ resumebench.py --scale 10k --save
+#
+# times reading the resumes, looking up booth visitors, matching projects,
+# and writing the emails, and saves the results in a baseline file. Later
+# runs compare against it, and exit with an error if a stage got slower
+# (or used more memory) by more than the tolerance:
+#
+# $ resumebench.py --scale 10k --tolerance 0.2
+#
+# Generated data is kept in the work directory and reused by later runs.
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import resumecorpus
+from resumesearch import (createFormEmails, identityIndex, matchResumes,
+                          outreachyProject, projectsMay2017, readResumeFiles,
+                          searchForEmail, splitAlternatives)
+
+SCALES = {'1k': 1000, '10k': 10000, '100k': 100000, '1M': 1000000}
+STAGES = ['readResumeFiles', 'searchForEmail', 'matchResumes', 'createFormEmails']
+DATAVERSION = 1
+
+fillerWords = ('experience team project developed managed worked university student '
+               'research course led designed implemented analysis data using with '
+               'and the of for in to on a skills summer intern assistant volunteer '
+               'club president member award dean list gpa bachelor science engineering').split()
+
+def catalogWords():
+    """Plain keywords from the real project catalog, to write resumes and projects with."""
+    words = set()
+    for project in projectsMay2017:
+        for keyword in project.keywords:
+            for alternative in splitAlternatives(keyword):
+                if alternative.isalnum() or ' ' in alternative and alternative.replace(' ', '').isalnum():
+                    words.add(alternative)
+    return sorted(words)
+
+def generateCatalog(count, seed):
+    """Return count synthetic projects, with keywords like the real catalog's."""
+    rng = random.Random(seed)
+    words = catalogWords()
+    projects = []
+    for i in range(count):
+        keywords = []
+        for k in range(rng.randint(1, 4)):
+            keywords.append('|'.join(rng.sample(words, rng.randint(1, 3))))
+        projects.append(outreachyProject('Org' + str(i % max(1, count // 3)), 'an organization',
+                                         'work on project ' + str(i), keywords, []))
+    return projects
+
+def resumeEmail(i):
+    return 'student{}@university{}.edu'.format(i, i % 97)
+
+def generateResumes(directory, count, seed):
+    """Write count text resumes and placeholder PDFs, and a booth sign-up CSV."""
+    rng = random.Random(seed)
+    words = catalogWords()
+    os.makedirs(directory, exist_ok=True)
+    for i in range(count):
+        # A few people submitted their resume twice.
+        email = resumeEmail(i if rng.random() > 0.01 else rng.randrange(max(1, i)))
+        text = ['Student Name ' + str(i), email]
+        for line in range(rng.randint(20, 60)):
+            text.append(' '.join(rng.choice(words) if rng.random() < 0.08 else rng.choice(fillerWords)
+                                 for w in range(rng.randint(4, 12))))
+        name = 'resume{:07d}'.format(i)
+        with open(os.path.join(directory, name + '.txt'), 'w') as f:
+            f.write('\n'.join(text) + '\n')
+        with open(os.path.join(directory, name + '.pdf'), 'wb') as f:
+            f.write(b'%PDF-1.4\n% ' + name.encode() + b'\n')
+
+    booth = os.path.join(directory, 'booth.csv')
+    with open(booth + '.tmp', 'w') as f:
+        f.write('Name,Email\n')
+        for visitor in range(max(1, count // 20)):
+            email = resumeEmail(rng.randrange(count))
+            roll = rng.random()
+            if roll < 0.1:
+                email = email.upper()
+            elif roll < 0.2:
+                # A misread character.
+                at = rng.randrange(len(email))
+                email = email[:at] + rng.choice('abcdefghijklmnopqrstuvwxyz') + email[at + 1:]
+            elif roll < 0.3:
+                email = 'visitor{}@example.com'.format(visitor)
+            f.write('Visitor {},{}\n'.format(visitor, email))
+    os.replace(booth + '.tmp', booth)
+
+def prepareData(workdir, count, seed, pack):
+    """Generate the data set for count resumes, unless it's already there."""
+    directory = os.path.join(workdir, 'resumes-' + str(count))
+    stamp = os.path.join(directory, 'bench.json')
+    params = {'version': DATAVERSION, 'count': count, 'seed': seed}
+    try:
+        with open(stamp, 'r') as f:
+            generated = json.load(f) == params
+    except FileNotFoundError:
+        generated = False
+    if not generated:
+        if os.path.exists(directory):
+            shutil.rmtree(directory)
+        print('Generating', count, 'resumes in', directory, file=sys.stderr)
+        generateResumes(directory, count, seed)
+        with open(stamp, 'w') as f:
+            json.dump(params, f)
+    corpus = os.path.join(workdir, 'resumes-' + str(count) + '.pack')
+    if pack and (not generated or not os.path.exists(corpus)):
+        resumecorpus.buildCorpus(directory, corpus)
+    return directory, corpus
+
+def removeEmails(directory):
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+def resetPeakRss():
+    """Start measuring peak memory from now on, if the kernel lets us."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peakRss():
+    """Peak resident memory of this process, in kilobytes.
+
+    Worker processes (with --jobs) aren't counted.
+    """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def timeStage(results, stage, items, function, *args):
+    resetPeakRss()
+    start = time.perf_counter()
+    value = function(*args)
+    seconds = time.perf_counter() - start
+    results[stage] = {'seconds': seconds,
+                      'perSecond': items / seconds if seconds else None,
+                      'peakRssKb': peakRss()}
+    print('{:18} {:10.3f} s {:12.0f} items/s {:10} KB peak RSS'.format(
+        stage, seconds, results[stage]['perSecond'] or 0, results[stage]['peakRssKb']))
+    return value
+
+def runBenchmark(directory, corpus, count, projects, seed, jobs):
+    # The emails from the last run would otherwise be read back as resumes.
+    removeEmails(directory)
+    catalog = generateCatalog(projects, seed)
+    results = {}
+    resumeFiles = timeStage(results, 'readResumeFiles', count,
+                            readResumeFiles, corpus or directory, jobs)
+    csvFile = os.path.join(directory, 'booth.csv')
+    def boothSearch():
+        return searchForEmail(csvFile, identityIndex([('resume', resumeFiles)]))
+    boothstops, noResume = timeStage(results, 'searchForEmail', count, boothSearch)
+    boothlist = set(pdf for email, setName, pdfs, score in boothstops for pdf in pdfs)
+    timeStage(results, 'matchResumes', count, matchResumes, resumeFiles, catalog, jobs)
+    timeStage(results, 'createFormEmails', count, createFormEmails, directory, resumeFiles, boothlist)
+    removeEmails(directory)
+    return results
+
+def compareBaseline(results, baseline, tolerance):
+    """Return a list of stages that are worse than the baseline by more than tolerance."""
+    regressions = []
+    for stage in STAGES:
+        old = baseline.get(stage)
+        new = results[stage]
+        if not old:
+            continue
+        for measure in ('seconds', 'peakRssKb'):
+            if new[measure] > old[measure] * (1 + tolerance):
+                regressions.append('{} {}: {:.3f} (baseline {:.3f}, +{:.0%})'.format(
+                    stage, measure, new[measure], old[measure], new[measure] / old[measure] - 1))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the resume search pipeline on synthetic resumes.')
+    parser.add_argument('--scale', help='Number of resumes to generate', choices=list(SCALES), default='1k')
+    parser.add_argument('--projects', help='Number of projects in the generated catalog', type=int, default=60)
+    parser.add_argument('--seed', help='Random seed for the generated data', type=int, default=2017)
+    parser.add_argument('--jobs', help='Number of processes to read and match resumes with', type=int, default=1)
+    parser.add_argument('--pack', help='Read the resumes from a packed corpus (see resumecorpus.py)', action='store_true')
+    parser.add_argument('--workdir', help='Directory to keep generated data in', default=os.path.join(tempfile.gettempdir(), 'resumebench'))
+    parser.add_argument('--baseline', help='JSON file with baseline results', default='resumebench-baseline.json')
+    parser.add_argument('--tolerance', help='Allowed slowdown or memory growth over the baseline, e.g. 0.2 for 20%%', type=float, default=0.25)
+    parser.add_argument('--save', help='Save the results as the new baseline', action='store_true')
+    args = parser.parse_args()
+
+    count = SCALES[args.scale]
+    directory, corpus = prepareData(args.workdir, count, args.seed, args.pack)
+    results = runBenchmark(directory, corpus if args.pack else None, count, args.projects, args.seed, args.jobs)
+
+    # Results are only comparable for the same data and options.
+    key = '{} resumes, {} projects, seed {}, {} jobs{}'.format(
+        count, args.projects, args.seed, args.jobs, ', packed' if args.pack else '')
+    try:
+        with open(args.baseline, 'r') as f:
+            baselines = json.load(f)
+    except FileNotFoundError:
+        baselines = {}
+
+    if args.save:
+        baselines[key] = results
+        with open(args.baseline + '.tmp', 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        os.replace(args.baseline + '.tmp', args.baseline)
+        print('Saved baseline for', key, 'in', args.baseline)
+        return
+    if key not in baselines:
+        print('No baseline for', key, 'in', args.baseline + '; run with --save to create one')
+        return
+    regressions = compareBaseline(results, baselines[key], args.tolerance)
+    for regression in regressions:
+        print('Regression:', regression)
+    if regressions:
+        sys.exit(1)
+    print('No regressions over', '{:.0%}'.format(args.tolerance), 'against', args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Pack a directory of text resumes into one file that can be memory-mapped:
+#
+# $ resumecorpus.py tapia-2017/ tapia-2017.pack
+#
+# resumesearch.py accepts a .pack file anywhere it takes a directory of
+# resumes. The resume text stays in the (file-backed, evictable) mapping
+# instead of in Python strings; each resume is only decoded while it's
+# being matched, so resident memory doesn't grow with the number of
+# resumes.
+#
+# File layout:
+#   MAGIC
+#   resume texts, UTF-8, each followed by a newline (optionally zlib-compressed)
+#   table: JSON list of {name, offset, length, compressed, emails, residency}
+#   8 byte little-endian offset of the table
+#
+# Records are decoded (and decompressed, if needed) and matched as text, so
+# a packed resume matches the same keywords as the file it was packed from.
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import zlib
+
+from resumesearch import isResumeText, resumeFile
+
+MAGIC = b'RESUMEPACK1\n'
+TRAILER = struct.Struct('<Q')
+
+def buildCorpus(directory, output, compress=False):
+    """Pack the text resumes in directory into output. Returns the number of resumes."""
+    table = []
+    with open(output + '.tmp', 'wb') as out:
+        out.write(MAGIC)
+        for name in sorted(f for f in os.listdir(directory) if isResumeText(f)):
+            with open(os.path.join(directory, name), 'r') as resume:
+                contents = resume.read()
+            data = contents.encode()
+            resume = resumeFile(directory, name, contents)
+            if compress:
+                data = zlib.compress(data)
+            table.append({'name': name,
+                          'offset': out.tell(),
+                          'length': len(data),
+                          'compressed': compress,
+                          'emails': resume.emails,
+                          'residency': [resume.residency, resume.residencyConfidence]})
+            # The newline keeps \b from joining the last word of one resume
+            # with the first word of the next.
+            out.write(data + b'\n')
+        tableOffset = out.tell()
+        out.write(json.dumps({'directory': os.path.abspath(directory), 'resumes': table}).encode())
+        out.write(TRAILER.pack(tableOffset))
+    os.replace(output + '.tmp', output)
+    return len(table)
+
+class packedResume(resumeFile):
+    """A resumeFile whose text lives in a memory-mapped corpus."""
+    def __init__(self, corpus, path, entry):
+        self.corpus = corpus
+        self.path = path
+        self.textFileName = entry['name']
+        self.pdfFileName = os.path.splitext(entry['name'])[0] + '.pdf'
+        self.offset = entry['offset']
+        self.length = entry['length']
+        self.compressed = entry['compressed']
+        self.emails = entry['emails']
+        # Corpora packed before residency guesses were stored guess it
+        # from the text, when it's needed.
+        if 'residency' in entry:
+            self.residencyGuess = tuple(entry['residency'])
+        self.strongProjectMatches = []
+        self.weakProjectMatches = []
+        self.projectScores = {}
+
+    @property
+    def contents(self):
+        """The resume text, decoded (and decompressed) from the mapping on each access."""
+        data = self.corpus.mapping[self.offset:self.offset + self.length]
+        if self.compressed:
+            data = zlib.decompress(data)
+        return data.decode()
+
+class packedCorpus:
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.mapping[:len(MAGIC)] != MAGIC:
+            raise ValueError(path + ' is not a packed resume corpus')
+        tableOffset, = TRAILER.unpack(self.mapping[-TRAILER.size:])
+        table = json.loads(self.mapping[tableOffset:-TRAILER.size].decode())
+        self.directory = table['directory']
+        self.resumes = [packedResume(self, self.directory, entry) for entry in table['resumes']]
+
+def isCorpus(path):
+    return os.path.isfile(path)
+
+def resumeDirectory(path):
+    """The directory with the PDF resumes for a resume directory or packed corpus."""
+    if isCorpus(path):
+        return packedCorpus(path).directory
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack a directory of text resumes into a memory-mappable corpus file.')
+    parser.add_argument('dir', help='Directory with .txt resume files')
+    parser.add_argument('output', help='Packed corpus file to write')
+    parser.add_argument('--compress', help='Compress each resume (saves disk space, but matching has to decompress)', action='store_true')
+    args = parser.parse_args()
+
+    count = buildCorpus(args.dir, args.output, args.compress)
+    print('Packed', count, 'resumes into', args.output)
+
+if __name__ == "__main__":
+    main()
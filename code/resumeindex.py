@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Keep an on-disk inverted index of the tokens in a directory of text
+# resumes, so that matching a project's keywords is a lookup of posting
+# lists instead of a scan over every resume. The index is an SQLite file
+# that is brought up to date with the directory on every run: new and
+# changed resumes are tokenized, and deleted resumes are dropped.
+#
+# Resumes are split into the same normalized tokens resumetokens.py
+# matches on, and keywords are matched as token phrases, so 'distributed
+# systems' also matches when the two words are split across a line break.
+# 'C++' is a single token, so 'C(?!\+\+)' is just the token 'c'. Any other
+# regular expression syntax falls back to searching the text of the
+# resumes that contain its leading word.
+#
+# Each posting also keeps how the token was written, so matches are
+# reported the way the resume wrote them, like the regular expression
+# matcher reports them.
+#
+# An index made with older tokenizing rules or tables is rebuilt.
+
+import argparse
+import os
+import re
+import sqlite3
+from array import array
+
+from resumesearch import isResumeText, loadCatalogs, projectsMay2017, splitAlternatives
+from resumetokens import TOKENVERSION, metaPattern, parseAlternative, phraseText, surfaceTokens, tokenize, unescape
+
+# Bump this when the tables change.
+INDEXVERSION = 2
+# What PRAGMA user_version is set to; indexes with any other version are rebuilt.
+SCHEMAVERSION = INDEXVERSION * 100 + TOKENVERSION
+
+class resumeIndex:
+    """Inverted index of resume tokens, stored in an SQLite database."""
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        version, = self.db.execute('PRAGMA user_version').fetchone()
+        if version != SCHEMAVERSION:
+            self.db.executescript('''
+                DROP TABLE IF EXISTS postings;
+                DROP TABLE IF EXISTS resumes;
+            ''')
+            self.db.execute('PRAGMA user_version = ' + str(SCHEMAVERSION))
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS resumes (
+                id INTEGER PRIMARY KEY,
+                directory TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                UNIQUE (directory, name));
+            CREATE TABLE IF NOT EXISTS postings (
+                token TEXT NOT NULL,
+                written TEXT NOT NULL,
+                resume INTEGER NOT NULL,
+                positions BLOB NOT NULL,
+                PRIMARY KEY (token, resume, written)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS postings_by_resume ON postings (resume);
+        ''')
+
+    def close(self):
+        self.db.close()
+
+    def update(self, directory):
+        """Bring the index up to date with the text resumes in directory.
+
+        Returns the number of new or changed resumes that were (re)indexed,
+        and the number of deleted ones that were dropped.
+        """
+        directory = os.path.abspath(directory)
+        onDisk = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if isResumeText(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    onDisk[entry.name] = (stat.st_size, stat.st_mtime)
+
+        removed = 0
+        indexed = set()
+        with self.db:
+            for rid, name, size, mtime in self.db.execute(
+                    'SELECT id, name, size, mtime FROM resumes WHERE directory = ?', (directory,)).fetchall():
+                if onDisk.get(name) == (size, mtime):
+                    indexed.add(name)
+                    continue
+                self.db.execute('DELETE FROM postings WHERE resume = ?', (rid,))
+                self.db.execute('DELETE FROM resumes WHERE id = ?', (rid,))
+                if name not in onDisk:
+                    removed += 1
+
+        added = 0
+        for name in sorted(onDisk.keys() - indexed):
+            with open(os.path.join(directory, name), 'r') as resume:
+                contents = resume.read()
+            positions = {}
+            for position, written in enumerate(surfaceTokens(contents)):
+                positions.setdefault((written.casefold(), written), array('I')).append(position)
+            # One transaction per resume, so an interrupted update only
+            # loses the resume it was working on.
+            with self.db:
+                rid = self.db.execute(
+                        'INSERT INTO resumes (directory, name, size, mtime) VALUES (?, ?, ?, ?)',
+                        (directory, name) + onDisk[name]).lastrowid
+                self.db.executemany('INSERT INTO postings (token, written, resume, positions) VALUES (?, ?, ?, ?)',
+                                    [(token, written, rid, p.tobytes()) for (token, written), p in positions.items()])
+            added += 1
+        return added, removed
+
+    def resumes(self, directory=None):
+        """Map resume ids to (directory, name)."""
+        if directory is None:
+            rows = self.db.execute('SELECT id, directory, name FROM resumes')
+        else:
+            rows = self.db.execute('SELECT id, directory, name FROM resumes WHERE directory = ?',
+                                   (os.path.abspath(directory),))
+        return {rid: (d, name) for rid, d, name in rows}
+
+    def postings(self, token):
+        """Map resume ids to the positions of token in that resume, and how
+        it was written at each of them."""
+        found = {}
+        for rid, written, positions in self.db.execute(
+                'SELECT resume, written, positions FROM postings WHERE token = ?', (token,)):
+            found.setdefault(rid, {}).update((position, written) for position in array('I', positions))
+        return found
+
+    def findPhrase(self, tokens, notFollowedBy=()):
+        """Map the ids of resumes where tokens appear next to each other, and
+        aren't followed by the tokens in notFollowedBy, to the set of ways
+        the phrase was written."""
+        if not tokens:
+            return {}
+        lists = [self.postings(token) for token in tokens]
+        candidates = set(lists[0]).intersection(*lists[1:])
+        excluded = [self.postings(token) for token in notFollowedBy]
+        found = {}
+        for rid in candidates:
+            for start in lists[0][rid]:
+                if not all(start + i in lists[i][rid] for i in range(1, len(tokens))):
+                    continue
+                after = start + len(tokens)
+                if excluded and all(after + i in excluded[i].get(rid, ()) for i in range(len(excluded))):
+                    continue
+                found.setdefault(rid, set()).add(phraseText([lists[i][rid][start + i] for i in range(len(tokens))]))
+        return found
+
+    def searchText(self, alternative, resumes):
+        """Fall back to a regular expression search of the resume text files."""
+        pattern = re.compile(r'\b(?:' + alternative + r')\b', flags=re.IGNORECASE)
+        leading = tokenize(unescape(metaPattern.split(alternative)[0]))
+        if leading:
+            candidates = self.postings(leading[0]).keys() & resumes.keys()
+        else:
+            candidates = resumes.keys()
+        found = {}
+        for rid in candidates:
+            with open(os.path.join(*resumes[rid]), 'r') as resume:
+                hits = set(m.group() for m in pattern.finditer(resume.read()))
+            if hits:
+                found[rid] = hits
+        return found
+
+    def findKeyword(self, keyword, resumes):
+        """Map the ids of resumes matching keyword to the set of matched phrases."""
+        found = {}
+        for alternative in splitAlternatives(keyword):
+            parsed = parseAlternative(alternative)
+            if parsed is None:
+                for rid, hits in self.searchText(alternative, resumes).items():
+                    found.setdefault(rid, set()).update(hits)
+                continue
+            tokens, notFollowedBy = parsed
+            for rid, phrases in self.findPhrase(tokens, notFollowedBy).items():
+                if rid in resumes:
+                    found.setdefault(rid, set()).update(phrases)
+        return found
+
+    def matchProjects(self, projects, directory=None):
+        """For each project, map the ids of strongly and weakly matching
+        resumes to their matched keywords.
+
+        A resume is a strong match if it matches all of a project's
+        keywords, and a weak match if it matches some of them.
+        """
+        resumes = self.resumes(directory)
+        keywordHits = {}
+        results = []
+        for project in projects:
+            for keyword in project.keywords:
+                if keyword not in keywordHits:
+                    keywordHits[keyword] = self.findKeyword(keyword, resumes)
+            hits = [keywordHits[keyword] for keyword in project.keywords]
+            strong = {}
+            weak = {}
+            for rid in set().union(*hits):
+                keywords = set().union(*[h[rid] for h in hits if rid in h])
+                if all(rid in h for h in hits):
+                    strong[rid] = keywords
+                else:
+                    weak[rid] = keywords
+            results.append((strong, weak))
+        return results
+
+def matchResumesFromIndex(index, resumeFiles, projects):
+    """Fill in project matches for resumeFiles from the index instead of
+    scanning the resume text."""
+    byPath = {(os.path.abspath(resume.path), resume.textFileName): resume for resume in resumeFiles}
+    resumes = index.resumes()
+    for project, (strong, weak) in zip(projects, index.matchProjects(projects)):
+        for rid in sorted(strong):
+            resume = byPath.get(resumes[rid])
+            if resume:
+                resume.strongProjectMatches.append((project, strong[rid]))
+                project.strongResumeMatches.append(resume)
+        for rid in sorted(weak):
+            resume = byPath.get(resumes[rid])
+            if resume:
+                resume.weakProjectMatches.append((project, weak[rid]))
+                project.weakResumeMatches.append(resume)
+
+def main():
+    parser = argparse.ArgumentParser(description='Update an inverted index of text resumes and count project matches.')
+    parser.add_argument('index', help='SQLite index file to create or update')
+    parser.add_argument('dir', nargs='+', help='Directories with .txt resume files')
+    parser.add_argument('--catalog', action='append', help='JSON or YAML project catalog to count matches for; can be repeated (default: catalogs/2017-may-august.json)')
+    args = parser.parse_args()
+
+    projects = projectsMay2017
+    if args.catalog:
+        projects = loadCatalogs(args.catalog)
+    index = resumeIndex(args.index)
+    for directory in args.dir:
+        added, removed = index.update(directory)
+        print('Indexed', added, 'and dropped', removed, 'resumes in', directory)
+
+    for project, (strong, weak) in zip(projects, index.matchProjects(projects)):
+        print(len(strong), '\t', len(weak), '\t', project.name, '\t', project.description)
+    index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Where does the time go in a resumesearch.py run?
+#
+# $ resumesearch.py tapia-2017/ --profile profile.json
+#
+# records the wall time and number of calls of every stage of the run
+# (reading resumes, booth lookups, matching, writing emails, ...).
+#
+# All keywords are matched in one scan of each resume, so the time of a
+# single keyword can't be measured in a normal run. Instead, a sample of
+# the resumes is matched again with every keyword pattern on its own, and
+# with the email address pattern. That finds slow patterns at a small
+# fraction of the cost of the matching itself.
+#
+# The report is printed sorted by time, and saved as JSON. Print a saved
+# profile again with:
+#
+# $ resumeprofile.py profile.json
+
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager
+
+# Match one in this many resumes again to time the patterns.
+SAMPLEEVERY = 100
+# The stage that does that. It's only there because of --profile, so it's
+# reported apart from the stages of the run.
+PATTERNSTAGE = 'profile patterns'
+
+class profiler:
+    """Wall time and call counts of the stages of a run, and sampled pattern times."""
+    def __init__(self):
+        self.stages = {}
+        # Pattern name -> [seconds, matches] on the sampled resumes.
+        self.patterns = {}
+        # Project label -> seconds of its keywords on the sampled resumes.
+        self.projects = {}
+        self.resumes = 0
+        self.sampledResumes = 0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, [0.0, 0])
+            entry[0] += time.perf_counter() - start
+            entry[1] += 1
+
+    def addPattern(self, name, seconds, matches):
+        entry = self.patterns.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += matches
+
+    def addProject(self, label, seconds):
+        self.projects[label] = self.projects.get(label, 0.0) + seconds
+
+    def asDict(self):
+        return {
+            'resumes': self.resumes,
+            'sampledResumes': self.sampledResumes,
+            'stages': {name: {'seconds': seconds, 'calls': calls}
+                       for name, (seconds, calls) in self.stages.items()},
+            'patterns': {name: {'seconds': seconds, 'matches': matches}
+                         for name, (seconds, matches) in self.patterns.items()},
+            'projects': {label: {'seconds': seconds}
+                         for label, seconds in self.projects.items()},
+        }
+
+    def save(self, path):
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.asDict(), f, indent=2, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+def printReport(profile, top=20):
+    """Print a profile (as returned by profiler.asDict()) sorted by time."""
+    stages = {name: s for name, s in profile['stages'].items() if name != PATTERNSTAGE}
+    total = sum(s['seconds'] for s in stages.values())
+    print('Stage                          seconds   calls       %')
+    for name, s in sorted(stages.items(), key=lambda item: -item[1]['seconds']):
+        print('{:28} {:10.3f} {:7} {:6.1f}%'.format(name, s['seconds'], s['calls'], 100 * s['seconds'] / (total or 1)))
+    print('{:28} {:10.3f}'.format('total', total))
+    if PATTERNSTAGE in profile['stages']:
+        print('{:28} {:10.3f}   (not part of the run)'.format(PATTERNSTAGE, profile['stages'][PATTERNSTAGE]['seconds']))
+
+    if not profile['sampledResumes']:
+        return
+    scale = profile['resumes'] / profile['sampledResumes']
+    print()
+    print('Patterns, timed on', profile['sampledResumes'], 'of', profile['resumes'], 'resumes',
+          '(estimated seconds are for all resumes):')
+    print('   sampled  estimated  matches  pattern')
+    for name, p in sorted(profile['patterns'].items(), key=lambda item: -item[1]['seconds'])[:top]:
+        print('{:10.6f} {:10.3f} {:8}  {}'.format(p['seconds'], p['seconds'] * scale, p['matches'], name))
+    print()
+    print('Projects (the sum of their keyword patterns):')
+    for label, p in sorted(profile['projects'].items(), key=lambda item: -item[1]['seconds'])[:top]:
+        print('{:10.6f} {:10.3f}  {}'.format(p['seconds'], p['seconds'] * scale, label))
+
+def main():
+    parser = argparse.ArgumentParser(description='Print a profile saved by resumesearch.py --profile.')
+    parser.add_argument('profile', help='JSON profile file')
+    parser.add_argument('--top', help='Number of patterns and projects to list', type=int, default=20)
+    args = parser.parse_args()
+
+    with open(args.profile, 'r') as f:
+        printReport(json.load(f), args.top)
+
+if __name__ == "__main__":
+    main()
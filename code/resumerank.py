@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Score every resume against every project, instead of only sorting them
+# into strong and weak matches.
+#
+# Each resume becomes a row of keyword counts in a sparse resume x keyword
+# matrix, which is weighted with BM25 (or TF-IDF), so that a keyword that
+# shows up in every resume counts for less than a rare one. Each project is
+# a column of a keyword x project matrix, with its keywords averaged, so
+# projects with long keyword lists don't win automatically. One sparse
+# matrix product then gives the score of every resume for every project.
+#
+# $ resumerank.py tapia-2017/ --top 10
+#
+# This needs NumPy and SciPy:
+# $ pip3 install numpy scipy
+
+import argparse
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError as e:
+    raise ImportError('Ranking resumes needs NumPy and SciPy; install them with: pip3 install numpy scipy') from e
+
+from resumesearch import findKeywordsInWorker, loadCatalogs, loadKeywordMatcher, poolStarmap, projectsMay2017, readResumeFiles
+
+WEIGHTINGS = ['bm25', 'tfidf']
+
+# Rows of the score matrix are turned into dense arrays this many at a time
+# when finding the top projects of every resume.
+BLOCKSIZE = 8192
+
+def keywordCountMatrix(resumeFiles, keywordLists, jobs=1, cachedir=None):
+    """Return a sparse resume x keyword matrix of match counts, and an array of resume lengths.
+
+    The columns are the keywords of loadKeywordMatcher(keywordLists).
+    """
+    # Loaded here first, so forked pool workers start out with it.
+    matcher = loadKeywordMatcher(keywordLists, cachedir)
+    if jobs > 1:
+        results = poolStarmap(jobs, findKeywordsInWorker,
+                              [(keywordLists, cachedir, resume.contents, True) for resume in resumeFiles])
+    else:
+        results = (findKeywordsInWorker(keywordLists, cachedir, resume.contents, True)
+                   for resume in resumeFiles)
+
+    indptr = [0]
+    indices = []
+    data = []
+    lengths = []
+    for counts, length in results:
+        for index, count in enumerate(counts):
+            if count:
+                indices.append(index)
+                data.append(count)
+        indptr.append(len(indices))
+        lengths.append(length)
+    matrix = sparse.csr_matrix((np.array(data, dtype=np.float64),
+                                np.array(indices, dtype=np.int32),
+                                np.array(indptr, dtype=np.int64)),
+                               shape=(len(lengths), len(matcher.keywords)))
+    return matrix, np.array(lengths, dtype=np.float64)
+
+def weightMatrix(counts, lengths, weighting='bm25', k1=1.2, b=0.75):
+    """Weight a resume x keyword count matrix with BM25 or TF-IDF."""
+    if weighting not in WEIGHTINGS:
+        raise ValueError('Unknown weighting: ' + weighting)
+    resumes = counts.shape[0]
+    # The number of resumes each keyword shows up in.
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    tf = counts.data
+    # The row of every stored count.
+    rows = np.repeat(np.arange(resumes), np.diff(counts.indptr))
+    if weighting == 'bm25':
+        idf = np.log(1 + (resumes - df + 0.5) / (df + 0.5))
+        average = lengths.mean() if resumes and lengths.mean() > 0 else 1
+        norm = k1 * (1 - b + b * lengths[rows] / average)
+        weights = tf * (k1 + 1) / (tf + norm)
+    else:
+        idf = np.log((1 + resumes) / (1 + df)) + 1
+        weights = 1 + np.log(tf)
+    weights = weights * idf[counts.indices]
+    return sparse.csr_matrix((weights, counts.indices, counts.indptr), shape=counts.shape)
+
+def projectMatrix(matcher):
+    """Return the keyword x project matrix that averages each project's keyword weights."""
+    rows = []
+    cols = []
+    data = []
+    for project, indexes in enumerate(matcher.projectKeywords):
+        for index in set(indexes):
+            rows.append(index)
+            cols.append(project)
+            data.append(1 / len(set(indexes)))
+    return sparse.csc_matrix((data, (rows, cols)),
+                             shape=(len(matcher.keywords), len(matcher.projectKeywords)))
+
+def topIndexes(scores, k):
+    """Return the indexes of the k highest positive scores in a 1-D array, best first.
+
+    Ties go to the lower index.
+    """
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > k:
+        # The k-th best score; everything at least that good is a candidate,
+        # so ties at the cutoff are broken by index, not by argpartition.
+        cutoff = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+        candidates = candidates[scores[candidates] >= cutoff]
+    order = np.lexsort((candidates, -scores[candidates]))
+    return candidates[order][:k]
+
+class resumeRanking:
+    """Scores of every resume for every project."""
+    def __init__(self, resumeFiles, projects, scores):
+        self.resumeFiles = resumeFiles
+        self.projects = projects
+        # Sparse resume x project matrix.
+        self.scores = scores
+
+    def topProjects(self, k):
+        """For each resume, a list of its k best (project, score) pairs."""
+        for start in range(0, self.scores.shape[0], BLOCKSIZE):
+            block = self.scores[start:start + BLOCKSIZE].toarray()
+            # A stable sort, so ties go to the lower index like in topIndexes().
+            best = np.argsort(-block, axis=1, kind='stable')[:, :k]
+            bestScores = np.take_along_axis(block, best, axis=1)
+            for indexes, values in zip(best.tolist(), bestScores.tolist()):
+                yield [(self.projects[i], score) for i, score in zip(indexes, values) if score > 0]
+
+    def topResumes(self, k):
+        """For each project, a list of its k best (resume, score) pairs."""
+        columns = self.scores.tocsc()
+        for project in range(len(self.projects)):
+            start, end = columns.indptr[project], columns.indptr[project + 1]
+            rows = columns.indices[start:end]
+            values = columns.data[start:end]
+            yield [(self.resumeFiles[rows[i]], values[i]) for i in topIndexes(values, k)]
+
+    def annotate(self):
+        """Set projectScores on every resume with strong matches, so its emails list the best projects first."""
+        index = {project: i for i, project in enumerate(self.projects)}
+        scores = self.scores
+        for row, resume in enumerate(self.resumeFiles):
+            if not resume.strongProjectMatches:
+                continue
+            start, end = scores.indptr[row], scores.indptr[row + 1]
+            rowScores = dict(zip(scores.indices[start:end], scores.data[start:end]))
+            resume.projectScores = {project: rowScores.get(index[project], 0.0)
+                                    for project, keywords in resume.strongProjectMatches}
+
+def rankResumes(resumeFiles, projects=projectsMay2017, weighting='bm25', jobs=1, cachedir=None):
+    """Score resumeFiles against every project and return a resumeRanking."""
+    keywordLists = tuple(tuple(project.keywords) for project in projects)
+    matcher = loadKeywordMatcher(keywordLists, cachedir)
+    counts, lengths = keywordCountMatrix(resumeFiles, keywordLists, jobs, cachedir)
+    weights = weightMatrix(counts, lengths, weighting)
+    scores = (weights @ projectMatrix(matcher)).tocsr()
+    scores.eliminate_zeros()
+    return resumeRanking(resumeFiles, projects, scores)
+
+def projectLabel(project):
+    if project.description:
+        return project.name + ' (' + project.description + ')'
+    return project.name
+
+def printTopResumes(ranking, k):
+    for project, top in zip(ranking.projects, ranking.topResumes(k)):
+        if top:
+            print('Top resumes for', projectLabel(project) + ':',
+                  ' '.join('{} {:.2f}'.format(resume.pdfFileName, score) for resume, score in top))
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank text resume files against the Outreachy projects.')
+    parser.add_argument('dir', help='Directory with .txt resume files (or a corpus packed from one with resumecorpus.py)')
+    parser.add_argument('--top', help='Number of resumes to list per project and projects per resume', type=int, default=10)
+    parser.add_argument('--weighting', help='How to weight keyword matches', choices=WEIGHTINGS, default='bm25')
+    parser.add_argument('--jobs', help='Number of processes to read and match resumes with', type=int, default=1)
+    parser.add_argument('--catalog', action='append', help='JSON or YAML project catalog to rank against; can be repeated (default: catalogs/2017-may-august.json)')
+    args = parser.parse_args()
+
+    projects = projectsMay2017
+    if args.catalog:
+        projects = loadCatalogs(args.catalog)
+    resumeFiles = readResumeFiles(args.dir, args.jobs)
+    ranking = rankResumes(resumeFiles, projects, args.weighting, args.jobs)
+    printTopResumes(ranking, args.top)
+    for resume, top in zip(resumeFiles, ranking.topProjects(args.top)):
+        if top:
+            print(resume.pdfFileName + ':',
+                  ', '.join('{} {:.2f}'.format(projectLabel(project), score) for project, score in top))
+
+if __name__ == "__main__":
+    main()
@@ -16,34 +16,42 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 #
 # This script attempts to match skillset keywords in resumes with
-# Outreachy projects. The skillset keyword lists are based on the
-# Outreachy project list at:
+# Outreachy projects. The skillset keyword lists are in the project
+# catalogs in the catalogs directory (see projectcatalog.py). The default
+# one is based on the Outreachy project list at:
 # https://wiki.gnome.org/Outreachy/2017/MayAugust
 #
 # This program expects you to have created a directory with identically
 # named PDF and text resume files. You can translate PDF files to text with:
 # $ for i in `ls *.pdf`; do pdftotext $i; done
+#
+# or pass --extract, which runs pdftotext (see pdftextcache.py) only on
+# PDFs that haven't been extracted before.
 
 import argparse
 import csv
+import hashlib
+import json
+import multiprocessing
 import os
 import re
 import textwrap
-#from fuzzywuzzy import fuzz
+import time
+from contactledger import contactLedger, hashResume
+from fuzzyemail import fuzzyEmailIndex
+from identityindex import canonicalEmail, identityIndex, primaryEmail
+from pdfstore import PLACEMENTS, pdfStore, placeFile
+from mailspool import MailSpool, add_format_argument
+from pdftextcache import extractPdfs
+from residency import RESIDENCIES, classifyResidency, writeManifest
+from projectcatalog import DEFAULTCATALOG, loadCatalog, loadCatalogs, outreachyProject
+from resumeprofile import PATTERNSTAGE, SAMPLEEVERY, printReport, profiler
 from enum import Enum
-from collections import Counter
-from shutil import copyfile
-
-class outreachyProject:
-    """Outreachy project name, description, keywords, and matching resume storage."""
-    def __init__(self, name, short, description, keywords, printskip):
-        self.name = name
-        self.description = description
-        self.keywords = keywords
-        self.strongResumeMatches = []
-        self.weakResumeMatches = []
-        self.short = short
-        self.printskip = printskip
+from functools import cached_property
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+emailPattern = re.compile(r'[\w\.-\_\+]+@[\w\.-]+')
 
 class resumeFile:
     """Information relating to a text and pdf resume pair."""
@@ -52,247 +60,398 @@ class resumeFile:
         self.textFileName = textFileName
         self.pdfFileName = os.path.splitext(textFileName)[0] + '.pdf'
         self.contents = contents
-        self.emails = re.findall(r'[\w\.-\_\+]+@[\w\.-]+', contents)
+        self.emails = emailPattern.findall(contents)
         self.strongProjectMatches = []
         self.weakProjectMatches = []
-
-def readResumeFiles(directory):
-    resumeFiles = []
-    for f in [l for l in os.listdir(directory) if l.endswith('.txt') and
-              not l.endswith('-email.txt') and
-              not l.endswith('-email-tam.txt')]:
-        with open(os.path.join(directory, f), 'r') as resume:
-            contents = resume.read()
-        resumeFiles.append(resumeFile(directory, f, contents))
+        # Scores for the strongly matched projects, if the resumes were
+        # ranked with resumerank.py.
+        self.projectScores = {}
+
+    @cached_property
+    def residencyGuess(self):
+        """('us', 'international', or 'unknown', confidence); see residency.py.
+
+        Only worked out the first time it's needed.
+        """
+        return classifyResidency(self.contents)
+
+    @property
+    def residency(self):
+        return self.residencyGuess[0]
+
+    @property
+    def residencyConfidence(self):
+        return self.residencyGuess[1]
+
+    @property
+    def digest(self):
+        """The hash of the resume text, as stored in the contact ledger."""
+        return hashResume(self.contents)
+
+def isResumeText(filename):
+    """Whether filename is a text resume, and not an email written for one."""
+    return (filename.endswith('.txt') and
+            not filename.endswith('-email.txt') and
+            not filename.endswith('-email-tam.txt'))
+
+def readResumeFile(directory, f, residency=False):
+    with open(os.path.join(directory, f), 'r') as resume:
+        contents = resume.read()
+    resume = resumeFile(directory, f, contents)
+    if residency:
+        resume.residencyGuess
+    return resume
+
+def poolStarmap(jobs, function, arguments):
+    """Run function over arguments in a pool of jobs processes.
+
+    Results come back in the same order as arguments.
+    """
+    # A few chunks per worker keeps them all busy without paying the
+    # inter-process overhead for every single resume.
+    chunksize = max(1, len(arguments) // (jobs * 4))
+    with multiprocessing.Pool(jobs) as pool:
+        return pool.starmap(function, arguments, chunksize=chunksize)
+
+class streamedResume(resumeFile):
+    """A resumeFile that only keeps what was found in its text, and reads
+    the text from disk again when it's needed."""
+    # Hashed while the text is at hand, so the ledger doesn't read it again.
+    digest = None
+
+    def __init__(self, path, textFileName, contents, residency=False):
+        self.path = path
+        self.textFileName = textFileName
+        self.pdfFileName = os.path.splitext(textFileName)[0] + '.pdf'
+        self.emails = emailPattern.findall(contents)
+        self.digest = hashResume(contents)
+        if residency:
+            # Guessed now, rather than reading the text again later.
+            self.residencyGuess = classifyResidency(contents)
+        self.strongProjectMatches = []
+        self.weakProjectMatches = []
+        self.projectScores = {}
+
+    @property
+    def contents(self):
+        with open(os.path.join(self.path, self.textFileName), 'r') as resume:
+            return resume.read()
+
+def readAhead(function, items, threads=4, window=32):
+    """Yield function(item) for each item, in order, while a pool of threads
+    works on at most window items ahead."""
+    with ThreadPoolExecutor(threads) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def readStreamedResume(directory, f, residency=False):
+    with open(os.path.join(directory, f), 'r') as resume:
+        contents = resume.read()
+    return streamedResume(directory, f, contents, residency), contents
+
+def iterResumeTexts(directory, threads=4, residency=False):
+    """Yield (resume, text) for the resumes in directory one at a time, in
+    the same order as readResumeFiles, reading the next few files ahead on
+    a thread pool.
+
+    Each text is read once, and only one window of them is in memory at a
+    time; the resumes that are yielded read their text again if it's
+    needed later. If residency is true, their residency guesses are worked
+    out while the texts are at hand.
+    """
+    if os.path.isfile(directory):
+        # Imported here because resumecorpus imports this module.
+        import resumecorpus
+        for resume in resumecorpus.packedCorpus(directory).resumes:
+            yield resume, resume.contents
+        return
+    with os.scandir(directory) as entries:
+        files = sorted(entry.name for entry in entries if isResumeText(entry.name))
+    yield from readAhead(lambda f: readStreamedResume(directory, f, residency), files, threads)
+
+def iterResumeFiles(directory, threads=4, residency=False):
+    """Yield the resumes in directory one at a time, like iterResumeTexts."""
+    if os.path.isfile(directory):
+        # Imported here because resumecorpus imports this module.
+        import resumecorpus
+        yield from resumecorpus.packedCorpus(directory).resumes
+        return
+    for resume, contents in iterResumeTexts(directory, threads, residency):
+        yield resume
+
+def readResumeFiles(directory, jobs=1, residency=False):
+    """Read the resumes in directory (or a packed corpus).
+
+    If residency is true, their residency guesses are worked out while
+    they're read (in the worker processes, with jobs > 1).
+    """
+    if os.path.isfile(directory):
+        # Imported here because resumecorpus imports this module.
+        import resumecorpus
+        return resumecorpus.packedCorpus(directory).resumes
+
+    # Sort so that every run (serial or parallel) handles resumes in the same order.
+    files = sorted(l for l in os.listdir(directory) if isResumeText(l))
+    if jobs > 1:
+        # Reading and the email regex run in the worker processes.
+        resumeFiles = poolStarmap(jobs, readResumeFile, [(directory, f, residency) for f in files])
+    else:
+        resumeFiles = [readResumeFile(directory, f, residency) for f in files]
     #print("Found", len(resumeFiles), "resume files")
-    for r in resumeFiles:
-        if len(r.emails) == 0:
-            continue
-        line = r.pdfFileName
-        for email in r.emails:
-            line = line + ' ' + email
-        line = line + ' ' + str(len(r.contents))
-    # The first email is usually the actual email.
-    emails = [resume.emails[0] for resume in resumeFiles if resume.emails]
-    edups = [item for item, count in Counter(emails).items() if count > 1]
-    for email in edups:
-        pdfs = [resume.pdfFileName for resume in resumeFiles if resume.emails and resume.emails[0] == email]
-        print('Email duplicate:', email, ' '.join(pdfs))
     return resumeFiles
 
-def searchForEmail(csvFile, resumeFiles):
+def searchForEmail(csvFile, identities, fuzzyIndex=None, threshold=0.9):
+    """Look up everyone who stopped by the booth in an identityIndex.
+
+    If there's no exact match and a fuzzyEmailIndex of the identity index
+    addresses is given, the closest addresses with a match confidence of
+    at least threshold are used instead.
+
+    Returns a list of (email, set name, pdf files, confidence) for every
+    resume set a visitor was found in, and a list of visitors without a
+    resume.
+    """
+    boothstops = []
+    noResume = []
     with open(csvFile, 'r') as csvFile:
         freader = csv.DictReader(csvFile, delimiter=',', quotechar='"')
-        boothstops = []
         for row in freader:
-            # Create a list of potential matches for the email we have.
-            # Search through the list of emails in each PDF.
-            # Use fuzzywuzzy to do a fuzzy search in case we misread an email.
-            # No difference between pure match when I tried this, and going down to 80 only added false positives
-            #m = [r for r in resumeFiles if len([email for email in r.emails if fuzz.ratio(row['Email'], email) > 90]) != 0]
-            m = [r for r in resumeFiles if row['Email'] in r.emails]
-            if len(m) == 0:
+            email = canonicalEmail(row['Email'])
+            m = identities.lookup(email)
+            score = 1.0
+            if not m and fuzzyIndex:
+                # Booth sign-up sheets are hand-typed, so try the closest
+                # addresses in case we misread an email.
+                candidates = fuzzyIndex.search(email, threshold)
+                if candidates:
+                    score = candidates[0][1]
+                    m = [match for candidate, s in candidates if s == score
+                         for match in identities.lookup(candidate)]
+            if not m:
+                noResume.append(row['Email'])
                 continue
-            files = set()
-            for resume in m:
-                files.add(resume.pdfFileName)
-            boothstops.append((row['Email'], list(files)))
-    return boothstops
-
-projectsMay2017 = [
-    #outreachyProject('Outreachy',
-    #                 ['open source', 'free software', 'Linux', 'Unix', 'Solaris']),
-    outreachyProject('Cadasta', 'a property rights tool',
-                     'enhance user settings and create a user dashboard',
-                     ['django'], []),
-    outreachyProject('Cadasta', 'a property rights tool',
-                     'add new login options',
-                     ['django|oauth'], []),
-    outreachyProject('Cadasta', 'a property rights tool',
-                     'improve automated test coverage',
-                     ['selenium'], []),
-
-    outreachyProject('Ceph', 'a network filesystem',
-                     'create a root cause analysis tool for Linux distributed systems',
-                    ['linux', 'distributed systems'], ['linux', 'distributed systems']),
-    outreachyProject('Ceph', 'a network filesystem',
-                     'evaluate the performance of new reweight algorithms for balancing storage utilization',
-                    ['statistics', 'storage', 'linux'], ['statistics', 'storage', 'linux']),
-    outreachyProject('Ceph', 'a network filesystem',
-                     'design a status dashboard to visualize Ceph cluster statistics',
-                    ['python', 'linux', 'javascript', 'html5', 'css3'], []),
-    outreachyProject('Ceph', 'a network filesystem',
-                     'identify performance degradation in nodes and automate cluster response',
-                    ['Linux', 'python', 'distributed systems'], []),
-    outreachyProject('Ceph','a network filesystem',
-                     'design a simplified database backend for the Ceph Object Gateway',
-                    ['database', 'Linux', 'C\+\+'], ['database']),
-    outreachyProject('Ceph','a network filesystem',
-                     'port tests written in multiple languages to test the Amazon S3 storage protocol and Openstack Swift storage',
-                    ['python', 'linux', 'storage'], ['storage']),
-
-    outreachyProject('Debian', 'a Linux distribution',
-                     'benchmark scientific packages for general and architecture specific builds',
-                    ['linux', 'gcc'], ['linux']),
-    outreachyProject('Debian', 'a Linux distribution',
-                     'improve the Debian test database and website',
-                    ['linux', 'python', 'sql', 'shell|bash|command-line'], ['linux', 'command-line']),
-    outreachyProject('Debian', 'a Linux distribution',
-                     'enhance the Debian test website',
-                    ['html', 'css', 'linux', 'graphic'], ['linux', 'graphic']),
-    outreachyProject('Debian', 'a Linux distribution',
-                     'Add secure mail server support to FreedomBox (a web server for small machines)',
-                    ['python', 'django', 'shell|bash|command-line'], ['command-line']),
-
-    outreachyProject('Discourse', 'chat forum software',
-                     'enhance their forum and chat web services',
-                    ['rails', 'javascript|ember.js'], []),
-
-    outreachyProject('Fedora', 'a Linux distribution',
-                     'create a coloring book to explain technical concepts',
-                     ['inkscape|scribus|storyboard|storyboarding|graphic design'], ['graphic design', 'storyboard', 'storyboarding']),
-    outreachyProject('Fedora', 'a Linux distribution',
-                     'improve Bodhi, the web-system that publishes updates for Fedora',
-                     ['python', 'javascript|html|css|linux|fedora'], []),
-
-    outreachyProject('GNOME', None,
-                     'improve the recipes or maps applications',
-                     ['gtk'], []),
-
-    outreachyProject('Lagome', 'a microservices platform',
-                     "create an online auction sample app to showcase Lagome's microservices",
-                     ['java', 'scala|react|reactive'], ['react', 'reactive']),
-
-    outreachyProject('Linux kernel', None,
-                     'analyze memory resource release operators and fix Linux kernel memory bugs',
-                     ['linux', 'operating systems', 'memory'], ['linux', 'operating systems', 'memory']),
-    outreachyProject('Linux kernel', None,
-                     'improve process ID allocation',
-                     ['linux', 'operating systems', 'kernel'], ['linux', 'operating systems', 'kernel']),
-    outreachyProject('Linux kernel', None,
-                     'improve nftables (an in-kernel network filtration tool)',
-                     ['linux', 'operating systems', 'networking'], ['linux', 'operating systems', 'networking']),
-    outreachyProject('Linux kernel', None,
-                     'write a driver for a sensor using the Industrial I/O interface',
-                     ['linux', 'operating systems|robotics|embedded', 'C\+\+|C(?!\+\+)'],
-                     ['linux', 'operating systems', 'robotics', 'embedded', 'c++']),
-    outreachyProject('Linux kernel', None,
-                     'improve documentation build system and translate docs into ReStructured Text format',
-                     ['perl', 'python', 'operating systems'], ['operating systems']),
-
-    outreachyProject('Mozilla', None,
-                     None,
-                     ['mozilla|firefox'], ['mozilla', 'firefox']),
-
-    outreachyProject('OpenStack', 'software for cloud deployment and management',
-                     'add continuous integration for OpenStack Identity Service (keystone) LDAP support',
-                     ['python', 'shell|bash|command-line'], ['command-line']),
-
-    outreachyProject('oVirt', 'virtualization management software',
-                     'implement oVirt integration tests using Lago and the oVirt REST API',
-                     ['python', 'rest'], ['rest']),
-    outreachyProject('oVirt', 'virtualization management software',
-                     'design an oVirt log analyzer for distributed systems',
-                     ['python', 'linux', 'distributed systems'], ['distributed systems']),
-    outreachyProject('oVirt', 'virtualization management software',
-                     'rewrite oVirt UI dialogs in modern JavaScript technologies',
-                     ['es6|react|redux'], []),
-
-    outreachyProject('QEMU', 'hardware virtualization software',
-                     'rework the QEMU audio backend',
-                     ['C(?!\+\+)', 'audio'], ['audio']),
-    outreachyProject('QEMU', 'hardware virtualization software',
-                     'create a full and incremental disk backup tool',
-                     ['C(?!\+\+)', 'python', 'storage'], ['storage']),
-    outreachyProject('QEMU', 'hardware virtualization software',
-                     "refactor the block layer's I/O throttling and write notifiers",
-                     ['C(?!\+\+)', 'storage'], ['storage']),
-    outreachyProject('QEMU', 'hardware virtualization software',
-                     "code an emulated PCIe-to-PCI bridge",
-                     ['pci|pcie'], ['pci', 'pcie']),
-    outreachyProject('QEMU', 'hardware virtualization software',
-                     "add x86 virtualization support on macOS using Hypervisor.framework",
-                     ['C(?!\+\+)', 'mac', 'virtualization'], ['mac', 'virtualization']),
-    outreachyProject('QEMU', 'hardware virtualization software',
-                     "extend the current vhost-pci based inter-VM communication",
-                     ['C(?!\+\+)', 'pci'], ['pci']),
-
-    outreachyProject('Sugar Labs', 'a software-development and learning community',
-                     'improve Music Blocks, an application for exploring fundamental musical concepts',
-                     ['javascript|JS', 'music'], ['music']),
-
-    outreachyProject('Wikimedia', 'a non-profit known for Wikipedia',
-                     'write a Zotero translator and document the process',
-                     ['javascript', 'documentation'], ['documentation']),
-    outreachyProject('Wikimedia', 'a non-profit known for Wikipedia',
-                     'improve and fix bugs in the quiz extension',
-                     ['php', 'documentation'], ['documentation']),
-    outreachyProject('Wikimedia', 'a non-profit known for Wikipedia',
-                     'create user guides to help with translation outreach',
-                     ['translation|localization'], ['translation', 'localization']),
-    outreachyProject('Wikimedia', 'a non-profit known for Wikipedia',
-                     'implement automatic edits on wikis connected to the Programs & Events Dashboard',
-                     ['rails'], []),
-    outreachyProject('Wikimedia', 'a non-profit known for Wikipedia',
-                     'implement an automatic article feedback feature for the Programs & Events Dashboard',
-                     ['rails'], []),
-
-    outreachyProject('Wine', 'a tool to run Windows programs on Linux or BSD',
-                     'implement a resource editor and dialog editor',
-                     ['C(?!\+\+)', 'Windows', 'UI|UX'], ['windows', 'ui', 'ux']),
-    outreachyProject('Wine', 'a tool to run Windows programs on Linux or BSD',
-                     'implement missing D3DX9 APIs',
-                     ['C(?!\+\+)', 'computer graphics'], []),
-    outreachyProject('Wine','a tool to run Windows programs on Linux or BSD',
-                     'implement Direct3D microbenchmarks',
-                     ['C(?!\+\+)', 'opengl'], []),
-    outreachyProject('Wine','a tool to run Windows programs on Linux or BSD',
-                     'create automated game benchmarks',
-                     ['C(?!\+\+)', 'game engine'], ['game engine']),
-    outreachyProject('Wine','a tool to run Windows programs on Linux or BSD',
-                     'port WineLib to a new architecture (such as PPC64, Sparc64, RISC-V, or x32)',
-                     ['PPC|PowerPC|Sparc|Sparc64|RISC-V'], ['ppc', 'powerpc', 'sparc', 'sparc64', 'risc-v']),
-    outreachyProject('Wine','a tool to run Windows programs on Linux or BSD',
-                     'improve the AppDB website, which lists Wine support for Windows programs',
-                     ['php', 'html', 'mysql'], []),
-
-    outreachyProject('Xen Project', 'a virtualization platform',
-                     'create golang bindings for libxl on the Xen hypervisor',
-                     ['go', 'C(?!\+\+)'], []),
-    outreachyProject('Xen Project', 'a virtualization platform',
-                     'create rust bindings for libxl on the Xen hypervisor',
-                     ['rust'], ['rust']),
-    outreachyProject('Xen Project', 'a virtualization platform',
-                     'enhance the KDD (Windows Debugger Stub) for the Xen hypervisor',
-                     ['C(?!\+\+)', 'windows', 'kernel|debugger'], ['windows', 'debugger']),
-    outreachyProject('Xen Project', 'a virtualization platform',
-                     'fuzz test the Xen hypercall interface',
-                     ['C(?!\+\+)', 'assembly', 'gcc'], []),
-    outreachyProject('Xen Project', 'a virtualization platform',
-                     'improve Mirage OS, a unikernel that runs on top of Xen',
-                     ['ocaml'], []),
-    outreachyProject('Xen Project', 'a virtualization platform',
-                     'create a Xen code review dashboard',
-                     ['sql', 'javascript', 'html5', 'java'], []),
-    #outreachyProject('Xen Project', 'a virtualization platform',
-    #                 'implement tools for code standards checking using clang-format',
-    #                 ['clang']),
-    outreachyProject('Xen Project', 'a virtualization platform',
-                     'add more FreeBSD testing to osstest',
-                     ['freebsd|bsd|openbsd|netbsd|dragonfly'], ['freebsd', 'bsd', 'openbsd', 'netbsd', 'dragonfly']),
-
-    outreachyProject('Yocto', 'a tool for creating embedded Linux distributions',
-                     'improve and document the Yocto autobuilder',
-                     ['C(?!\+\+)', 'python', 'distro|linux|yocto|openembedded', 'embedded|robotics|beaglebone|beagle bone|minnow|minnowboard|arduino'], ['distro', 'linux', 'yocto', 'embedded', 'robotics', 'beaglebone', 'beagle bone', 'minnow', 'minnowboard', 'arduino']),
-]
+            files = {}
+            for setName, resume in m:
+                files.setdefault(setName, set()).add(resume.pdfFileName)
+            for setName, pdfs in files.items():
+                boothstops.append((row['Email'], setName, sorted(pdfs), score))
+    return boothstops, noResume
+
+# The default catalog. Pass --catalog to match against other rounds' projects.
+projectsMay2017 = loadCatalog(DEFAULTCATALOG)
+
+def splitAlternatives(keyword):
+    """Split a keyword pattern on its top-level | into separate alternatives."""
+    alternatives = []
+    depth = 0
+    inClass = False
+    start = 0
+    i = 0
+    while i < len(keyword):
+        c = keyword[i]
+        if c == '\\':
+            i += 2
+            continue
+        if inClass:
+            if c == ']':
+                inClass = False
+        elif c == '[':
+            inClass = True
+        elif c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == '|' and depth == 0:
+            alternatives.append(keyword[start:i])
+            start = i + 1
+        i += 1
+    alternatives.append(keyword[start:])
+    return alternatives
+
+class keywordMatcher:
+    """Every keyword of a project catalog, compiled into one pattern that scans a resume once."""
+    def __init__(self, keywordLists):
+        # Distinct keyword patterns, and for each one the group names of its
+        # alternatives, in the order the alternatives are written.
+        self.keywords = []
+        self.keywordAlternatives = []
+        # For each project, indexes into self.keywords.
+        self.projectKeywords = []
+        keywordIndex = {}
+        alternativeNames = {}
+        for projectKeywords in keywordLists:
+            indexes = []
+            for keyword in projectKeywords:
+                if keyword not in keywordIndex:
+                    keywordIndex[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                    names = []
+                    for alternative in splitAlternatives(keyword):
+                        if alternative not in alternativeNames:
+                            alternativeNames[alternative] = 'a' + str(len(alternativeNames))
+                        names.append(alternativeNames[alternative])
+                    self.keywordAlternatives.append(names)
+                indexes.append(keywordIndex[keyword])
+            self.projectKeywords.append(indexes)
+
+        # Which keywords each alternative belongs to.
+        self.alternativeKeywords = {}
+        for index, names in enumerate(self.keywordAlternatives):
+            for name in names:
+                self.alternativeKeywords.setdefault(name, []).append(index)
+
+        # The leading lookahead only lets through word boundaries where at
+        # least one alternative matches. At those positions, one optional
+        # lookahead per alternative records every alternative that matches,
+        # so overlapping hits (e.g. 'graphic' and 'graphic design') are all
+        # found in the same scan.
+        gate = '|'.join('(?:' + alternative + ')' for alternative in alternativeNames)
+        lookaheads = ''.join('(?:(?=(?P<' + name + '>' + alternative + r')\b))?'
+                             for alternative, name in alternativeNames.items())
+        self.source = r'\b(?=(?:' + gate + r')\b)' + lookaheads
+        self.pattern = re.compile(self.source, flags=re.IGNORECASE)
+
+    def asDict(self):
+        """Everything the matcher is built from its keywords, as plain JSON data."""
+        return {'keywords': self.keywords,
+                'keywordAlternatives': self.keywordAlternatives,
+                'projectKeywords': self.projectKeywords,
+                'alternativeKeywords': self.alternativeKeywords,
+                'source': self.source}
+
+    @classmethod
+    def fromDict(cls, built):
+        """Make a matcher from asDict(); only the pattern is compiled."""
+        matcher = cls.__new__(cls)
+        matcher.keywords = built['keywords']
+        matcher.keywordAlternatives = built['keywordAlternatives']
+        matcher.projectKeywords = built['projectKeywords']
+        matcher.alternativeKeywords = built['alternativeKeywords']
+        matcher.source = built['source']
+        matcher.pattern = re.compile(matcher.source, flags=re.IGNORECASE)
+        return matcher
+
+    def findKeywords(self, contents, counts=None):
+        """Return the set of matched strings for each keyword in self.keywords.
+
+        Each set is identical to
+        set(re.findall(r'\b(?:' + keyword + r')\b', contents, flags=re.IGNORECASE))
+
+        If counts is a list, counts[i] is increased by the number of
+        matches of keyword i (what len(re.findall(...)) would be).
+        """
+        found = [set() for keyword in self.keywords]
+        # re.findall doesn't return overlapping matches of the same keyword,
+        # so track where the last match of each keyword ended.
+        cursor = [0] * len(self.keywords)
+        for m in self.pattern.finditer(contents):
+            start = m.start()
+            hits = {name: text for name, text in m.groupdict().items() if text is not None}
+            for index in set(i for name in hits for i in self.alternativeKeywords[name]):
+                if start < cursor[index]:
+                    continue
+                # Like the regex alternation, the first alternative that matches wins.
+                for name in self.keywordAlternatives[index]:
+                    if name in hits:
+                        found[index].add(hits[name])
+                        cursor[index] = m.end(name)
+                        if counts is not None:
+                            counts[index] += 1
+                        break
+        return found
+
+# Bump this when keywordMatcher changes, so old cached matchers aren't used.
+MATCHERVERSION = 2
+
+def readKeywordMatcher(keywordLists, cachedir=None):
+    """Return a keywordMatcher for keywordLists, from the cache in cachedir if it's there.
+
+    The cache is JSON of what the matcher was built from the keywords, so
+    a cached matcher only has to compile its pattern. Cached matchers are
+    keyed by the hash of the keyword lists, and store the lists too, so
+    editing a catalog's keywords never picks up a stale matcher.
+    """
+    if not cachedir:
+        return keywordMatcher(keywordLists)
+    key = [MATCHERVERSION, keywordLists]
+    digest = hashlib.sha256(json.dumps(key).encode()).hexdigest()
+    path = os.path.join(cachedir, digest + '.json')
+    try:
+        with open(path, 'r') as f:
+            cached = json.load(f)
+        if cached['key'] == json.loads(json.dumps(key)):
+            return keywordMatcher.fromDict(cached['matcher'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    matcher = keywordMatcher(keywordLists)
+    if not os.path.exists(cachedir):
+        os.makedirs(cachedir, exist_ok=True)
+    partial = path + '.' + str(os.getpid()) + '.tmp'
+    with open(partial, 'w') as f:
+        json.dump({'key': key, 'matcher': matcher.asDict()}, f)
+    os.replace(partial, path)
+    return matcher
+
+# The matchers loaded in this process, so each catalog's is only read or
+# built, and compiled, once. Forked pool workers start out with the ones
+# their parent loaded.
+loadedMatchers = {}
+
+def loadKeywordMatcher(keywordLists, cachedir=None):
+    """Return the keywordMatcher for keywordLists; see readKeywordMatcher()."""
+    matcher = loadedMatchers.get(keywordLists)
+    if matcher is None:
+        matcher = loadedMatchers[keywordLists] = readKeywordMatcher(keywordLists, cachedir)
+    return matcher
+
+def findKeywordsInWorker(keywordLists, cachedir, contents, counts=False):
+    """Match contents in a pool worker, like keywordMatcher.findKeywords().
+
+    With counts, return the number of matches of each keyword and the
+    length of contents instead (see resumerank.py).
+    """
+    matcher = loadKeywordMatcher(keywordLists, cachedir)
+    if counts:
+        keywordCounts = [0] * len(matcher.keywords)
+        matcher.findKeywords(contents, counts=keywordCounts)
+        return keywordCounts, len(contents)
+    return matcher.findKeywords(contents)
 
 # We have two types of resumes:
 # 1. They matched *some* but not all of the important keywords for a project.
 # 2. They matches all of the keywords we need.
-def matchResumes(resumeFiles):
-    for resume in resumeFiles:
-        for project in projectsMay2017:
-            matches = [set(re.findall(r'\b(?:' + keyword + r')\b', resume.contents, flags=re.IGNORECASE)) for keyword in project.keywords]
+#
+# projects can come from several rounds' catalogs; all their keywords are
+# matched in the same scan of each resume.
+def matchResumes(resumeFiles, projects=projectsMay2017, jobs=1, cachedir=None):
+    keywordLists = tuple(tuple(project.keywords) for project in projects)
+    matcher = loadKeywordMatcher(keywordLists, cachedir)
+    if jobs > 1:
+        allFound = poolStarmap(jobs, findKeywordsInWorker,
+                               [(keywordLists, cachedir, resume.contents) for resume in resumeFiles])
+    else:
+        # Resumes from a packed corpus (see resumecorpus.py) are decoded
+        # one at a time, as they're matched.
+        allFound = (matcher.findKeywords(resume.contents) for resume in resumeFiles)
+    # Projects are matched in this process, in resume order, so the
+    # results don't depend on which worker scanned which resume.
+    recordMatches(resumeFiles, projects, matcher.projectKeywords, allFound)
+
+def recordMatches(resumeFiles, projects, projectKeywords, allFound, keepResumes=True):
+    """Record strong and weak project matches, given the matched strings of
+    every keyword (indexed by projectKeywords) for every resume.
+
+    Unless keepResumes is false, the projects also keep lists of the
+    resumes that matched them.
+    """
+    for resume, found in zip(resumeFiles, allFound):
+        for project, indexes in zip(projects, projectKeywords):
+            matches = [found[index] for index in indexes]
             # New syntax for me!
             # * takes a list and expands it to arguments to a function.
             # ** takes a dictionary and expands it to key-value arguments to a function.
@@ -300,14 +459,56 @@ def matchResumes(resumeFiles):
             keywords = set.union(*matches)
             if all(matches):
                 resume.strongProjectMatches.append((project, keywords))
-                project.strongResumeMatches.append(resume)
+                if keepResumes:
+                    project.strongResumeMatches.append(resume)
             elif any(matches):
                 resume.weakProjectMatches.append((project, keywords))
-                project.weakResumeMatches.append(resume)
-
-def matchWithProjects(resumeFiles):
+                if keepResumes:
+                    project.weakResumeMatches.append(resume)
+
+def matchResumeStream(resumeTexts, projects=projectsMay2017, cachedir=None):
+    """Match each resume as it comes in, and yield it.
+
+    resumeTexts yields (resume, text) pairs, e.g. from iterResumeTexts,
+    so matching and writing emails run as one stream without reading
+    any text twice. The projects don't keep the matched resumes, so each
+    one can be dropped once its email is written.
+    """
+    matcher = loadKeywordMatcher(tuple(tuple(project.keywords) for project in projects), cachedir)
+    for resume, contents in resumeTexts:
+        recordMatches([resume], projects, matcher.projectKeywords, [matcher.findKeywords(contents)],
+                      keepResumes=False)
+        yield resume
+
+def profileSample(profile, resumeFiles, projects):
+    """Time the email pattern and every keyword pattern on its own, on a sample of resumes."""
+    keywordPatterns = {}
+    for project in projects:
+        for keyword in project.keywords:
+            if keyword not in keywordPatterns:
+                keywordPatterns[keyword] = re.compile(r'\b(?:' + keyword + r')\b', flags=re.IGNORECASE)
+    keywordTimes = {}
+    sample = resumeFiles[::SAMPLEEVERY]
+    for resume in sample:
+        contents = resume.contents
+        start = time.perf_counter()
+        matches = len(emailPattern.findall(contents))
+        profile.addPattern('email address', time.perf_counter() - start, matches)
+        for keyword, pattern in keywordPatterns.items():
+            start = time.perf_counter()
+            matches = len(pattern.findall(contents))
+            seconds = time.perf_counter() - start
+            keywordTimes[keyword] = keywordTimes.get(keyword, 0.0) + seconds
+            profile.addPattern('keyword ' + keyword, seconds, matches)
+    for project in projects:
+        label = project.name + ': ' + (project.description or project.short or '')
+        profile.addProject(label, sum(keywordTimes.get(keyword, 0.0) for keyword in set(project.keywords)))
+    profile.resumes += len(resumeFiles)
+    profile.sampledResumes += len(sample)
+
+def matchWithProjects(resumeFiles, projects=projectsMay2017, jobs=1, cachedir=None):
     goldresumes = []
-    matchResumes(resumeFiles)
+    matchResumes(resumeFiles, projects, jobs, cachedir)
 
 
     #for project in projectsMay2017:
@@ -419,7 +620,8 @@ def writeInitialInvitation(emaildir, resume, boothlist, matches):
     keywords = [k for k in keywords if k.lower() not in project.printskip]
     if keywords:
         para = para + ' that involves working with '
-        k = list(set(keywords))
+        # Sorted, so the email doesn't depend on set ordering.
+        k = sorted(set(keywords))
         if len(k) == 1:
             para = para + k[0]
         elif len(k) == 2:
@@ -428,8 +630,15 @@ def writeInitialInvitation(emaildir, resume, boothlist, matches):
             para = para + ', '.join(k[:-1]) + ' and ' + k[-1]
     return para
 
+def sortedStrongMatches(resume):
+    """The strong project matches, in the order to mention them in an email."""
+    if resume.projectScores:
+        # Best ranked first (the sort is stable, so ties keep their order).
+        return sorted(resume.strongProjectMatches, key=lambda match: -resume.projectScores[match[0]])
+    return sorted(resume.strongProjectMatches, key=lambda match: len(match[1]))
+
 def writeStrongInvitation(emaildir, resume, boothlist):
-    matches = sorted(resume.strongProjectMatches, key=lambda match: len(match[1]))
+    matches = sortedStrongMatches(resume)
     project, keywords = matches[0]
     para = writeInitialInvitation(emaildir, resume, boothlist, matches)
 
@@ -448,7 +657,7 @@ def writeStrongInvitation(emaildir, resume, boothlist):
     return textwrap.fill(para + '.', LINEWRAP) + '\n\n'
 
 def writeMultipleStrongInvitation(emaildir, resume, boothlist):
-    matches = sorted(resume.strongProjectMatches, key=lambda match: len(match[1]))
+    matches = sortedStrongMatches(resume)
     project, keywords = matches[0]
     para = writeInitialInvitation(emaildir, resume, boothlist, matches)
 
@@ -481,7 +690,15 @@ class emailType(Enum):
     mixed = 2
     weak = 3
 
-def craftEmail(emaildir, resume, boothlist, strength):
+def writeDraft(emaildir, name, email, spool=None):
+    """Write a draft email to emaildir, or to spool (a mailspool.MailSpool) if there is one."""
+    if spool:
+        spool.add(name, email)
+        return
+    with open(os.path.join(emaildir, name), 'w') as f:
+        f.write(email)
+
+def craftEmail(emaildir, resume, boothlist, strength, spool=None):
     email = header1 + 'To: ' + ', '.join(resume.emails) + '\n' + header3
     if resume.pdfFileName in boothlist:
         email = email + atBooth
@@ -497,49 +714,43 @@ def craftEmail(emaildir, resume, boothlist, strength):
                  moreInfo)
     ext = '-email.txt'
 
-    with open(os.path.join(emaildir, os.path.splitext(resume.textFileName)[0] + ext), 'w') as f:
-        f.write(email)
+    writeDraft(emaildir, os.path.splitext(resume.textFileName)[0] + ext, email, spool)
+
+def classifyResume(resume):
+    """Decide which kind of email a resume gets.
+
+    Returns the emailType, and for strong matches the name of the
+    directory to write the email in.
+    """
+    if not resume.strongProjectMatches:
+        return emailType.weak, None
+    firstMatch = resume.strongProjectMatches[0][0].name
+    for match in resume.strongProjectMatches[1:]:
+        if match[0].name != firstMatch:
+            return emailType.mixed, 'mixed'
+    return emailType.strong, 'emails-' + re.sub(r'\s+', '-', firstMatch.lower())
+
+def placePdf(directory, dirpath, resume, placement='copy', store=None):
+    source = os.path.join(directory, resume.pdfFileName)
+    dest = os.path.join(dirpath, resume.pdfFileName)
+    if os.path.exists(dest):
+        return
+    if store:
+        store.place(source, dest, placement)
+    else:
+        placeFile(source, dest, placement)
 
-def createFormEmails(directory, resumeFiles, boothlist):
+def createFormEmails(directory, resumeFiles, boothlist, ledger=None, placement='copy', store=None, format='flat'):
+    # Each resume is handled as soon as it comes in, so resumeFiles can be
+    # a generator, and emails start showing up right away on large runs.
+    #
     # For all resumes with one strong match or multiple strong matches with the same organization:
     # Create a directory with the organization name (lowercase, with spaces replaced with dashes)
     # Copy pdf resume into that directory, create basename-email.txt
-    oneStrong = [resume for resume in resumeFiles if len(resume.strongProjectMatches) == 1]
-    print('Resumes with exactly one match:', len(oneStrong))
-    left = [resume for resume in resumeFiles if resume not in oneStrong]
-    for resume in left:
-        if not resume.strongProjectMatches:
-            continue
-        firstMatch = resume.strongProjectMatches[0][0].name
-        for match in resume.strongProjectMatches[1:]:
-            if match[0].name != firstMatch:
-                firstMatch = ''
-                break
-        if firstMatch:
-            oneStrong.append(resume)
-    left = [resume for resume in resumeFiles if resume not in oneStrong]
-    print('Resumes with exactly one match or multiple matches with same org:', len(oneStrong))
-    print('Other resumes:', len(left))
-
-    for project in projectsMay2017:
-        matches = [resume for resume in oneStrong if resume.strongProjectMatches[0][0].name == project.name]
-        if not matches:
-            continue
-        dirpath = os.path.join(directory, 'emails-' + re.sub(r'\s+', '-', project.name.lower()))
-        if not os.path.exists(dirpath):
-            os.makedirs(dirpath)
-        for resume in matches:
-            try:
-                if not os.path.exists(os.path.join(dirpath, resume.pdfFileName)):
-                    copyfile(os.path.join(directory, resume.pdfFileName),
-                             os.path.join(dirpath, resume.pdfFileName))
-            except:
-                print('Could not find pdf file for', resume.textFileName)
-                continue
-            craftEmail(dirpath, resume, boothlist, emailType.strong)
-
+    # (or link it there, depending on placement; see pdfstore.py)
+    #
     # For all resumes with strong matches with multiple orgs (but less than 4 orgs):
-    # Create a directory called strong-mixed.
+    # Create a directory called mixed.
     # Copy pdf resume into that directory, create basename-email.txt
     #
     # "Based on your resume, it looks like you might be interested in an
@@ -548,39 +759,70 @@ def createFormEmails(directory, resumeFiles, boothlist):
     #
     # Additionally, you might be interested in $PROJECT that involves $KEYWORDS which 
     # is offering an internship for $DESCRIPTION."
-    mixed = [resume for resume in resumeFiles if resume not in oneStrong and resume.strongProjectMatches]
+    #
+    # For all resumes with strong matches with 4 or more orgs:
+    # Create a directory called strong-scattered.
+    # Copy pdf resume into that directory, create basename-email.txt
+    #
+    # Unless format is 'flat', the emails in each directory are written as
+    # one mbox, a Maildir, or sharded subdirectories; see mailspool.py.
+    spools = {}
+    dirpaths = set()
     dirpath = os.path.join(directory, 'mixed')
     if not os.path.exists(dirpath):
         os.makedirs(dirpath)
-    for resume in mixed:
+    dirpaths.add(dirpath)
+
+    oneStrong = 0
+    sameOrg = 0
+    other = 0
+    # For all weakly matched resumes - figure out top keywords that matched weak resumes.
+    hitcount = Counter()
+    for resume in resumeFiles:
+        strength, subdir = classifyResume(resume)
+        if strength is emailType.weak:
+            other += 1
+            allkeywords = set()
+            for project, keywords in resume.weakProjectMatches:
+                allkeywords.update(keywords)
+            hitcount.update(allkeywords)
+            continue
+        if strength is emailType.mixed:
+            other += 1
+        elif len(resume.strongProjectMatches) == 1:
+            oneStrong += 1
+        else:
+            sameOrg += 1
+
+        dirpath = os.path.join(directory, subdir)
+        if dirpath not in dirpaths:
+            if not os.path.exists(dirpath):
+                os.makedirs(dirpath)
+            dirpaths.add(dirpath)
         try:
-            if not os.path.exists(os.path.join(dirpath, resume.pdfFileName)):
-                copyfile(os.path.join(directory, resume.pdfFileName),
-                         os.path.join(dirpath, resume.pdfFileName))
-        except:
-            print('Could not find pdf file for', resume.textFileName)
+            placePdf(directory, dirpath, resume, placement, store)
+        except OSError as e:
+            print('Could not place pdf file for', resume.textFileName + ':', e)
             continue
-        craftEmail(dirpath, resume, boothlist, emailType.mixed)
+        if dirpath not in spools:
+            spools[dirpath] = MailSpool(dirpath, format)
+        craftEmail(dirpath, resume, boothlist, strength, spools[dirpath])
+        if ledger:
+            ledger.recordResume(resume)
 
-    # For all resumes with strong matches with 4 or more orgs:
-    # Create a directory called strong-scattered.
-    # Copy pdf resume into that directory, create basename-email.txt
+    for spool in spools.values():
+        spool.close()
 
-    # For all weakly matched resumes - figure out top keywords that matched weak resumes.
-    hitcount = Counter()
-    for resume in [resume for resume in resumeFiles if not resume.strongProjectMatches]:
-        allkeywords = set()
-        for project, keywords in resume.weakProjectMatches:
-            allkeywords.update(keywords)
-            for keyword in keywords:
-                allkeywords.add(keyword)
-        hitcount.update(allkeywords)
+    print('Resumes with exactly one match:', oneStrong)
+    print('Resumes with exactly one match or multiple matches with same org:', oneStrong + sameOrg)
+    print('Other resumes:', other)
 
     # Take the top N keywords that weakly matched, find all projects that matched those keywords.
     # "Based on your resume, it looks like you might be interested in Outreachy
     # projects involving $KEYWORD like $MATCHES"
+    return hitcount
 
-def craftGenericEmail(emaildir, resume):
+def craftGenericEmail(emaildir, resume, spool=None):
     if not resume.emails:
         address = ''
     else:
@@ -590,63 +832,220 @@ def craftGenericEmail(emaildir, resume):
     email = (email + generalInfo + moreInfo)
     ext = '-email.txt'
 
-    with open(os.path.join(emaildir, os.path.splitext(resume.textFileName)[0] + ext), 'w') as f:
-        f.write(email)
+    writeDraft(emaildir, os.path.splitext(resume.textFileName)[0] + ext, email, spool)
+
+def printBoothCounts(resumeFiles, doneResumes, notusResumes, boothlist, boothstops, noResume, ledger=None):
+    boothandresume = len([resume for resume in resumeFiles
+               if resume.pdfFileName in boothlist
+               and len(resume.strongProjectMatches)])
+    print('People who stopped by the booth who have a resume and need an email:', boothandresume)
+    print('People who stopped by the booth who have a resume and have been sent email:',
+          len([resume for resume in doneResumes
+               if resume.pdfFileName in boothlist]))
+    print('People who stopped by the booth who have a resume and may be non-U.S. citizens:',
+          len([resume for resume in notusResumes
+               if resume.pdfFileName in boothlist]))
+    if ledger:
+        visitors = set(email for email, setName, filelist, score in boothstops).union(noResume)
+        print('People who stopped by the booth who are in the contact ledger:',
+              len([email for email in visitors if ledger.contacted([email])]))
+
+def reportProfile(profile, path):
+    if not path:
+        return
+    print()
+    printReport(profile.asDict())
+    profile.save(path)
 
 def main():
     parser = argparse.ArgumentParser(description='Search text resume files for skillset matches.')
-    parser.add_argument('dir', help='Directory with .txt resume files')
+    parser.add_argument('dir', help='Directory with .txt resume files (or a corpus packed from one with resumecorpus.py)')
     parser.add_argument('--csv', help='CSV file with name <email>,matching resume file of people who stopped by the booth')
+    parser.add_argument('--fuzzy', help='Match booth emails that have no exact match to resume emails with at least this confidence (0 to 1, e.g. 0.9)', type=float)
     parser.add_argument('--notus', help='Directory with .txt resumes files that may be non-U.S. residents')
-    parser.add_argument('--done', help='Directory with .txt resume files that have been contacted')
+    parser.add_argument('--done', help='Directory with .txt resume files that have been contacted (with --ledger, they are added to the ledger)')
+    parser.add_argument('--ledger', help='SQLite ledger of people who have been contacted; draft emails are recorded in it')
     parser.add_argument('--generic', help='Simply create generic emails and ignore project matches', default=False)
+    parser.add_argument('--jobs', help='Number of processes to read and match resumes with', type=int, default=1)
+    parser.add_argument('--extract', help='Create missing .txt files from the PDF resumes first, using a cache of extracted text', action='store_true')
+    parser.add_argument('--placement', help='How to put PDF resumes into the email directories (default: copy, or hardlink with --store)', choices=PLACEMENTS)
+    add_format_argument(parser)
+    parser.add_argument('--store', help='Directory of a content-addressed PDF store; PDFs are stored there once and placed from it')
+    parser.add_argument('--index', help='SQLite inverted index of the resumes in dir to match projects against (created or updated as needed)')
+    parser.add_argument('--stream', help='Keep only what was found in each resume in memory, and match resumes and write their emails as one stream (for corpora too big to hold in memory)', action='store_true')
+    parser.add_argument('--tokens', help='Match projects against normalized resume tokens, cached in .token-cache in dir (see resumetokens.py)', action='store_true')
+    parser.add_argument('--rank', help='Score resumes against projects (needs NumPy and SciPy), list this many top resumes per project, and mention the best scoring projects first in emails', type=int)
+    parser.add_argument('--catalog', action='append', help='JSON or YAML project catalog to match resumes against; repeat to match against several rounds at once (default: catalogs/2017-may-august.json)')
+    parser.add_argument('--matcher-cache', help='Directory to cache the keyword matchers built from catalogs in (as JSON; not cached by default)')
+    parser.add_argument('--residency', help='Write a manifest of which resumes look like they are from U.S. residents to this JSON file (see residency.py)')
+    parser.add_argument('--profile', help='Print where the time went, and save it in this JSON file (see resumeprofile.py)')
     #parser.add_argument('matches', help='file to write potential matches to')
     args = parser.parse_args()
-    resumeFiles = readResumeFiles(args.dir)
+    # Timing the stages is cheap, so it's always done; --profile reports it.
+    profile = profiler()
+    projects = projectsMay2017
+    if args.catalog:
+        projects = loadCatalogs(args.catalog)
+    if args.extract:
+        with profile.stage('extract PDFs'):
+            for d in (args.dir, args.done, args.notus):
+                if d and os.path.isdir(d):
+                    extractPdfs(d, jobs=max(args.jobs, 4))
+    # With --stream, the resumes are streamedResumes: their email
+    # addresses, residency guesses and hashes stay in memory, so people can
+    # be found across the resume sets, but their texts don't. The resumes
+    # in dir are streamed from disk again to be matched (see below).
+    read = readResumeFiles
+    if args.stream:
+        read = lambda directory, jobs, residency=False: list(iterResumeFiles(directory, max(jobs, 4), residency))
+    with profile.stage('read resumes'):
+        # Residency is only guessed for the --residency manifest.
+        resumeFiles = read(args.dir, args.jobs, bool(args.residency))
+    # Where the PDFs are, and where the emails go.
+    directory = args.dir
+    if os.path.isfile(args.dir):
+        import resumecorpus
+        directory = resumecorpus.resumeDirectory(args.dir)
+
+    ledger = None
+    if args.ledger:
+        ledger = contactLedger(args.ledger)
 
     # Check to see if we have resumes to process that we've already
     # send email to.
+    doneResumes = []
     if args.done:
-        doneResumes = readResumeFiles(args.done)
-        emails = [resume.emails[0] for resume in doneResumes if resume.emails]
-        for email in emails:
-            pdfs = [resume.pdfFileName for resume in resumeFiles if resume.emails and resume.emails[0] == email]
-            matches = [resume.pdfFileName for resume in doneResumes if resume.emails and resume.emails[0] == email]
-            if pdfs:
-                print('Already contacted:', email, ' '.join(pdfs), 'matches done resume', ' '.join(matches))
+        with profile.stage('read done resumes'):
+            doneResumes = read(args.done, args.jobs)
+    notusResumes = []
     if args.notus:
-        notusResumes = readResumeFiles(args.notus)
+        with profile.stage('read non-U.S. resumes'):
+            notusResumes = read(args.notus, args.jobs)
+
+    if args.residency:
+        writeManifest(args.residency, directory, resumeFiles)
+        print('Resumes by residency guess:',
+              ', '.join(residency + ' ' + str(len([r for r in resumeFiles if r.residency == residency]))
+                        for residency in RESIDENCIES))
+
+    # Who is who, across all the resume sets.
+    with profile.stage('index identities'):
+        identities = identityIndex([('resume', resumeFiles), ('done', doneResumes), ('notus', notusResumes)])
+    for setName in identities.setNames:
+        identities.reportDuplicates(setName)
+
+    with profile.stage('check already contacted'):
+        if ledger:
+            # Once they're in the ledger, the done directory isn't needed anymore.
+            for resume in doneResumes:
+                ledger.recordResume(resume, 'sent')
+            for resume in resumeFiles:
+                entry = ledger.contacted(resume.emails[:1], resume.digest)
+                if entry:
+                    print('Already contacted:', entry.email, resume.pdfFileName, 'matches', entry.status, 'email for', entry.pdf)
+        elif doneResumes:
+            checked = set()
+            for resume in doneResumes:
+                email = primaryEmail(resume)
+                if email is None or email in checked:
+                    continue
+                checked.add(email)
+                pdfs = [r.pdfFileName for r in identities.resumesOf(email, 'resume')]
+                if pdfs:
+                    print('Already contacted:', resume.emails[0], ' '.join(pdfs), 'matches done resume',
+                          ' '.join(r.pdfFileName for r in identities.resumesOf(email, 'done')))
 
     if args.generic:
-        genericdir = os.path.join(args.dir, 'generic-todo')
-        if not os.path.exists(genericdir):
-            os.makedirs(genericdir)
-        for resume in resumeFiles:
-            craftGenericEmail(genericdir, resume)
+        with profile.stage('write generic emails'):
+            genericdir = os.path.join(directory, 'generic-todo')
+            with MailSpool(genericdir, args.format) as spool:
+                for resume in resumeFiles:
+                    craftGenericEmail(genericdir, resume, spool)
+                    if ledger:
+                        ledger.recordResume(resume)
+        if ledger:
+            ledger.close()
+        reportProfile(profile, args.profile)
         return
 
-    boothstops = (searchForEmail(args.csv, resumeFiles) +
-                  searchForEmail(args.csv, doneResumes) +
-                  searchForEmail(args.csv, notusResumes))
+    boothstops = []
+    noResume = []
+    if args.csv:
+        with profile.stage('look up booth visitors'):
+            fuzzyIndex = None
+            if args.fuzzy:
+                fuzzyIndex = fuzzyEmailIndex(identities.emails())
+            boothstops, noResume = searchForEmail(args.csv, identities, fuzzyIndex, args.fuzzy)
     boothlist = set()
-    for email, filelist in boothstops:
+    for email, setName, filelist, score in boothstops:
         boothlist.update(filelist)
-    print('Booth stop list', boothstops)
+    print('Booth stop list', [(email, setName, filelist) for email, setName, filelist, score in boothstops])
+    print('Fuzzy booth stop matches', [(email, filelist, round(score, 2)) for email, setName, filelist, score in boothstops if score < 1])
     print('Booth stop pdfs', boothlist)
+    print('Booth stops without a resume', noResume)
     print('Done resumes', [resume.pdfFileName for resume in doneResumes])
 
-    matchWithProjects(resumeFiles)
-    boothandresume = len([resume for resume in resumeFiles
-               if resume.pdfFileName in boothlist
-               and len(resume.strongProjectMatches)])
-    print('People who stopped by the booth who have a resume and need an email:', boothandresume)
-    print('People who stopped by the booth who have a resume and have been sent email:',
-          len([resume for resume in doneResumes
-               if resume.pdfFileName in boothlist]))
-    print('People who stopped by the booth who have a resume and may be non-U.S. citizens:',
-          len([resume for resume in notusResumes
-               if resume.pdfFileName in boothlist]))
-    createFormEmails(args.dir, resumeFiles, boothlist, generic)
+    # With --stream, the resumes are read a second time, one window at a
+    # time, and the regular expression matcher matches each one just
+    # before its email is written.
+    streaming = args.stream and not (args.index or args.tokens or args.rank)
+    if args.index:
+        # Imported here because resumeindex imports this module.
+        import resumeindex
+        with profile.stage('update index'):
+            index = resumeindex.resumeIndex(args.index)
+            index.update(directory)
+        with profile.stage('match projects'):
+            resumeindex.matchResumesFromIndex(index, resumeFiles, projects)
+        index.close()
+    elif args.tokens:
+        # Imported here because resumetokens imports this module.
+        import resumetokens
+        with profile.stage('match projects'):
+            resumetokens.matchResumesByTokens(resumeFiles, projects, args.jobs)
+    elif not streaming:
+        with profile.stage('match projects'):
+            matchWithProjects(resumeFiles, projects, args.jobs, args.matcher_cache)
+    if args.rank:
+        # Imported here because resumerank imports this module, and
+        # only --rank needs NumPy and SciPy.
+        import resumerank
+        with profile.stage('rank resumes'):
+            ranking = resumerank.rankResumes(resumeFiles, projects, jobs=args.jobs, cachedir=args.matcher_cache)
+            ranking.annotate()
+        resumerank.printTopResumes(ranking, args.rank)
+    if not streaming:
+        printBoothCounts(resumeFiles, doneResumes, notusResumes, boothlist, boothstops, noResume, ledger)
+    store = None
+    placement = args.placement or 'copy'
+    if args.store:
+        store = pdfStore(args.store)
+        # Copying out of the store would use more disk than no store at all.
+        placement = args.placement or 'hardlink'
+    if streaming:
+        boothResumes = []
+        def noteBoothResumes(resumes):
+            # Only the booth visitors' matched resumes are kept, to be counted.
+            for resume in resumes:
+                if resume.pdfFileName in boothlist:
+                    boothResumes.append(resume)
+                yield resume
+        with profile.stage('match projects and write emails'):
+            matched = matchResumeStream(iterResumeTexts(args.dir, max(args.jobs, 4)), projects, args.matcher_cache)
+            createFormEmails(directory, noteBoothResumes(matched),
+                             boothlist, ledger, placement, store, args.format)
+        printBoothCounts(boothResumes, doneResumes, notusResumes, boothlist, boothstops, noResume, ledger)
+    else:
+        with profile.stage('write emails'):
+            createFormEmails(directory, resumeFiles, boothlist, ledger, placement, store, args.format)
+    if store:
+        store.close()
+    if ledger:
+        ledger.close()
+    if args.profile:
+        with profile.stage(PATTERNSTAGE):
+            profileSample(profile, resumeFiles, projects)
+    reportProfile(profile, args.profile)
 
 if __name__ == "__main__":
     main()
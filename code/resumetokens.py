@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Match resumes against project keywords on normalized tokens instead of
+# case-insensitive regular expressions over the raw pdftotext output.
+#
+# A resume's text is normalized once:
+#  - NFKC, so ligatures (the 'fi' in 'ﬁle') and full-width letters become
+#    plain letters
+#  - soft hyphens are dropped, and words hyphenated across a line break
+#    ('develop-\nment') are joined again
+#
+# and split into tokens: words, and single punctuation characters, which
+# are case-folded to be matched. Matches are reported the way they were
+# written in the resume ('Python', not 'python'), like the regular
+# expression matcher reports them. Tech
+# words keep their punctuation, so 'C++', 'C#', 'ember.js', 'ASP.NET' and
+# 'html5' are single tokens, and a resume that mentions C# doesn't match a
+# project that wants C.
+#
+# So token matching isn't the same as the regular expression matching in
+# resumesearch.py, where \b sits between 'C' and '++' or '#': there,
+# 'C++ developer' matches both the keyword C and C\+\+, and 'I know C#
+# well' matches C. Here the first only matches C\+\+, and the second
+# matches neither.
+#
+# The tokens of each resume are cached in .token-cache in its directory,
+# under the SHA-256 hash of its text, so later runs only read them back.
+# Keywords become token phrases, and every keyword of every project is
+# looked up in one pass over a resume's tokens. The few keywords that are
+# real regular expressions are still searched for in the text.
+#
+# $ resumetokens.py tapia-2017/
+#
+# tokenizes (and caches) the resumes and counts project matches;
+# resumesearch.py --tokens uses the same matching.
+
+import argparse
+import hashlib
+import os
+import re
+import unicodedata
+
+from resumesearch import loadCatalogs, poolStarmap, projectsMay2017, readResumeFiles, recordMatches, splitAlternatives
+
+# Bump this when normalizeText, tokenPattern or the cached tokens change,
+# so cached tokens (and resumeindex.py indexes) made with the old rules
+# aren't used.
+TOKENVERSION = 2
+
+# A word hyphenated at the end of a line, continued in lowercase on the
+# next one. 'RISC-\nV' is left alone.
+hyphenationPattern = re.compile(r'(\w)-[ \t]*\r?\n[ \t]*(?=[a-z])')
+
+# Words, with the trailing ++ or # of C++ and C#, or the .js or .net of
+# names like ember.js and asp.net; and single punctuation characters.
+# Other dots split words, so 'Linux.Then' (a missing space) is still 'linux'.
+tokenPattern = re.compile(r'\w+(?:\.(?:js|net)(?!\w)|\+\+|#)?|[^\w\s]', flags=re.IGNORECASE)
+
+def normalizeText(text):
+    """Return text in NFKC form and de-hyphenated."""
+    text = unicodedata.normalize('NFKC', text).replace('\u00ad', '')
+    return hyphenationPattern.sub(r'\1', text)
+
+def surfaceTokens(text):
+    """Split text into normalized words and single punctuation characters, as written."""
+    return tokenPattern.findall(normalizeText(text))
+
+def tokenize(text):
+    """Split text into case-folded words and single punctuation characters."""
+    return [token.casefold() for token in surfaceTokens(text)]
+
+def isPunctuation(token):
+    return len(token) == 1 and not token.isalnum() and token != '_'
+
+def phraseText(tokens):
+    """Join the tokens of a matched phrase back into the text they came from
+    (with a single space wherever there was whitespace between words)."""
+    text = tokens[0]
+    for previous, token in zip(tokens, tokens[1:]):
+        if not isPunctuation(previous) and not isPunctuation(token):
+            text += ' '
+        text += token
+    return text
+
+# Regular expression characters that make a keyword more than a plain
+# phrase. The dot in ember.js or asp.net is taken literally.
+metaPattern = re.compile(r'(?<!\\)(?:[\^$*+?{}\[\]()|]|\.(?!(?:js|net)\b))')
+negativeLookaheadPattern = re.compile(r'^((?:[^\\()]|\\.)+)\(\?!((?:[^\\()]|\\.)+)\)$')
+
+def unescape(literal):
+    return re.sub(r'\\(.)', r'\1', literal)
+
+def parseAlternative(alternative):
+    """Turn a keyword alternative into (phrase tokens, not-followed-by tokens).
+
+    Returns None if the alternative needs the full regular expression engine.
+    """
+    if not metaPattern.search(alternative):
+        return tokenize(unescape(alternative)), []
+    m = negativeLookaheadPattern.match(alternative)
+    if m and not metaPattern.search(m.group(1)) and not metaPattern.search(m.group(2)):
+        return tokenize(unescape(m.group(1))), tokenize(unescape(m.group(2)))
+    return None
+
+class tokenCache:
+    """Normalized resume tokens, cached under the hash of the resume text."""
+    def __init__(self, cachedir):
+        self.cachedir = cachedir
+        if not os.path.exists(cachedir):
+            os.makedirs(cachedir, exist_ok=True)
+
+    def tokens(self, contents):
+        """Return the tokens of contents as written; see surfaceTokens()."""
+        digest = hashlib.sha256((str(TOKENVERSION) + '\0' + contents).encode()).hexdigest()
+        path = os.path.join(self.cachedir, digest + '.tokens')
+        try:
+            with open(path, 'r') as f:
+                cached = f.read()
+            # An empty resume has no tokens, not one empty one.
+            return cached.split('\n') if cached else []
+        except FileNotFoundError:
+            pass
+        tokens = surfaceTokens(contents)
+        # Tokens never contain whitespace, so one per line is unambiguous.
+        partial = path + '.' + str(os.getpid()) + '.tmp'
+        with open(partial, 'w') as f:
+            f.write('\n'.join(tokens))
+        os.replace(partial, path)
+        return tokens
+
+def cacheDirectory(resume):
+    return os.path.join(resume.path, '.token-cache')
+
+class tokenMatcher:
+    """Every keyword of a project catalog, as token phrases looked up in one pass."""
+    def __init__(self, keywordLists):
+        # Distinct keyword patterns, like keywordMatcher.
+        self.keywords = []
+        # For each project, indexes into self.keywords.
+        self.projectKeywords = []
+        keywordIndex = {}
+        for projectKeywords in keywordLists:
+            indexes = []
+            for keyword in projectKeywords:
+                if keyword not in keywordIndex:
+                    keywordIndex[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                indexes.append(keywordIndex[keyword])
+            self.projectKeywords.append(indexes)
+
+        # First token -> [(phrase tokens, not-followed-by tokens, keyword
+        # index)]. One-token phrases with no lookahead are kept apart (as
+        # token -> [keyword index]), because they're found with a set
+        # intersection.
+        self.words = {}
+        self.phrases = {}
+        # (compiled pattern, keyword index) for alternatives that aren't phrases.
+        self.patterns = []
+        for index, keyword in enumerate(self.keywords):
+            for alternative in splitAlternatives(keyword):
+                parsed = parseAlternative(alternative)
+                if parsed is None:
+                    self.patterns.append((re.compile(r'\b(?:' + alternative + r')\b', flags=re.IGNORECASE), index))
+                    continue
+                tokens, notFollowedBy = parsed
+                if not tokens:
+                    continue
+                if len(tokens) == 1 and not notFollowedBy:
+                    self.words.setdefault(tokens[0], []).append(index)
+                else:
+                    self.phrases.setdefault(tokens[0], []).append((tokens, notFollowedBy, index))
+
+    def findKeywords(self, tokens, contents=None):
+        """Return the set of matched phrases for each keyword in self.keywords.
+
+        tokens are a resume's tokens as written (see surfaceTokens()), and
+        the phrases are reported as they were written. contents is the
+        resume text, which is only needed if some keywords aren't plain
+        phrases.
+        """
+        found = [set() for keyword in self.keywords]
+        folded = [token.casefold() for token in tokens]
+        # Every way each folded token was written.
+        written = {}
+        for token, fold in zip(tokens, folded):
+            written.setdefault(fold, set()).add(token)
+        for token in self.words.keys() & written.keys():
+            for index in self.words[token]:
+                found[index].update(written[token])
+        starts = self.phrases.keys() & written.keys()
+        if starts:
+            for position, token in enumerate(folded):
+                if token not in starts:
+                    continue
+                for phrase, notFollowedBy, index in self.phrases[token]:
+                    end = position + len(phrase)
+                    if folded[position:end] != phrase:
+                        continue
+                    if notFollowedBy and folded[end:end + len(notFollowedBy)] == notFollowedBy:
+                        continue
+                    found[index].add(phraseText(tokens[position:end]))
+        if contents is not None:
+            for pattern, index in self.patterns:
+                found[index].update(m.group() for m in pattern.finditer(contents))
+        return found
+
+# Each process builds the matcher for a catalog, and opens each token
+# cache, once.
+processMatchers = {}
+processCaches = {}
+
+def loadTokenMatcher(keywordLists):
+    matcher = processMatchers.get(keywordLists)
+    if matcher is None:
+        matcher = processMatchers[keywordLists] = tokenMatcher(keywordLists)
+    return matcher
+
+def findKeywordsByTokens(keywordLists, cachedir, contents):
+    matcher = loadTokenMatcher(keywordLists)
+    cache = processCaches.get(cachedir)
+    if cache is None:
+        cache = processCaches[cachedir] = tokenCache(cachedir)
+    return matcher.findKeywords(cache.tokens(contents), contents if matcher.patterns else None)
+
+def matchResumesByTokens(resumeFiles, projects=projectsMay2017, jobs=1):
+    """Fill in project matches for resumeFiles from their cached tokens.
+
+    With jobs > 1, resumes are tokenized (or their tokens read back) and
+    matched in a pool of worker processes.
+    """
+    keywordLists = tuple(tuple(project.keywords) for project in projects)
+    # Built before the pool, so forked workers start out with it.
+    matcher = loadTokenMatcher(keywordLists)
+    if jobs > 1:
+        allFound = poolStarmap(jobs, findKeywordsByTokens,
+                               [(keywordLists, cacheDirectory(resume), resume.contents) for resume in resumeFiles])
+    else:
+        allFound = (findKeywordsByTokens(keywordLists, cacheDirectory(resume), resume.contents)
+                    for resume in resumeFiles)
+    recordMatches(resumeFiles, projects, matcher.projectKeywords, allFound)
+
+def main():
+    parser = argparse.ArgumentParser(description='Tokenize text resumes, cache their tokens, and count project matches.')
+    parser.add_argument('dir', help='Directory with .txt resume files')
+    parser.add_argument('--catalog', action='append', help='JSON or YAML project catalog to count matches for; can be repeated (default: catalogs/2017-may-august.json)')
+    parser.add_argument('--jobs', help='Number of processes to read and tokenize resumes with', type=int, default=1)
+    args = parser.parse_args()
+
+    projects = projectsMay2017
+    if args.catalog:
+        projects = loadCatalogs(args.catalog)
+    resumeFiles = readResumeFiles(args.dir, args.jobs)
+    matchResumesByTokens(resumeFiles, projects, args.jobs)
+    for project in projects:
+        print(len(project.strongResumeMatches), '\t', len(project.weakResumeMatches), '\t', project.name, '\t', project.description)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Send a campaign of draft emails, written by one of the draft email
+# scripts in any mailspool.py format (flat or sharded files, an mbox, or a
+# Maildir), over SMTP. This replaces running one mutt per draft:
+#
+# $ for i in `ls .`; do mutt -F ~/.muttrc-outreachy -H $i; rm $i; done
+#
+# with:
+#
+# $ sendcampaign.py outdir/ --host smtp.example.org --starttls --user sage
+#
+# (the password is read from $SMTP_PASSWORD, or asked for). The drafts are
+# sent over a few SMTP connections at once (--connections). Each
+# connection is kept open for a batch of messages (--batch) before it's
+# closed and opened again, since many servers limit the messages per
+# connection. --rate limits the messages per second over all connections.
+#
+# Temporary failures (a dropped connection, or a 4xx reply) are retried
+# with exponential backoff; permanent failures (a 5xx reply) aren't. Like
+# the mutt loop, each draft is removed once it's sent, so running the
+# command again after a failure only sends what's left. An mbox is only
+# rewritten at the end, so until then each sent message is also recorded
+# in drafts.mbox.sent next to it, and skipped if the run is interrupted and
+# started again. Sent drafts can also be recorded in a contactledger.py
+# ledger.
+#
+# If the server accepts a draft for some of its recipients but refuses
+# others, the draft counts as sent (sending it again would write to the
+# accepted ones twice); the refused addresses are listed on stderr, left
+# out of the ledger, and make the command exit with an error.
+#
+# Drafts written with --format queue are sent from a mailqueue.py send
+# queue instead, which records every message as it is claimed, sent, or
+# fails. Several sendcampaign.py processes can send from the same queue at
+# once, and after a crash, running it again carries on where it stopped
+# without sending anything twice.
+#
+# Try a campaign against a local SMTP server first:
+#
+# $ python3 -m aiosmtpd -n -l localhost:8025 &
+# $ sendcampaign.py outdir/ --host localhost --port 8025
+
+import argparse
+import copy
+import email.parser
+import email.policy
+import getpass
+import hashlib
+import mailbox
+import os
+import queue
+import signal
+import smtplib
+import sys
+import threading
+import time
+from email.message import EmailMessage
+
+from mailqueue import QUEUENAME, MailQueue
+from mailspool import MBOXNAME, draft_message
+
+def ready_message(raw):
+    """Return a draft (as bytes) as an EmailMessage that's ready to send."""
+    draft = email.parser.Parser(policy=email.policy.default).parsestr(raw.decode('utf-8', errors='replace'))
+    # Build a new message, so non-ASCII names and text are encoded
+    # for SMTP no matter how the draft was written.
+    message = EmailMessage()
+    for name, value in draft.items():
+        if name.lower() not in ('mime-version', 'content-type', 'content-transfer-encoding',
+                                'x-draft-file', 'status', 'x-status'):
+            message[name] = value
+    if draft.get('Content-Transfer-Encoding', '8bit').lower() in ('7bit', '8bit'):
+        # get_content() would mangle non-ASCII text that's already decoded.
+        message.set_content(draft.get_payload())
+    else:
+        message.set_content(draft.get_content())
+    if not recipients(message):
+        raise ValueError('no To, Cc or Bcc addresses')
+    return message
+
+class Campaign:
+    """The drafts in a directory of draft files, an mbox, or a Maildir."""
+    def __init__(self, path, dry_run=False):
+        self.mailbox = None
+        self.dry_run = dry_run
+        if os.path.isdir(path) and os.path.isfile(os.path.join(path, MBOXNAME)):
+            path = os.path.join(path, MBOXNAME)
+        if os.path.isfile(path):
+            self.format = 'mbox'
+            self.mailbox = mailbox.mbox(path)
+            # Messages that were sent by a run that stopped before it could
+            # rewrite the mbox without them.
+            self.sentlog = path + '.sent'
+            self.already_sent = set()
+            if os.path.exists(self.sentlog):
+                with open(self.sentlog, 'r') as f:
+                    self.already_sent = set(line.strip() for line in f if line.strip())
+            self.digests = {}
+            self.skipped = []
+        elif all(os.path.isdir(os.path.join(path, subdir)) for subdir in ('cur', 'new', 'tmp')):
+            self.format = 'maildir'
+            self.mailbox = mailbox.Maildir(path, factory=None)
+        else:
+            # Flat or sharded draft files.
+            self.format = 'files'
+            self.files = []
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames.sort()
+                self.files.extend(os.path.join(dirpath, f) for f in sorted(filenames) if f.endswith('.txt'))
+
+    def keys(self):
+        if self.format == 'mbox':
+            keys = []
+            for key in self.mailbox.keys():
+                digest = hashlib.sha256(self.mailbox.get_bytes(key)).hexdigest()
+                if digest in self.already_sent:
+                    self.skipped.append(key)
+                else:
+                    self.digests[key] = digest
+                    keys.append(key)
+            return keys
+        if self.mailbox is not None:
+            return list(self.mailbox.keys())
+        return list(self.files)
+
+    def message(self, key):
+        """Return a draft as an EmailMessage that's ready to send."""
+        if self.mailbox is not None:
+            raw = self.mailbox.get_bytes(key)
+        else:
+            with open(key, 'r') as f:
+                # Adds the Date, Message-ID and MIME headers flat drafts don't have.
+                raw = draft_message(os.path.basename(key), f.read())
+        return ready_message(raw)
+
+    def sent(self, key, keep=False):
+        """Remove a sent draft, unless keep is set."""
+        if keep:
+            return
+        if self.format == 'mbox':
+            # Recorded on disk before anything else happens, so a crash or
+            # Ctrl-C can't leave it to be sent again.
+            with open(self.sentlog, 'a') as f:
+                f.write(self.digests[key] + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self.mailbox.discard(key)
+        elif self.mailbox is not None:
+            self.mailbox.discard(key)
+        else:
+            os.remove(key)
+
+    def failed(self, key, error):
+        # Failed drafts are left where they are, to be sent next time.
+        pass
+
+    def close(self):
+        if self.mailbox is not None:
+            # Rewrites an mbox without the sent messages (into a new file
+            # that's renamed over the old one), after which the list of
+            # sent messages isn't needed.
+            if self.format == 'mbox' and not self.dry_run:
+                for key in self.skipped:
+                    self.mailbox.discard(key)
+            self.mailbox.close()
+            if self.format == 'mbox' and not self.dry_run and os.path.exists(self.sentlog):
+                os.remove(self.sentlog)
+
+class QueueCampaign:
+    """The queued drafts in a mailqueue.py send queue."""
+    def __init__(self, path, claim=True, batch=8):
+        self.queue = MailQueue(path)
+        self.claim = claim
+        self.batch = batch
+        self.claimed = {}
+
+    def keys(self):
+        """Claim queued drafts a few at a time, so a crash leaves only those
+        few in doubt, and yield their ids.
+
+        Without claim (for a dry run), list the queued drafts instead.
+        """
+        if not self.claim:
+            for rid, name, message in self.queue.db.execute(
+                    "SELECT id, name, message FROM messages WHERE state = 'queued' ORDER BY id"):
+                self.claimed[rid] = message
+                yield rid
+            return
+        while True:
+            rows = self.queue.claim(self.batch)
+            if not rows:
+                return
+            for rid, name, message in rows:
+                self.claimed[rid] = message
+                yield rid
+
+    def message(self, key):
+        return ready_message(self.claimed.pop(key))
+
+    def sent(self, key, keep=False):
+        self.queue.mark_sent(key)
+
+    def failed(self, key, error):
+        self.queue.mark_failed(key, error)
+
+    def close(self):
+        # By now every draft this process sent has been marked sent or
+        # failed, so any it still has claimed (like after Ctrl-C) were
+        # never sent, and go back in the queue.
+        if self.claim:
+            self.queue.release_claimed()
+        self.queue.close()
+
+def open_campaign(path, dry_run=False, batch=8):
+    if os.path.isdir(path) and os.path.isfile(os.path.join(path, QUEUENAME)):
+        path = os.path.join(path, QUEUENAME)
+    if os.path.basename(path) == QUEUENAME:
+        return QueueCampaign(path, claim=not dry_run, batch=batch)
+    return Campaign(path, dry_run)
+
+class RateLimiter:
+    """Spaces out messages over all connections to at most rate per second."""
+    def __init__(self, rate=None):
+        self.interval = 1 / rate if rate else 0
+        self.lock = threading.Lock()
+        self.next = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(self.next, now)
+            self.next = start + self.interval
+        time.sleep(start - now)
+
+def is_temporary(error):
+    """Whether sending again later might work."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, message in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    # Dropped connections, timeouts, refused connections.
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError))
+
+class Sender:
+    """One SMTP connection, reopened after every batch of messages."""
+    def __init__(self, args, password):
+        self.args = args
+        self.password = password
+        self.smtp = None
+        self.sent = 0
+
+    def connect(self):
+        args = self.args
+        if args.ssl:
+            self.smtp = smtplib.SMTP_SSL(args.host, args.port, timeout=args.timeout)
+        else:
+            self.smtp = smtplib.SMTP(args.host, args.port, timeout=args.timeout)
+            if args.starttls:
+                self.smtp.starttls()
+        if args.user:
+            self.smtp.login(args.user, self.password)
+        self.sent = 0
+
+    def disconnect(self):
+        if self.smtp is None:
+            return
+        try:
+            self.smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self.smtp.close()
+        self.smtp = None
+
+    def send(self, message):
+        """Send message, and return the refused recipients, like SMTP.sendmail()."""
+        if self.smtp is None or self.sent >= self.args.batch:
+            self.disconnect()
+            self.connect()
+        try:
+            refused = self.smtp.sendmail(sender(message), recipients(message), flatten(message))
+        except Exception:
+            # Don't reuse a connection in an unknown state.
+            self.disconnect()
+            raise
+        self.sent += 1
+        return refused
+
+def sender(message):
+    addresses = message['From'].addresses if message['From'] else ()
+    return addresses[0].addr_spec if addresses else ''
+
+def recipients(message):
+    return [address.addr_spec for field in ('To', 'Cc', 'Bcc')
+            for header in message.get_all(field, []) for address in header.addresses]
+
+def flatten(message):
+    """The message as sent: without Bcc, and with lines starting with
+    'From ' left alone (SMTP.send_message() would quote them)."""
+    message = copy.copy(message)
+    del message['Bcc']
+    return message.as_bytes(policy=message.policy.clone(linesep='\r\n'))
+
+def send_worker(messages, results, limiter, args, password):
+    sender = Sender(args, password)
+    while True:
+        item = messages.get()
+        if item is None:
+            break
+        key, message = item
+        error = None
+        refused = {}
+        for attempt in range(args.retries + 1):
+            if attempt:
+                time.sleep(args.backoff * 2 ** (attempt - 1))
+            limiter.wait()
+            try:
+                refused = sender.send(message)
+                error = None
+                break
+            except Exception as e:
+                error = e
+                if not is_temporary(e):
+                    break
+        results.put((key, message, error, refused))
+    sender.disconnect()
+
+def main():
+    parser = argparse.ArgumentParser(description='Send a campaign of draft emails over a pool of SMTP connections.')
+    parser.add_argument('campaign', help='Directory of draft files, or an mbox, Maildir, or send queue, as written by the draft email scripts')
+    parser.add_argument('--host', help='SMTP server', default='localhost')
+    parser.add_argument('--port', help='SMTP port (default: 465 with --ssl, otherwise 25)', type=int)
+    parser.add_argument('--ssl', help='Connect with SSL', action='store_true')
+    parser.add_argument('--starttls', help='Switch to TLS with STARTTLS after connecting', action='store_true')
+    parser.add_argument('--user', help='User to log in as; the password is read from $SMTP_PASSWORD, or asked for')
+    parser.add_argument('--connections', help='Number of SMTP connections to send over at once', type=int, default=4)
+    parser.add_argument('--batch', help='Number of messages to send over a connection before opening a new one', type=int, default=50)
+    parser.add_argument('--rate', help='Send at most this many messages per second, over all connections', type=float)
+    parser.add_argument('--retries', help='Number of times to retry a message after a temporary failure', type=int, default=3)
+    parser.add_argument('--backoff', help='Seconds to wait before the first retry; each retry waits twice as long', type=float, default=5)
+    parser.add_argument('--timeout', help='Seconds to wait for the SMTP server', type=float, default=60)
+    parser.add_argument('--keep', help="Don't remove drafts once they're sent", action='store_true')
+    parser.add_argument('--ledger', help='SQLite contact ledger to record the recipients of sent drafts in (see contactledger.py)')
+    parser.add_argument('--dry-run', help='List the drafts and their recipients without sending anything', action='store_true')
+    args = parser.parse_args()
+    if args.port is None:
+        args.port = 465 if args.ssl else 25
+
+    campaign = open_campaign(args.campaign, args.dry_run, args.connections * 2)
+    keys = campaign.keys()
+    if isinstance(campaign, QueueCampaign) and not args.dry_run:
+        counts = campaign.queue.counts()
+        if counts['sending']:
+            print(counts['sending'], 'messages are being sent by another sender, or were when it stopped;',
+                  'they are not sent again (see mailqueue.py)', file=sys.stderr)
+    if args.dry_run:
+        readable = 0
+        for key in keys:
+            try:
+                message = campaign.message(key)
+            except Exception as e:
+                print('Could not read', str(key) + ':', e, file=sys.stderr)
+                continue
+            print(key, ', '.join(recipients(message)), '|', message['Subject'])
+            readable += 1
+        print(readable, 'drafts to send')
+        campaign.close()
+        return
+
+    password = None
+    if args.user:
+        password = os.environ.get('SMTP_PASSWORD') or getpass.getpass('SMTP password for ' + args.user + ': ')
+    ledger = None
+    if args.ledger:
+        # Imported here so sending doesn't need the resume search modules.
+        from contactledger import contactLedger
+        ledger = contactLedger(args.ledger)
+
+    # A small queue keeps the workers busy without parsing every draft up front.
+    messages = queue.Queue(maxsize=args.connections * 4)
+    results = queue.Queue()
+    limiter = RateLimiter(args.rate)
+    workers = [threading.Thread(target=send_worker, args=(messages, results, limiter, args, password))
+               for i in range(args.connections)]
+    for worker in workers:
+        worker.start()
+
+    sent = 0
+    failed = 0
+    # Recipients the server refused in drafts that were otherwise sent.
+    refused_recipients = 0
+    # Drafts handed to the workers that haven't come back yet.
+    pending = 0
+    def collect(block):
+        # The campaign and the ledger are only changed from this thread.
+        nonlocal sent, failed, refused_recipients, pending
+        while True:
+            try:
+                key, message, error, refused = results.get(block=block)
+            except queue.Empty:
+                return
+            block = False
+            pending -= 1
+            if error is None:
+                sent += 1
+                if ledger:
+                    ledger.record([r for r in recipients(message) if r not in refused], status='sent')
+                campaign.sent(key, args.keep)
+                for address, (code, reply) in refused.items():
+                    refused_recipients += 1
+                    print('Sent', key, 'but', address, 'was refused:', code, reply.decode(errors='replace'),
+                          file=sys.stderr)
+            else:
+                failed += 1
+                campaign.failed(key, error)
+                print('Could not send', key, 'to', ', '.join(recipients(message)) + ':', error, file=sys.stderr)
+
+    # Ctrl-C stops handing out drafts, but never interrupts recording one
+    # that was sent, so the drafts being sent right now are finished and
+    # recorded, and the rest are left for next time.
+    interrupted = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: interrupted.set())
+
+    total = 0
+    for key in keys:
+        if interrupted.is_set():
+            break
+        total += 1
+        try:
+            message = campaign.message(key)
+        except Exception as e:
+            failed += 1
+            campaign.failed(key, e)
+            print('Could not read', str(key) + ':', e, file=sys.stderr)
+            continue
+        while not interrupted.is_set():
+            try:
+                messages.put((key, message), timeout=0.1)
+                pending += 1
+                break
+            except queue.Full:
+                collect(block=False)
+        else:
+            total -= 1
+        collect(block=False)
+    if interrupted.is_set():
+        print('Interrupted; waiting for the drafts being sent right now', file=sys.stderr)
+        while True:
+            try:
+                messages.get_nowait()
+            except queue.Empty:
+                break
+            pending -= 1
+            total -= 1
+    for worker in workers:
+        messages.put(None)
+    while pending:
+        collect(block=True)
+    for worker in workers:
+        worker.join()
+    campaign.close()
+    if ledger:
+        ledger.close()
+    print('Sent', sent, 'of', total, 'drafts;', failed, 'failed;', refused_recipients, 'recipients refused')
+    if failed or refused_recipients or interrupted.is_set():
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# Cache a longitudinal survey export as binary columns, so it's only parsed
+# as CSV once.
+#
+# The cache is a directory with a schema.json and one .npy file per
+# question. schema.json has the question texts, and for each question the
+# answers its codes stand for; the .npy file has the code of every alum's
+# answer, as the smallest unsigned integer type that fits. Columns are
+# memory-mapped when they're loaded, so only the ones a report reads are
+# ever paged in.
+#
+# The cache remembers the size, modification time and SHA-256 hash of the
+# CSV file it was made from. If the size or modification time changed, the
+# file is hashed again, and the cache is only rebuilt if the hash changed.
+# A rebuild keeps the previous export's columns next to the new ones, for
+# reports that started before it, and removes any older ones.
+#
+# $ surveycache.py survey.csv
+# $ longitudinalsurveyresults.py --csv survey.csv --cache survey.csv.columns
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from longitudinalsurveyresults import SurveyColumns, read_columns
+
+# Bump this when the layout of the cache changes.
+CACHEVERSION = 1
+SCHEMA = 'schema.json'
+
+def default_cache(csvpath):
+    return csvpath + '.columns'
+
+def hash_file(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+def narrowest(codes, count):
+    """codes as the smallest unsigned integer type that holds count codes."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if count <= np.iinfo(dtype).max + 1:
+            return codes.astype(dtype)
+    return codes
+
+def read_schema(cachedir):
+    try:
+        with open(os.path.join(cachedir, SCHEMA), 'r') as f:
+            schema = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if schema.get('version') != CACHEVERSION:
+        return None
+    return schema
+
+def write_schema(cachedir, schema):
+    path = os.path.join(cachedir, SCHEMA)
+    partial = path + '.' + str(os.getpid()) + '.tmp'
+    with open(partial, 'w') as f:
+        json.dump(schema, f)
+    # Renamed into place, so the schema never names columns that aren't written yet.
+    os.replace(partial, path)
+
+def build_cache(csvpath, cachedir, stat, digest, previous=None):
+    """Parse csvpath and write all of its columns to cachedir. Returns the schema.
+
+    previous is the schema being replaced; its columns are kept until the
+    next rebuild.
+    """
+    if not os.path.exists(cachedir):
+        os.makedirs(cachedir, exist_ok=True)
+    with open(csvpath, 'r') as csvFile:
+        columns = read_columns(csvFile)
+    # Column files are named after the export they came from, and the
+    # previous export's are only removed by the rebuild after this one, so
+    # a report that has read the old schema can still load its columns.
+    questions = []
+    for number, (question, codes) in enumerate(columns.codes.items()):
+        answers = columns.answers[question]
+        name = digest[:16] + '-' + str(number) + '.npy'
+        partial = os.path.join(cachedir, name + '.' + str(os.getpid()) + '.tmp')
+        with open(partial, 'wb') as f:
+            np.save(f, narrowest(codes, len(answers)))
+        os.replace(partial, os.path.join(cachedir, name))
+        questions.append({'question': question, 'answers': answers, 'file': name})
+    schema = {
+        'version': CACHEVERSION,
+        'source': {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': digest},
+        'rows': columns.rows,
+        'questions': questions,
+    }
+    write_schema(cachedir, schema)
+    current = set(q['file'] for q in questions)
+    if previous:
+        current.update(q['file'] for q in previous['questions'])
+    for f in os.listdir(cachedir):
+        if f.endswith('.npy') and f not in current:
+            os.remove(os.path.join(cachedir, f))
+    return schema
+
+def refresh_cache(csvpath, cachedir):
+    """Make sure cachedir matches csvpath, rebuilding it if it doesn't.
+
+    Returns the schema, and whether the cache was rebuilt.
+    """
+    stat = os.stat(csvpath)
+    schema = read_schema(cachedir)
+    if schema:
+        source = schema['source']
+        if source['size'] == stat.st_size and source['mtime'] == stat.st_mtime_ns:
+            return schema, False
+    digest = hash_file(csvpath)
+    if schema and schema['source']['sha256'] == digest:
+        # Touched or copied, but not changed.
+        schema['source'].update(size=stat.st_size, mtime=stat.st_mtime_ns)
+        write_schema(cachedir, schema)
+        return schema, False
+    return build_cache(csvpath, cachedir, stat, digest, schema), True
+
+def load_columns(csvpath, cachedir=None):
+    """Return the SurveyColumns of csvpath, from its cache (built if needed)."""
+    cachedir = cachedir or default_cache(csvpath)
+    schema, rebuilt = refresh_cache(csvpath, cachedir)
+    codes = {}
+    answers = {}
+    for q in schema['questions']:
+        codes[q['question']] = np.load(os.path.join(cachedir, q['file']), mmap_mode='r')
+        answers[q['question']] = q['answers']
+    return SurveyColumns(schema['rows'], codes, answers)
+
+def main():
+    parser = argparse.ArgumentParser(description='Cache a longitudinal survey CSV export as binary columns.')
+    parser.add_argument('csv', help='CSV file of longitudinal survey responses')
+    parser.add_argument('--cache', help='Cache directory (default: the CSV file name with .columns added)')
+    args = parser.parse_args()
+
+    cachedir = args.cache or default_cache(args.csv)
+    schema, rebuilt = refresh_cache(args.csv, cachedir)
+    size = sum(os.path.getsize(os.path.join(cachedir, f)) for f in os.listdir(cachedir))
+    print('Rebuilt' if rebuilt else 'Up to date', cachedir + ':', schema['rows'], 'alums,',
+          len(schema['questions']), 'questions,', size // 1024, 'KiB')
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,8 @@
 
 import argparse
 import csv
-import os
+
+from mailspool import MailSpool, add_format_argument
 
 header1 = '''From: Sage Sharp <applicant-help@outreachy.org>
 '''
@@ -81,22 +82,16 @@ Sage Sharp
 Outreachy Organizer
 '''
 
-def write_email(outdir, index, contact, body):
-    with open(os.path.join(outdir, str(index) + '.txt'), 'w') as email:
-        email.write(header1)
-        email.write('To: ' + contact + '\n')
-        email.write(header3)
-        email.write(body)
+def write_email(spool, index, contact, body):
+    spool.add(str(index) + '.txt', header1 + 'To: ' + contact + '\n' + header3 + body)
 
 def main():
     parser = argparse.ArgumentParser(description='Send an email to people who stopped by the Outreachy booth at Tapia')
     parser.add_argument('outdir', help='Directory to create form emails in')
     parser.add_argument('csv', help='CSV file of people who stopped by the booth')
+    add_format_argument(parser)
     args = parser.parse_args()
 
-    if not os.path.exists(args.outdir):
-            os.makedirs(args.outdir)
-
     applicants = []
     promoter = []
     with open(args.csv, 'r') as csvFile:
@@ -106,12 +101,14 @@ def main():
             if row['Email'] and row['Which Outreachy round do you want to apply for?,May 2019 to August 2019'] == '1':
                 applicants.append('"' + row['Name'].strip() + '" <' + row['Email'].strip() + '>')
             elif row['Email'] and row["Do you want to help promote Outreachy to students at your university?"] == '1':
-                promotor.append('"' + row['Name'].strip() + '" <' + row['Email'].strip() + '>')
-
-    for index, contact in enumerate(applicants):
-        write_email(args.outdir, index, contact, body)
-    for index, contact in enumerate(promoter):
-        write_email(args.outdir, index, contact, promote_body)
+                promoter.append('"' + row['Name'].strip() + '" <' + row['Email'].strip() + '>')
+
+    with MailSpool(args.outdir, args.format) as spool:
+        for index, contact in enumerate(applicants):
+            write_email(spool, index, contact, body)
+        # Numbered after the applicants, so they don't overwrite their emails.
+        for index, contact in enumerate(promoter, len(applicants)):
+            write_email(spool, index, contact, promote_body)
 
     print('Wrote', len(applicants + promoter), 'resume draft emails to', args.outdir)
 
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# End-to-end checks of sending a mailqueue.py send queue with
+# sendcampaign.py against a local aiosmtpd server: every message is
+# delivered exactly once when a sender is interrupted and started again,
+# and when several senders drain the same queue at once.
+#
+# $ pip3 install aiosmtpd
+# $ python3 test_mailqueue.py
+
+import os
+import subprocess
+import sys
+import unittest
+from collections import Counter
+
+from mailqueue import QUEUENAME, MailQueue
+from test_sendcampaign import SENDCAMPAIGN, CampaignTestCase
+
+class MailQueueTest(CampaignTestCase):
+    def counts(self):
+        with MailQueue(os.path.join(self.outdir, QUEUENAME)) as queue:
+            return queue.counts()
+
+    def test_interrupted(self):
+        self.write_drafts('queue')
+        self.interrupt()
+        result = self.send()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(Counter(self.handler.received), self.expected())
+        self.assertEqual(self.counts()['sent'], self.COUNT)
+
+    def test_several_senders(self):
+        self.COUNT = 200
+        self.write_drafts('queue')
+        senders = [subprocess.Popen([sys.executable, SENDCAMPAIGN, self.outdir, '--host', '127.0.0.1',
+                                     '--port', str(self.port), '--connections', '2'],
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                   for i in range(3)]
+        for sender in senders:
+            out, err = sender.communicate(timeout=120)
+            self.assertEqual(sender.returncode, 0, err)
+        self.assertEqual(Counter(self.handler.received), self.expected())
+        self.assertEqual(self.counts(), {'queued': 0, 'sending': 0, 'sent': self.COUNT, 'failed': 0})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+#
+# Copyright 2026 Sage Sharp <sage@sfconservancy.org>
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+#
+# End-to-end checks of sendcampaign.py against a local aiosmtpd server:
+# every draft is delivered exactly once, in each draft format, including
+# when a run is interrupted or crashes partway and is started again.
+# test_mailqueue.py checks sending from a mailqueue.py send queue.
+#
+# $ pip3 install aiosmtpd
+# $ python3 test_sendcampaign.py
+
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from collections import Counter
+
+from contactledger import contactLedger
+from mailspool import MailSpool
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    Controller = None
+
+SENDCAMPAIGN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sendcampaign.py')
+
+class recordingHandler:
+    """Accepts every message, after turning each one away once with a 451 if
+    temporary is set, for every recipient except the refused ones."""
+    def __init__(self, temporary=False):
+        self.temporary = temporary
+        self.deferred = set()
+        self.refused = set()
+        self.received = []
+        self.lock = threading.Lock()
+
+    async def handle_RCPT(self, server, session, envelope, address, options):
+        if address in self.refused:
+            return '550 No such user'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        with self.lock:
+            if self.temporary and envelope.content not in self.deferred:
+                self.deferred.add(envelope.content)
+                return '451 Try again later'
+            self.received.extend(envelope.rcpt_tos)
+        return '250 OK'
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+@unittest.skipIf(Controller is None, 'needs aiosmtpd (pip3 install aiosmtpd)')
+class CampaignTestCase(unittest.TestCase):
+    """Runs an aiosmtpd server for each test, and sendcampaign.py against it."""
+    COUNT = 30
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.outdir = self.directory.name
+        self.port = free_port()
+        self.handler = recordingHandler()
+        self.server = Controller(self.handler, hostname='127.0.0.1', port=self.port)
+        self.server.start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.directory.cleanup()
+
+    def write_drafts(self, format):
+        with MailSpool(self.outdir, format) as spool:
+            for i in range(self.COUNT):
+                spool.add(str(i) + '.txt', 'From: sage@example.org\nTo: "Alum ' + str(i) + '" <alum' + str(i) +
+                          '@example.org>\nSubject: Hi\n\nHello, Alum ' + str(i) + '!\nFrom here on\n')
+
+    def expected(self):
+        return Counter('alum' + str(i) + '@example.org' for i in range(self.COUNT))
+
+    def send(self, *options):
+        return subprocess.run([sys.executable, SENDCAMPAIGN, self.outdir, '--host', '127.0.0.1',
+                               '--port', str(self.port), '--backoff', '0.01'] + list(options),
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60)
+
+    def interrupt(self, *options):
+        """Start sending, and press Ctrl-C after a few messages are delivered."""
+        process = subprocess.Popen([sys.executable, SENDCAMPAIGN, self.outdir, '--host', '127.0.0.1',
+                                    '--port', str(self.port), '--rate', '20'] + list(options),
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        while len(self.handler.received) < 5 and process.poll() is None:
+            time.sleep(0.01)
+        process.send_signal(signal.SIGINT)
+        process.communicate(timeout=60)
+        self.assertLess(len(self.handler.received), self.COUNT)
+
+class SendCampaignTest(CampaignTestCase):
+    def test_flat(self):
+        self.write_drafts('flat')
+        self.handler.temporary = True
+        result = self.send('--connections', '3', '--batch', '4')
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(Counter(self.handler.received), self.expected())
+        self.assertEqual([f for f in os.listdir(self.outdir) if f.endswith('.txt')], [])
+
+    def test_refused_recipient(self):
+        self.write_drafts('flat')
+        with open(os.path.join(self.outdir, 'both.txt'), 'w') as draft:
+            draft.write('From: sage@example.org\nTo: alum0@example.org, gone@example.org\nSubject: Hi\n\nHello!\n')
+        self.handler.refused.add('gone@example.org')
+        ledger = os.path.join(self.outdir, 'ledger.db')
+        result = self.send('--ledger', ledger)
+        self.assertEqual(result.returncode, 1)
+        self.assertIn(b'gone@example.org was refused', result.stderr)
+        self.assertEqual(Counter(self.handler.received), self.expected() + Counter(['alum0@example.org']))
+        # The accepted recipients are recorded, and the draft isn't sent again.
+        contacts = contactLedger(ledger)
+        self.assertTrue(contacts.contacted(['alum0@example.org']))
+        self.assertIsNone(contacts.contacted(['gone@example.org']))
+        contacts.close()
+        self.assertFalse(os.path.exists(os.path.join(self.outdir, 'both.txt')))
+
+    def test_maildir_interrupted(self):
+        self.write_drafts('maildir')
+        self.interrupt()
+        result = self.send()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(Counter(self.handler.received), self.expected())
+
+    def test_mbox_interrupted(self):
+        self.write_drafts('mbox')
+        self.interrupt()
+        result = self.send()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(Counter(self.handler.received), self.expected())
+        self.assertEqual(os.path.getsize(os.path.join(self.outdir, 'drafts.mbox')), 0)
+        self.assertFalse(os.path.exists(os.path.join(self.outdir, 'drafts.mbox.sent')))
+
+    def test_mbox_crashed(self):
+        # A run that dies after sending a few messages, before the mbox is rewritten.
+        self.write_drafts('mbox')
+        crash = ('import os, sys\n'
+                 'from sendcampaign import Campaign\n'
+                 'campaign = Campaign(sys.argv[1])\n'
+                 'for key in campaign.keys()[:5]:\n'
+                 '    campaign.sent(key)\n'
+                 'os._exit(1)\n')
+        subprocess.run([sys.executable, '-c', crash, os.path.join(self.outdir, 'drafts.mbox')],
+                       cwd=os.path.dirname(SENDCAMPAIGN), timeout=60)
+        result = self.send()
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(len(self.handler.received), self.COUNT - 5)
+        self.assertEqual(len(set(self.handler.received)), self.COUNT - 5)
+
+if __name__ == "__main__":
+    unittest.main()